@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Request routing for map page loads.
+Aborts resources the map doesn't need (images, fonts, analytics, HubSpot)
+and serves d3, topojson and the us-atlas files from a local
+content-addressed cache, seeded from the captured_*-10m.json.json files.
+
+Usage:
+    python asset_cache.py            # seed the cache and list its contents
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_CACHE_DIR = REPO_ROOT / ".asset_cache"
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Analytics, ads, chat and CTA widgets loaded by the WordPress page
+BLOCKED_DOMAINS = (
+    "googletagmanager.com", "google-analytics.com", "doubleclick.net",
+    "googleadservices.com", "facebook.net", "facebook.com", "licdn.com",
+    "hubspot.com", "hs-scripts.com", "hs-analytics.net", "hs-banner.com",
+    "hscollectedforms.net", "hsadspixel.net", "hsforms.net", "hsforms.com",
+    "visualwebsiteoptimizer.com", "apollo.io", "metadata.io",
+    "clearbitscripts.com", "zi-scripts.com", "vector.co",
+)
+
+# Static libraries and atlas files the map needs; safe to cache indefinitely
+CACHEABLE_PREFIXES = (
+    "https://d3js.org/",
+    "https://unpkg.com/topojson",
+    "https://cdn.jsdelivr.net/npm/us-atlas",
+)
+
+# Atlas files already saved in the repo by find_data_source.py
+SEED_FILES = {
+    "https://cdn.jsdelivr.net/npm/us-atlas@3/counties-10m.json": REPO_ROOT / "captured_counties-10m.json.json",
+    "https://cdn.jsdelivr.net/npm/us-atlas@3/states-10m.json": REPO_ROOT / "captured_states-10m.json.json",
+}
+
+
+class AssetCache:
+    """Content-addressed file cache: objects/<sha256> plus a URL index."""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.index_path = self.cache_dir / "index.json"
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+
+    def get(self, url: str) -> tuple[bytes, dict] | None:
+        """Return (body, entry) for a cached URL, or None."""
+        entry = self.index.get(url)
+        if not entry:
+            return None
+        path = self.objects_dir / entry["sha256"]
+        if not path.exists():
+            return None
+        return path.read_bytes(), entry
+
+    def put(self, url: str, body: bytes, content_type: str, fetch_seconds: float = None):
+        """Store a response body and record it in the index."""
+        digest = hashlib.sha256(body).hexdigest()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        path = self.objects_dir / digest
+        if not path.exists():
+            path.write_bytes(body)
+
+        self.index[url] = {
+            "sha256": digest,
+            "content_type": content_type,
+            "size": len(body),
+            "fetch_seconds": fetch_seconds,
+        }
+        with open(self.index_path, "w") as f:
+            json.dump(self.index, f, indent=2)
+
+    def seed(self):
+        """Add the bundled atlas captures (re-serialized compactly) if missing.
+
+        Seeded entries have no fetch_seconds: they were never downloaded, so
+        hits on them count bytes but no time saved.
+        """
+        for url, path in SEED_FILES.items():
+            if url in self.index or not path.exists():
+                continue
+            with open(path) as f:
+                body = json.dumps(json.load(f), separators=(",", ":")).encode()
+            self.put(url, body, "application/json")
+
+
+class AssetRouter:
+    """Playwright route handler that blocks and caches, with per-run stats."""
+
+    def __init__(self, cache: AssetCache, block: bool = True):
+        self.cache = cache
+        self.block = block
+        self.blocked = 0
+        self.cache_hits = 0
+        self.bytes_from_cache = 0
+        self.seconds_saved = 0.0  # Only hits whose fetch time was measured
+        self.unmeasured_hits = 0  # Seeded entries, never fetched here, so no time to credit
+        self.stored = 0
+
+    async def install(self, context):
+        """Route every request made by a browser context (or page)."""
+        await context.route("**/*", self.handle)
+
+    def should_block(self, request) -> bool:
+        if not self.block:
+            return False
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            return True
+        host = request.url.split("/")[2] if "://" in request.url else ""
+        return any(host == d or host.endswith("." + d) for d in BLOCKED_DOMAINS)
+
+    async def handle(self, route):
+        request = route.request
+        url = request.url
+
+        if self.should_block(request):
+            self.blocked += 1
+            await route.abort()
+            return
+
+        if not url.startswith(CACHEABLE_PREFIXES):
+            await route.continue_()
+            return
+
+        cached = self.cache.get(url)
+        if cached:
+            body, entry = cached
+            self.cache_hits += 1
+            self.bytes_from_cache += len(body)
+            if entry.get("fetch_seconds") is None:
+                self.unmeasured_hits += 1
+            else:
+                self.seconds_saved += entry["fetch_seconds"]
+            await route.fulfill(
+                status=200,
+                body=body,
+                headers={
+                    "content-type": entry.get("content_type") or "application/octet-stream",
+                    "access-control-allow-origin": "*",
+                },
+            )
+            return
+
+        start = time.perf_counter()
+        response = await route.fetch()
+        body = await response.body()
+        if response.ok:
+            self.cache.put(url, body, response.headers.get("content-type", ""), time.perf_counter() - start)
+            self.stored += 1
+        await route.fulfill(response=response, body=body)
+
+    def report(self):
+        measured = self.cache_hits - self.unmeasured_hits
+        saved = f"~{self.seconds_saved:.1f}s of fetches saved on {measured}"
+        if self.unmeasured_hits:
+            saved += f", {self.unmeasured_hits} seeded without a fetch time"
+        print(f"Assets: blocked {self.blocked} requests, served {self.cache_hits} from cache "
+              f"({self.bytes_from_cache / 1e6:.1f} MB; {saved}), cached {self.stored} new")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed and inspect the local asset cache")
+    parser.add_argument("--cache-dir", type=str, default=str(DEFAULT_CACHE_DIR), help="Asset cache directory")
+
+    args = parser.parse_args()
+
+    cache = AssetCache(Path(args.cache_dir))
+    cache.seed()
+    print(f"Asset cache: {cache.cache_dir}")
+    for url, entry in sorted(cache.index.items()):
+        fetched = f"{entry['fetch_seconds']:.2f}s" if entry.get("fetch_seconds") is not None else "seeded"
+        print(f"  {entry['size']:>10,} bytes  {fetched:>7}  {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,42 @@
 """
 Automated verification: hovers over map and captures tooltip data.
 Compares against our CSV values.
+
+--full checks every county for every requested combination: tooltips are
+read in bulk (one in-page call per combination), joined against the data
+file with pandas, and any value outside the tolerance is reported per
+field. Exit status is 0 when everything matches, 1 on mismatches and 2 if
+the check could not run.
+
+Usage:
+    python auto_verify.py                                    # quick 20-county sample
+    python auto_verify.py --full --year 2026 --age 50 --metal gold
+    python auto_verify.py --full --year all --age all --metal all --report mismatches.csv
 """
 
+import argparse
 import asyncio
 import re
+import sys
+import time
+from pathlib import Path
+
 from playwright.async_api import async_playwright
 
+from asset_cache import AssetCache, AssetRouter
+from browser_daemon import lease_page, release_page
+from premium_index import load_index
+from profiler import PROFILE
+from readiness import goto_map, wait_for_controls, wait_for_map_ready
+from scrape_ideon_map import BULK_EXTRACT_JS, FILTER_OPTIONS_JS, new_map_page, select_combination
+from tooltip_parser import parse_tooltip as parse_map_tooltip
+from topology import load_topology
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 URL = "https://ideonapi.com/ideon-ichra-insights-by-state/"
 
 
@@ -40,14 +70,17 @@ async def get_tooltip(page) -> str:
     """Get current tooltip text."""
     try:
         tip = page.locator("#ichra-tip")
-        if await tip.is_visible():
-            return await tip.text_content()
+        with PROFILE.span("tooltip.poll"):
+            if await tip.is_visible():
+                PROFILE.count("tooltip.found")
+                return await tip.text_content()
     except:
         pass
+    PROFILE.count("tooltip.none")
     return None
 
 
-async def verify():
+async def verify(url: str = URL):
     print("Automated verification against live website")
     print("Settings: Year=2026, Age=50, Metal=Gold")
     print("=" * 70)
@@ -57,21 +90,20 @@ async def verify():
         page = await browser.new_page(viewport={"width": 1400, "height": 900})
 
         print(f"\nLoading page...")
-        await page.goto(URL, wait_until="domcontentloaded", timeout=60000)
-        await asyncio.sleep(4)
+        with PROFILE.span("page.load"):
+            await goto_map(page, url)
+            await wait_for_controls(page)
 
         # Set filters
         print("Setting filters...")
-        await page.locator("#ichra-year").select_option("26")
-        await asyncio.sleep(0.3)
-        await page.locator("#ichra-age").select_option("50")
-        await asyncio.sleep(0.3)
-        await page.locator("#ichra-metal").select_option("gold")
-        await asyncio.sleep(2)
+        with PROFILE.span("filters.set"):
+            await page.locator("#ichra-year").select_option("26")
+            await page.locator("#ichra-age").select_option("50")
+            await page.locator("#ichra-metal").select_option("gold")
+            await wait_for_map_ready(page)
 
         # Scroll to map
         await page.evaluate("window.scrollBy(0, 350)")
-        await asyncio.sleep(1)
 
         # Find the map container
         map_div = page.locator("#ichra-map")
@@ -92,10 +124,12 @@ async def verify():
 
         for y in range(int(box["y"] + 20), int(box["y"] + box["height"] - 20), step):
             for x in range(int(box["x"] + 20), int(box["x"] + box["width"] - 20), step):
-                await page.mouse.move(x, y)
-                await asyncio.sleep(0.03)
+                # The map's mousemove handler fills #ichra-tip synchronously
+                with PROFILE.span("hover"):
+                    await page.mouse.move(x, y)
 
                 tooltip_text = await get_tooltip(page)
+                PROFILE.count("hover.hit" if tooltip_text else "hover.miss")
                 if tooltip_text:
                     data = parse_tooltip(tooltip_text)
                     if data and data["county"]:
@@ -110,17 +144,9 @@ async def verify():
 
         print(f"\nCaptured {len(found_counties)} unique counties from website:\n")
 
-        # Now compare with our JSON
-        import json
-        with open("county_data_raw.json") as f:
-            our_data = json.load(f)
-
-        # Build lookup for year=26, age=50, metal=gold
-        our_lookup = {}
-        for r in our_data:
-            if r["year"] == 26 and r["age"] == 50 and r["lvl"] == "gold":
-                key = f"{r['n']}, {r['st']}"
-                our_lookup[key] = r
+        # Now compare with our JSON (partition lookup for year=2026, age=50, metal=gold)
+        index = load_index(Path("county_data_raw.json"))
+        our_lookup = index.by_county_name(2026, 50, "gold")
 
         print(f"{'County':<35} {'Source':<8} {'Individual':>12} {'Small Group':>12} {'Diff':>10}")
         print("-" * 80)
@@ -167,5 +193,276 @@ async def verify():
         return mismatches == 0
 
 
+# Output column -> raw record key
+FIELDS = {"individual_premium": "i", "small_group_premium": "s", "difference": "d"}
+
+KEYS = ["fips", "year", "age", "metal"]
+
+EXIT_OK, EXIT_MISMATCH, EXIT_ERROR = 0, 1, 2
+
+
+def expand_option(value: str, options: list[str], to_option) -> list[str]:
+    """'all' -> every dropdown value, otherwise the one matching value."""
+    if value == "all":
+        return options
+    wanted = to_option(value)
+    if wanted not in options:
+        raise ValueError(f"{value} is not offered by the map (options: {', '.join(options)})")
+    return [wanted]
+
+
+async def extract_combinations(page, combos: list[tuple[str, str, str]]) -> list[dict]:
+    """Select each combination and read every county's tooltip in one call."""
+    rows = []
+    for n, (year_value, age_value, metal_value) in enumerate(combos, 1):
+        start = time.perf_counter()
+        await select_combination(page, year_value, age_value, metal_value)
+        with PROFILE.span("bulk.evaluate"):
+            extracted = await page.evaluate(BULK_EXTRACT_JS)
+        parsed = 0
+        parse_start = time.perf_counter()
+        for row in extracted:
+            data = parse_map_tooltip(row["text"])
+            if not data:
+                continue
+            parsed += 1
+            rows.append({
+                "fips": row["fips"],
+                "year": 2000 + int(year_value),
+                "age": int(age_value),
+                "metal": metal_value.lower(),
+                "county": data["county"],
+                "state": data["state"],
+                **{field: data[field] for field in FIELDS},
+            })
+        PROFILE.record("parse", time.perf_counter() - parse_start)
+        print(f"  [{n}/{len(combos)}] 20{year_value} / age {age_value} / {metal_value}: "
+              f"{parsed} of {len(extracted)} tooltips in {time.perf_counter() - start:.1f}s")
+    return rows
+
+
+def expected_frame(cache_file: Path, combos: list[tuple[str, str, str]]) -> tuple["pd.DataFrame", "pd.DataFrame"]:
+    """Dataset rows for the combinations, keyed like the extracted rows.
+
+    Returns (drawn, undrawn): counties the us-atlas topology has no shape for
+    (e.g. 02063, 02066) can never be hovered, so they are split off.
+    """
+    index = load_index(cache_file)
+    records = []
+    for year_value, age_value, metal_value in combos:
+        records.extend(index.select(2000 + int(year_value), int(age_value), metal_value))
+
+    frame = pd.DataFrame.from_records(records, columns=["f", "n", "st", "year", "age", "lvl", *FIELDS.values()])
+    frame = frame.rename(columns={"f": "fips", "n": "county", "st": "state", "lvl": "metal",
+                                  **{key: field for field, key in FIELDS.items()}})
+    frame["year"] = frame["year"] + 2000
+    frame["metal"] = frame["metal"].str.lower()
+
+    drawn = {str(g.get("id", "")).zfill(5) for g in load_topology()["objects"]["counties"]["geometries"]}
+    on_map = frame["fips"].isin(drawn)
+    return frame[on_map].reset_index(drop=True), frame[~on_map].reset_index(drop=True)
+
+
+def compare(expected: "pd.DataFrame", observed: "pd.DataFrame", tolerance: float) -> dict:
+    """Outer-join on (fips, year, age, metal) and collect per-field mismatches."""
+    merged = expected.merge(observed, on=KEYS, how="outer", suffixes=("_expected", "_map"), indicator=True)
+    both = merged[merged["_merge"] == "both"]
+
+    def field_rows(mask, field: str, got, delta) -> "pd.DataFrame":
+        rows = both.loc[mask, KEYS + ["county_expected", "state_expected"]].copy()
+        rows.columns = KEYS + ["county", "state"]
+        rows["field"] = field
+        rows["expected"] = both.loc[mask, f"{field}_expected"]
+        rows["map"] = got[mask]
+        rows["delta"] = delta[mask]
+        return rows
+
+    mismatches = []
+    null_rows = []
+    field_counts = {}
+    null_counts = {}
+    for field in FIELDS:
+        want = both[f"{field}_expected"].astype("float64")
+        got = both[f"{field}_map"].astype("float64")
+        delta = (got - want).round(2)
+        # The map formats a missing premium as $0.00; that is expected, but is
+        # reported on its own. A null shown as anything else is a mismatch.
+        null_as_zero = want.isna() & (got.abs() <= tolerance + 1e-9)
+        bad = got.isna() | (want.isna() & ~null_as_zero) | (delta.abs() > tolerance + 1e-9)
+        field_counts[field] = int(bad.sum())
+        null_counts[field] = int(null_as_zero.sum())
+        if bad.any():
+            mismatches.append(field_rows(bad, field, got, delta))
+        if null_as_zero.any():
+            null_rows.append(field_rows(null_as_zero, field, got, delta))
+
+    def side(which: str, suffix: str) -> "pd.DataFrame":
+        rows = merged.loc[merged["_merge"] == which, KEYS + [f"county{suffix}", f"state{suffix}"]]
+        rows.columns = KEYS + ["county", "state"]
+        return rows
+
+    return {
+        "compared": len(both),
+        "field_counts": field_counts,
+        "null_counts": null_counts,
+        "mismatches": pd.concat(mismatches, ignore_index=True) if mismatches else pd.DataFrame(),
+        "null_as_zero": pd.concat(null_rows, ignore_index=True) if null_rows else pd.DataFrame(),
+        "missing_on_map": side("left_only", "_expected"),
+        "extra_on_map": side("right_only", "_map"),
+    }
+
+
+def print_full_report(result: dict, tolerance: float, limit: int = 20):
+    print("\n" + "=" * 70)
+    print(f"Compared {result['compared']} county rows (tolerance ${tolerance:.2f})")
+    for field, count in result["field_counts"].items():
+        print(f"  {field:<22} {count:>6} mismatches")
+    print(f"  {'missing on map':<22} {len(result['missing_on_map']):>6}")
+    print(f"  {'not in data file':<22} {len(result['extra_on_map']):>6}")
+    print("Not counted as failures:")
+    for field, count in result["null_counts"].items():
+        print(f"  {field:<22} {count:>6} nulls shown as $0.00")
+    print(f"  {'not drawn on map':<22} {len(result['not_drawn']):>6}")
+
+    mismatches = result["mismatches"]
+    if len(mismatches):
+        print(f"\n{'FIPS':<6} {'County':<30} {'Combo':<16} {'Field':<20} {'Data':>10} {'Map':>10} {'Delta':>8}")
+        for r in mismatches.head(limit).itertuples(index=False):
+            combo = f"{r.year}/{r.age}/{r.metal}"
+            fmt = lambda v: f"{v:.2f}" if v == v and v is not None else "-"
+            print(f"{r.fips:<6} {str(r.county)[:30]:<30} {combo:<16} {r.field:<20} "
+                  f"{fmt(r.expected):>10} {fmt(r.map):>10} {fmt(r.delta):>8}")
+        if len(mismatches) > limit:
+            print(f"... and {len(mismatches) - limit} more")
+
+    for label, key in (("Missing on map", "missing_on_map"), ("Not in data file", "extra_on_map"),
+                       ("Not drawn on map (no topology shape)", "not_drawn")):
+        rows = result[key]
+        if len(rows):
+            print(f"\n{label} ({len(rows)}):")
+            for r in rows.head(limit).itertuples(index=False):
+                print(f"  {r.fips:<6} {r.county}, {r.state}  {r.year}/{r.age}/{r.metal}")
+
+
+async def verify_full(args) -> int:
+    """Check every county for the requested combinations; returns the exit status."""
+    if pd is None:
+        print("Error: pandas not installed. Run: pip install pandas")
+        return EXIT_ERROR
+
+    cache_file = Path(args.cache)
+    if not cache_file.exists():
+        print(f"Error: Cache file not found: {cache_file}")
+        return EXIT_ERROR
+
+    print("Full verification against live website")
+    print("=" * 70)
+    start = time.perf_counter()
+
+    cache = AssetCache()
+    cache.seed()
+    async with async_playwright() as p:
+        leased = await lease_page(p, args.daemon) if args.daemon else None
+        if leased:
+            browser, page, page_name = leased
+            print(f"Using warm page {page_name} from {args.daemon}")
+        else:
+            with PROFILE.span("browser.launch"):
+                browser = await p.chromium.launch(headless=True)
+                page = await new_map_page(browser, AssetRouter(cache))
+            with PROFILE.span("page.load"):
+                await goto_map(page, args.url)
+                await wait_for_controls(page)
+        options = await page.evaluate(FILTER_OPTIONS_JS)
+
+        try:
+            combos = [
+                (y, a, m)
+                for y in expand_option(args.year, options["year"], lambda v: str(int(v) - 2000))
+                for a in expand_option(args.age, options["age"], str)
+                for m in expand_option(args.metal, options["metal"], str.lower)
+            ]
+        except ValueError as e:
+            print(f"Error: {e}")
+            await browser.close()
+            if leased:
+                await release_page(args.daemon, page_name)
+            return EXIT_ERROR
+
+        print(f"Checking {len(combos)} combination(s)")
+        try:
+            observed = pd.DataFrame(await extract_combinations(page, combos),
+                                    columns=KEYS + ["county", "state", *FIELDS])
+        finally:
+            await browser.close()
+            if leased:
+                await release_page(args.daemon, page_name, ok=not page.is_closed())
+
+    if observed.empty:
+        print("Error: No tooltips extracted (map not rendered?)")
+        return EXIT_ERROR
+
+    with PROFILE.span("expected.load"):
+        expected, not_drawn = expected_frame(cache_file, combos)
+    with PROFILE.span("compare"):
+        result = compare(expected, observed, args.tolerance)
+    result["not_drawn"] = not_drawn[KEYS + ["county", "state"]]
+    print_full_report(result, args.tolerance, args.limit)
+
+    if args.report:
+        frames = [result["mismatches"]]
+        if len(result["null_as_zero"]):
+            frames.append(result["null_as_zero"].assign(field="null_as_zero:" + result["null_as_zero"]["field"]))
+        for key in ("missing_on_map", "extra_on_map", "not_drawn"):
+            if len(result[key]):
+                frames.append(result[key].assign(field=key))
+        report = pd.concat([f for f in frames if len(f)], ignore_index=True) if any(len(f) for f in frames) \
+            else pd.DataFrame(columns=KEYS + ["county", "state", "field", "expected", "map", "delta"])
+        report.to_csv(args.report, index=False)
+        print(f"\nWrote {len(report)} report rows to {args.report}")
+
+    failed = sum(result["field_counts"].values()) + len(result["missing_on_map"]) + len(result["extra_on_map"])
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s")
+    if failed:
+        print(f"⚠️  VERIFICATION FAILED - {failed} problems")
+        return EXIT_MISMATCH
+    print("✅ VERIFICATION PASSED - All values match!")
+    return EXIT_OK
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify exported premiums against the live map")
+    parser.add_argument("--full", action="store_true",
+                        help="Check every county for every requested combination")
+    parser.add_argument("--year", default="2026", help="Year, or 'all' (--full only)")
+    parser.add_argument("--age", default="50", help="Age, or 'all' (--full only)")
+    parser.add_argument("--metal", default="gold", help="Metal tier, or 'all' (--full only)")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Allowed difference in dollars (default: 0.01)")
+    parser.add_argument("--cache", default="county_data_raw.json", help="Premium JSON file path")
+    parser.add_argument("--report", help="Write every mismatch to this CSV (--full only)")
+    parser.add_argument("--limit", type=int, default=20, help="Mismatches listed in the console report")
+    parser.add_argument("--url", default=URL, help="Map page URL (e.g. a local fixture_server.py)")
+    parser.add_argument("--daemon", help="Lease a warm page from browser_daemon.py at this URL (--full only)")
+    parser.add_argument("--profile", nargs="?", const="profile.json", default=None,
+                        help="Time each phase and hover; write the report here (default: profile.json)")
+
+    args = parser.parse_args()
+    if args.profile:
+        PROFILE.enable()
+
+    try:
+        if args.full:
+            status = asyncio.run(verify_full(args))
+        else:
+            asyncio.run(verify(args.url))
+            status = None
+    finally:
+        if args.profile:
+            PROFILE.write(args.profile)
+    if status is not None:
+        sys.exit(status)
+
+
 if __name__ == "__main__":
-    asyncio.run(verify())
+    main()
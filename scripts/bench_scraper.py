@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+End-to-end scraper benchmark against the offline fixture server.
+Starts fixture_server.py in-process, runs scrape_ideon_map.py once per
+extraction method against it and records wall time, counties/second,
+time to first row, peak memory of the scraper's process tree (Python
+driver, Playwright and the browser) and completeness (rows found /
+counties drawn with data). No network access is needed
+once d3 and topojson are in the asset cache.
+
+Usage:
+    python bench_scraper.py --data county_data_raw.json
+    python bench_scraper.py --methods capture,bulk,centroid --latency-ms 100 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fixture_server import start_fixture
+from premium_index import load_index
+from topology import load_topology
+
+SCRAPER = Path(__file__).resolve().parent / "scrape_ideon_map.py"
+
+METHODS = ["capture", "bulk", "centroid", "svg", "canvas"]
+
+
+def expected_rows(data_file: Path, method: str, year: int, age: int, metal: str) -> int:
+    """Rows a complete run should produce for the method."""
+    index = load_index(data_file)
+    if method == "capture":
+        return len(index)  # The whole file, every combination
+    drawn = {str(g.get("id", "")).zfill(5) for g in load_topology()["objects"]["counties"]["geometries"]}
+    return sum(1 for r in index.select(year, age, metal) if r.get("f") in drawn)
+
+
+def process_tree_rss(root: int) -> int:
+    """Summed RSS in bytes of root and all its descendants (Linux /proc; 0 elsewhere).
+
+    Pages shared between browser processes are counted once per process,
+    so this is an upper bound on the tree's footprint.
+    """
+    children = {}
+    for entry in os.scandir("/proc") if os.path.isdir("/proc") else ():
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat") as f:
+                # The command name may contain spaces; ppid follows the closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    page = os.sysconf("SC_PAGE_SIZE")
+    total, stack = 0, [root]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page
+        except (OSError, IndexError, ValueError):
+            continue
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+class TreeMemorySampler(threading.Thread):
+    """Samples process_tree_rss(pid) in the background and keeps the peak."""
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, process_tree_rss(self.pid))
+            self.stopped.wait(self.interval)
+
+    def stop(self) -> int:
+        self.stopped.set()
+        self.join()
+        return self.peak
+
+
+def run_scraper(url: str, method: str, args, workdir: Path) -> dict:
+    """Run one scraper subprocess; returns its stats plus wall time and peak memory.
+
+    tree_peak_mb is the sampled peak of the summed RSS of the scraper and
+    every process it starts (browser included; None off Linux).
+    max_process_rss_mb is from wait4: the largest single process among the
+    scraper and the descendants it reaped, not a sum.
+    """
+    output = workdir / f"{method}.csv"
+    stats_file = workdir / f"{method}.json"
+    cmd = [
+        sys.executable, str(SCRAPER),
+        "--url", url, "--method", method,
+        "--year", str(args.year), "--age", str(args.age), "--metal", args.metal,
+        "--output", str(output), "--stats-json", str(stats_file),
+    ]
+
+    start = time.perf_counter()
+    log = open(workdir / f"{method}.log", "w")
+    process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+    sampler = TreeMemorySampler(process.pid)
+    sampler.start()
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    finally:
+        tree_peak = sampler.stop()
+        log.close()
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+
+    stats = {}
+    if stats_file.exists():
+        with open(stats_file) as f:
+            stats = json.load(f)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    max_process_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "method": method,
+        "exit_code": process.returncode,
+        "wall_seconds": wall,
+        "rows": stats.get("rows", 0),
+        "first_row_seconds": stats.get("first_row_seconds"),
+        "tree_peak_mb": tree_peak / 1e6 if tree_peak else None,
+        "max_process_rss_mb": max_process_mb,
+        "log": str(workdir / f"{method}.log"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper methods against the fixture server")
+    parser.add_argument("--data", default="county_data_raw.json", help="Premium JSON file the fixture serves")
+    parser.add_argument("--methods", default="capture,bulk,centroid,svg",
+                        help=f"Comma-separated methods (from {', '.join(METHODS)})")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixture response delay")
+    parser.add_argument("--year", type=int, default=2026, help="Plan year")
+    parser.add_argument("--age", type=int, default=50, choices=[27, 50], help="Age")
+    parser.add_argument("--metal", default="gold", choices=["bronze", "silver", "gold"], help="Metal tier")
+    parser.add_argument("--asset-cache", type=str, default=None, help="Asset cache directory (d3/topojson)")
+    parser.add_argument("--output", "-o", help="Append results to this JSON file")
+
+    args = parser.parse_args()
+
+    methods = [m.strip() for m in args.methods.split(",") if m.strip()]
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        parser.error(f"unknown methods: {', '.join(unknown)}")
+
+    data_file = Path(args.data)
+    if not data_file.exists():
+        print(f"Error: Data file not found: {data_file}")
+        sys.exit(1)
+
+    server, url = start_fixture(data_file, latency_ms=args.latency_ms,
+                                cache_dir=Path(args.asset_cache) if args.asset_cache else None)
+    if server.site.missing_libs:
+        print("Error: d3/topojson not cached; run `python fixture_server.py --fetch-libs` once with network")
+        sys.exit(1)
+    print(f"Fixture: {url} (latency {args.latency_ms:.0f} ms)")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_scraper_") as tmp:
+        for method in methods:
+            print(f"Running {method}...", flush=True)
+            result = run_scraper(url, method, args, Path(tmp))
+            expected = expected_rows(data_file, method, args.year, args.age, args.metal)
+            result["expected_rows"] = expected
+            result["completeness"] = result["rows"] / expected if expected else None
+            result["rows_per_second"] = result["rows"] / result["wall_seconds"] if result["wall_seconds"] else None
+            if result["exit_code"]:
+                print(f"  exited with {result['exit_code']}; log:")
+                print(Path(result["log"]).read_text()[-2000:])
+            results.append(result)
+
+    server.shutdown()
+    server.server_close()
+
+    print(f"\n{'Method':<10} {'Rows':>7} {'Complete':>9} {'Wall s':>8} {'Rows/s':>9} {'1st row s':>10} {'Tree MB':>8} {'Proc MB':>8}")
+    print("-" * 75)
+    for r in results:
+        first = f"{r['first_row_seconds']:.2f}" if r["first_row_seconds"] is not None else "-"
+        complete = f"{r['completeness']:.1%}" if r["completeness"] is not None else "-"
+        tree = f"{r['tree_peak_mb']:.0f}" if r["tree_peak_mb"] is not None else "-"
+        print(f"{r['method']:<10} {r['rows']:>7} {complete:>9} {r['wall_seconds']:>8.2f} "
+              f"{r['rows_per_second'] or 0:>9.0f} {first:>10} {tree:>8} {r['max_process_rss_mb']:>8.0f}")
+
+    if args.output:
+        history = []
+        if Path(args.output).exists():
+            with open(args.output) as f:
+                history = json.load(f)
+        history.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "data": str(data_file),
+            "latency_ms": args.latency_ms,
+            "combination": {"year": args.year, "age": args.age, "metal": args.metal},
+            "results": [{k: v for k, v in r.items() if k != "log"} for r in results],
+        })
+        with open(args.output, "w") as f:
+            json.dump(history, f, indent=2)
+        print(f"\nAppended results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the hot data paths: tooltip parsing, filtering, state
+aggregation and CSV export. Runs on synthetic records shaped like
+county_data_raw.json, from one year's worth (~19k rows) up to millions.
+Tooltip parsing runs on a generated corpus covering the label and minus
+sign variants (-, –, −), negative differences and null premiums; each
+parse is checked against the values it was generated from.
+
+Reports rows/second (best of --repeat) and peak traced memory per
+function. --save writes the results as a named baseline; --compare
+prints the change against a saved baseline and flags regressions. A
+slowdown only counts once it exceeds both --threshold and the spread
+between repeated runs, so both need at least MIN_COMPARE_REPEAT runs.
+
+Usage:
+    python bench_suite.py                                  # ~19k rows
+    python bench_suite.py --rows 1000000 --repeat 1                 # no --save/--compare
+    python bench_suite.py --save baseline --baseline-file bench_baseline.json
+    python bench_suite.py --compare baseline --fail-on-regression
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+
+from export_county_data import export_counties_csv, filter_data
+from export_state_data import aggregate_by_state, export_states_csv
+from table_output import write_csv
+from tooltip_parser import parse_money, parse_tooltip
+from topology import STATE_FIPS
+
+# Counties x ages x metals in one year of the real data
+ROWS_PER_YEAR = 18858
+
+YEAR_CODES = list(range(26, 16, -1))
+AGES = [27, 50]
+METALS = ["bronze", "silver", "gold"]
+
+# Share of records with a null premium (the real data has ~1% null individual premiums)
+NULL_RATE = 0.01
+
+# Label dash and minus-sign variants the map (and older captures) have used
+LABEL_DASHES = ["-", "–", "−"]
+MINUS_SIGNS = ["−", "-"]
+
+# Fast functions are looped until one timed sample takes at least this long
+MIN_SAMPLE_SECONDS = 0.05
+
+# Runs needed to estimate the run-to-run spread for --save/--compare
+MIN_COMPARE_REPEAT = 3
+
+DEFAULT_BASELINE_FILE = Path(__file__).resolve().parent.parent / "bench_baseline.json"
+
+
+def synthetic_records(rows: int, seed: int = 0) -> list[dict]:
+    """Raw-shaped premium records: every county x age x metal, year by year, until rows is reached.
+
+    Counties beyond the real ~3,100 per year are added per state once all
+    ten years are used, so large scales keep realistic group sizes.
+    """
+    rng = random.Random(seed)
+    states = list(STATE_FIPS.items())
+    per_year = len(AGES) * len(METALS)
+    counties_needed = max(1, -(-rows // (per_year * len(YEAR_CODES))))
+    counties_per_year = max(counties_needed, min(ROWS_PER_YEAR // per_year, -(-rows // per_year)))
+
+    counties = []
+    for n in range(counties_per_year):
+        st, prefix = states[n % len(states)]
+        number = n // len(states) * 2 + 1
+        counties.append((f"{prefix}{number:03d}" if number < 1000 else f"{prefix}{number}",
+                         f"Synthetic {n} County", st))
+
+    records = []
+    for year in YEAR_CODES:
+        for fips, name, st in counties:
+            base = rng.uniform(300, 1500)
+            for age in AGES:
+                for metal in METALS:
+                    if len(records) >= rows:
+                        return records
+                    factor = (0.55 if age == 27 else 1.0) * {"bronze": 0.8, "silver": 1.0, "gold": 1.2}[metal]
+                    individual = round(base * factor, 2)
+                    small_group = round(individual * rng.uniform(0.7, 1.3), 2)
+                    if rng.random() < NULL_RATE:
+                        individual = None
+                    records.append({
+                        "f": fips, "n": name, "st": st,
+                        "i": individual, "s": small_group,
+                        "d": round(individual - small_group, 2) if individual is not None else None,
+                        "year": year, "age": age, "lvl": metal,
+                    })
+    return records
+
+
+def money_text(value: float | None, minus: str) -> str:
+    """Format like the map's d3.format(',.2f') (nulls render as $0.00)."""
+    text = f"{abs(value or 0):,.2f}"
+    return f"${minus}{text}" if (value or 0) < 0 else f"${text}"
+
+
+def tooltip_corpus(records: list[dict], size: int, seed: int = 0) -> list[tuple[str, dict]]:
+    """(tooltip text, expected parse) pairs covering dash, minus and layout variants."""
+    rng = random.Random(seed)
+    corpus = []
+    for n in range(size):
+        r = records[n % len(records)]
+        dash = LABEL_DASHES[n % len(LABEL_DASHES)]
+        minus = MINUS_SIGNS[(n // len(LABEL_DASHES)) % len(MINUS_SIGNS)]
+        separator = rng.choice(["\n", " ", "  ", "\n  "])
+        text = (f"{r['n']}, {r['st']}{separator}"
+                f"Diff (Ind {dash} Small): {money_text(r['d'], minus)}{separator}"
+                f"Individual: {money_text(r['i'], minus)}  Small Group: {money_text(r['s'], minus)}")
+        corpus.append((text, {
+            "county": r["n"], "state": r["st"],
+            "individual_premium": r["i"] or 0.0,
+            "small_group_premium": r["s"] or 0.0,
+            "difference": r["d"] or 0.0,
+        }))
+    return corpus
+
+
+def measure(func, repeat: int) -> tuple[float, float, float]:
+    """(best seconds per call, spread of the runs, peak traced MB of one extra run).
+
+    Each run calls func enough times to last MIN_SAMPLE_SECONDS, so timer
+    resolution doesn't dominate fast functions. The spread is
+    (median - fastest) / fastest over the repeat runs, so one stalled run
+    doesn't widen it. Memory is traced in
+    its own run since tracemalloc slows allocation down. The functions' own
+    progress output is discarded.
+    """
+    times = []
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func()
+        loops = max(1, int(MIN_SAMPLE_SECONDS / max(time.perf_counter() - start, 1e-9)))
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            times.append((time.perf_counter() - start) / loops)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    best = min(times)
+    return best, (median(times) - best) / best if best else 0.0, peak / (1024 * 1024)
+
+
+def run_suite(rows: int, corpus_size: int, repeat: int, seed: int, workdir: Path) -> dict:
+    """Run every benchmark; returns {name: result}."""
+    print(f"Generating {rows:,} synthetic records...")
+    records = synthetic_records(rows, seed)
+    corpus = tooltip_corpus(records, corpus_size, seed)
+    money = [text.split("Individual: ")[1].split()[0] for text, _ in corpus]
+    scraped = [
+        {"county": r["n"], "state": r["st"], "fips": r["f"], "individual_premium": r["i"],
+         "small_group_premium": r["s"], "difference": r["d"], "year": 2000 + r["year"],
+         "age": r["age"], "metal": r["lvl"]}
+        for r in records
+    ]
+    one_combo = [r for r in records if (r["year"], r["age"], r["lvl"]) == (26, 50, "gold")]
+    with redirect_stdout(io.StringIO()):
+        states = aggregate_by_state(records, year=None)
+
+    # Correctness of the corpus parse (not timed)
+    wrong = 0
+    for text, expected in corpus:
+        parsed = parse_tooltip(text)
+        if not parsed or any(parsed[k] != v for k, v in expected.items()):
+            wrong += 1
+
+    benchmarks = {
+        "parse_money": (lambda: [parse_money(m) for m in money], len(money)),
+        "parse_tooltip": (lambda: [parse_tooltip(text) for text, _ in corpus], len(corpus)),
+        "filter_data": (lambda: sum(1 for _ in filter_data(records, 2026, 50, "gold")), len(records)),
+        "aggregate_by_state": (lambda: aggregate_by_state(records, year=None), len(records)),
+        "export_counties_csv": (lambda: export_counties_csv(one_combo, workdir / "counties.csv"), len(one_combo)),
+        "export_states_csv": (lambda: export_states_csv(states, workdir / "states.csv"), len(states)),
+        "write_csv": (lambda: write_csv(scraped, workdir / "scraped.csv"), len(scraped)),
+    }
+
+    results = {}
+    for name, (func, items) in benchmarks.items():
+        seconds, spread, peak_mb = measure(func, repeat)
+        results[name] = {
+            "items": items,
+            "seconds": seconds,
+            "spread": spread,
+            "items_per_second": items / seconds if seconds else None,
+            "peak_mb": peak_mb,
+        }
+        print(f"  {name:<22} {items:>10,} items  {seconds:>8.3f}s", flush=True)
+    results["parse_tooltip"]["wrong"] = wrong
+    return results
+
+
+def print_results(results: dict, baseline: dict = None, threshold: float = 0.1) -> list[str]:
+    """Table of throughput and memory (with change vs a baseline); returns regressed names.
+
+    A slowdown is a regression only beyond both the threshold and the larger
+    run-to-run spread of the two runs (memory has no such noise).
+    """
+    regressions = []
+    header = f"\n{'Function':<22} {'Items':>10} {'Items/s':>12} {'Peak MB':>9}"
+    if baseline:
+        header += f" {'vs base':>9} {'Noise':>7} {'Mem vs':>8}"
+    print(header)
+    print("-" * (len(header) - 1))
+
+    for name, r in results.items():
+        line = f"{name:<22} {r['items']:>10,} {r['items_per_second'] or 0:>12,.0f} {r['peak_mb']:>9.1f}"
+        base = (baseline or {}).get(name)
+        if base and base.get("items_per_second") and r["items_per_second"]:
+            speed = r["items_per_second"] / base["items_per_second"] - 1
+            memory = r["peak_mb"] / base["peak_mb"] - 1 if base.get("peak_mb") else 0
+            noise = max(r.get("spread", 0), base.get("spread", 0))
+            flag = "  REGRESSION" if speed < -max(threshold, noise) or memory > threshold else ""
+            if flag:
+                regressions.append(name)
+            line += f" {speed:>+9.1%} {noise:>7.1%} {memory:>+8.1%}{flag}"
+        print(line)
+
+    wrong = results.get("parse_tooltip", {}).get("wrong")
+    if wrong is not None:
+        total = results["parse_tooltip"]["items"]
+        print(f"\nTooltip corpus: {total - wrong:,}/{total:,} parsed to the expected values")
+    return regressions
+
+
+def load_baselines(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing, filtering, aggregation and export")
+    parser.add_argument("--rows", type=int, default=ROWS_PER_YEAR, help="Synthetic records (default: one year)")
+    parser.add_argument("--corpus", type=int, default=20000, help="Tooltip texts to parse")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per function (best is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--baseline-file", default=str(DEFAULT_BASELINE_FILE), help="Baselines JSON file")
+    parser.add_argument("--save", metavar="NAME", help="Store the results as this baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against this stored baseline")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Slowdown or memory growth counted as a regression (default: 0.1 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if anything regressed")
+
+    args = parser.parse_args()
+    if args.rows < 1 or args.corpus < 1 or args.repeat < 1:
+        parser.error("--rows, --corpus and --repeat must be positive")
+    if (args.save or args.compare) and args.repeat < MIN_COMPARE_REPEAT:
+        parser.error(f"--save and --compare need --repeat {MIN_COMPARE_REPEAT} or more to measure run-to-run noise")
+
+    baselines = load_baselines(Path(args.baseline_file))
+    baseline = None
+    if args.compare:
+        entry = baselines.get(args.compare)
+        if not entry:
+            print(f"Error: No baseline named {args.compare!r} in {args.baseline_file}")
+            sys.exit(1)
+        if entry["rows"] != args.rows or entry["corpus"] != args.corpus:
+            print(f"Warning: baseline was run with --rows {entry['rows']} --corpus {entry['corpus']}")
+        baseline = entry["results"]
+        if not any("spread" in r for r in baseline.values()):
+            print("Warning: baseline has no run-to-run spread; only --threshold guards against noise")
+
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as tmp:
+        results = run_suite(args.rows, args.corpus, args.repeat, args.seed, Path(tmp))
+
+    regressions = print_results(results, baseline, args.threshold)
+
+    if args.save:
+        baselines[args.save] = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "rows": args.rows,
+            "corpus": args.corpus,
+            "results": results,
+        }
+        with open(args.baseline_file, "w") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"\nSaved baseline {args.save!r} to {args.baseline_file}")
+
+    if regressions:
+        print(f"\nRegressed beyond {args.threshold:.0%} and the run-to-run noise: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
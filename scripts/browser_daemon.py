@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Long-lived warm browser for repeated scraper runs.
+Keeps one Chromium running with a pool of map pages that are already
+loaded and rendered. Scripts lease a page over a small HTTP control API,
+attach to the browser over CDP, use the page and hand it back, skipping
+both the browser launch and the page load. Idle pages are health-checked
+periodically; a page is reloaded after --max-uses leases, when a check
+fails or when a client reports a problem with it.
+
+Control API (JSON):
+    GET  /status                 pool state and CDP endpoint
+    POST /lease                  lease an idle page -> {"page": name, "cdp": url}
+    POST /release?page=NAME      return a page (&ok=0 to have it recycled)
+
+Usage:
+    python browser_daemon.py --pool-size 2 --max-uses 20
+    python scrape_ideon_map.py --daemon http://127.0.0.1:8767 --method bulk
+    python find_data_source.py --daemon http://127.0.0.1:8767
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from asset_cache import DEFAULT_CACHE_DIR, AssetCache, AssetRouter
+from readiness import PATHS_READY_JS, goto_map, wait_for_controls, wait_for_map_ready
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    print("Error: playwright not installed. Run: pip install playwright && playwright install chromium")
+    sys.exit(1)
+
+DEFAULT_CONTROL_PORT = 8767
+DEFAULT_CDP_PORT = 9223
+
+# Leases not returned within this many seconds are reclaimed (client died)
+LEASE_TIMEOUT = 600
+
+
+class PagePool:
+    """Pre-loaded map pages in one browser, handed out one client at a time."""
+
+    def __init__(self, browser, url: str, size: int, max_uses: int, assets: AssetRouter = None):
+        self.browser = browser
+        self.url = url
+        self.size = size
+        self.max_uses = max_uses
+        self.assets = assets
+        self.slots = {}  # name -> {"page", "state", "uses", "leased_at", "loaded_at", "load_seconds"}
+        self.recycled = 0
+        self.leases = 0
+
+    async def start(self):
+        await asyncio.gather(*(self.open_slot(f"ichra-pool-{i}") for i in range(self.size)))
+
+    async def open_slot(self, name: str):
+        """(Re)create a page, load the map and tag it with window.name for clients to find."""
+        from scrape_ideon_map import new_map_page
+
+        old = self.slots.get(name)
+        self.slots[name] = {"page": None, "state": "loading", "uses": 0, "leased_at": None,
+                            "loaded_at": None, "load_seconds": None}
+        if old and old["page"]:
+            try:
+                await old["page"].context.close()
+            except Exception:
+                pass
+
+        start = time.perf_counter()
+        try:
+            page = await new_map_page(self.browser, self.assets)
+            await goto_map(page, self.url)
+            await wait_for_controls(page)
+            await wait_for_map_ready(page, quiet=True)
+            await page.evaluate("window.scrollBy(0, 400)")
+            await page.evaluate(f"window.name = {json.dumps(name)}")
+        except Exception as e:
+            print(f"[pool] {name}: load failed: {e}")
+            self.slots[name]["state"] = "failed"
+            return
+
+        self.slots[name].update(page=page, state="idle", loaded_at=time.time(),
+                                load_seconds=time.perf_counter() - start)
+        print(f"[pool] {name}: ready in {self.slots[name]['load_seconds']:.1f}s")
+
+    def lease(self) -> str | None:
+        for name, slot in self.slots.items():
+            if slot["state"] == "idle":
+                slot["state"] = "leased"
+                slot["leased_at"] = time.time()
+                self.leases += 1
+                return name
+        return None
+
+    async def release(self, name: str, ok: bool = True):
+        slot = self.slots.get(name)
+        if not slot or slot["state"] != "leased":
+            return
+        slot["uses"] += 1
+        if not ok or slot["uses"] >= self.max_uses:
+            self.recycled += 1
+            await self.open_slot(name)
+        else:
+            slot["state"] = "idle"
+
+    async def healthy(self, slot: dict) -> bool:
+        page = slot["page"]
+        if page is None or page.is_closed():
+            return False
+        try:
+            return bool(await asyncio.wait_for(page.evaluate(PATHS_READY_JS), timeout=5))
+        except Exception:
+            return False
+
+    async def check(self):
+        """Recycle failed or unhealthy idle pages and reclaim expired leases."""
+        for name, slot in list(self.slots.items()):
+            if slot["state"] == "leased" and time.time() - slot["leased_at"] > LEASE_TIMEOUT:
+                print(f"[pool] {name}: lease expired, reclaiming")
+                slot["state"] = "failed"
+            if slot["state"] == "failed" or (slot["state"] == "idle" and not await self.healthy(slot)):
+                print(f"[pool] {name}: unhealthy, reloading")
+                self.recycled += 1
+                await self.open_slot(name)
+
+    def status(self) -> dict:
+        return {
+            "url": self.url,
+            "size": self.size,
+            "max_uses": self.max_uses,
+            "leases": self.leases,
+            "recycled": self.recycled,
+            "pages": {
+                name: {k: v for k, v in slot.items() if k != "page"}
+                for name, slot in self.slots.items()
+            },
+        }
+
+
+def make_handler(pool: PagePool, loop, cdp_url: str):
+    """Control API handler; pool calls run on the daemon's event loop."""
+    def on_loop(coro, timeout: float = 120):
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    async def lease():
+        return pool.lease()
+
+    async def status():
+        return pool.status()
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if urlsplit(self.path).path == "/status":
+                self.reply(200, {"cdp": cdp_url, **on_loop(status())})
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            if url.path == "/lease":
+                name = on_loop(lease())
+                if name:
+                    self.reply(200, {"page": name, "cdp": cdp_url})
+                else:
+                    self.reply(503, {"error": "no idle page"})
+            elif url.path == "/release":
+                name = params.get("page", [""])[0]
+                ok = params.get("ok", ["1"])[0] != "0"
+                # Recycling reloads the page; don't make the client wait for it
+                asyncio.run_coroutine_threadsafe(pool.release(name, ok), loop)
+                self.reply(200, {"page": name, "released": True})
+            else:
+                self.reply(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+async def run_daemon(args):
+    assets = None
+    if not args.no_asset_routing:
+        cache = AssetCache(Path(args.asset_cache))
+        cache.seed()
+        assets = AssetRouter(cache)
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=not args.debug,
+            args=[f"--remote-debugging-port={args.cdp_port}", "--disable-web-security"],
+        )
+        cdp_url = f"http://127.0.0.1:{args.cdp_port}"
+
+        pool = PagePool(browser, args.url, args.pool_size, args.max_uses, assets)
+        await pool.start()
+
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(pool, asyncio.get_running_loop(), cdp_url))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Browser daemon: control http://127.0.0.1:{args.port}, CDP {cdp_url}, "
+              f"{args.pool_size} page(s), recycle after {args.max_uses} uses")
+
+        try:
+            while True:
+                await asyncio.sleep(args.health_interval)
+                await pool.check()
+        finally:
+            server.shutdown()
+            await browser.close()
+
+
+# Client side -----------------------------------------------------------------
+
+def _post(url: str, timeout: float = 10) -> dict | None:
+    request = urllib.request.Request(url, method="POST", data=b"")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.load(response)
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+async def lease_page(playwright, daemon_url: str):
+    """Lease a warm page; returns (browser, page, name) or None if the daemon can't provide one."""
+    lease = await asyncio.to_thread(_post, f"{daemon_url.rstrip('/')}/lease")
+    if not lease:
+        return None
+
+    try:
+        browser = await playwright.chromium.connect_over_cdp(lease["cdp"])
+    except Exception as e:
+        print(f"Could not attach to the browser daemon: {e}")
+        await release_page(daemon_url, lease["page"], ok=True)
+        return None
+
+    for context in browser.contexts:
+        for page in context.pages:
+            try:
+                if await page.evaluate("window.name") == lease["page"]:
+                    return browser, page, lease["page"]
+            except Exception:
+                continue
+
+    await browser.close()
+    await release_page(daemon_url, lease["page"], ok=False)
+    return None
+
+
+async def release_page(daemon_url: str, name: str, ok: bool = True):
+    """Hand a leased page back (ok=False asks the daemon to reload it)."""
+    await asyncio.to_thread(_post, f"{daemon_url.rstrip('/')}/release?page={name}&ok={int(ok)}")
+
+
+async def lease_or_launch(playwright, daemon_url: str | None, headless: bool = True, **page_options):
+    """Lease a warm page from daemon_url, else launch a browser with a blank page.
+
+    Returns (browser, page, name); name is None for a launched browser, whose
+    page still has to be loaded. Leased pages are already on the map.
+    """
+    if daemon_url:
+        leased = await lease_page(playwright, daemon_url)
+        if leased:
+            print(f"Using warm page {leased[2]} from {daemon_url}")
+            return leased
+        print(f"No page available from {daemon_url}, launching a browser")
+
+    browser = await playwright.chromium.launch(headless=headless)
+    return browser, await browser.new_page(**page_options), None
+
+
+def main():
+    from scrape_ideon_map import URL
+
+    parser = argparse.ArgumentParser(description="Warm browser daemon with a pool of loaded map pages")
+    parser.add_argument("--port", type=int, default=DEFAULT_CONTROL_PORT, help="Control API port")
+    parser.add_argument("--cdp-port", type=int, default=DEFAULT_CDP_PORT, help="Chrome remote debugging port")
+    parser.add_argument("--pool-size", type=int, default=2, help="Pre-loaded pages")
+    parser.add_argument("--max-uses", type=int, default=20, help="Reload a page after this many leases")
+    parser.add_argument("--health-interval", type=float, default=30, help="Seconds between health checks")
+    parser.add_argument("--url", default=URL, help="Map page URL")
+    parser.add_argument("--asset-cache", type=str, default=str(DEFAULT_CACHE_DIR), help="Asset cache directory")
+    parser.add_argument("--no-asset-routing", action="store_true", help="Don't block or cache page resources")
+    parser.add_argument("--debug", action="store_true", help="Show the browser window")
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_daemon(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
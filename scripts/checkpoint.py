@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Append-only JSONL checkpoint for long hover scrapes.
+Every scraped row and every hovered path, grid cell or county point is
+appended (and flushed) as it is processed, so a crash or browser
+disconnect loses at most the batch in flight. With --resume the scraper
+reloads the file, rebuilds its seen sets, skips points already covered
+and combinations already finished, and merges the checkpoint rows into
+the final output.
+
+Lines are one of:
+    {"row": {...}}                                    a scraped row (year/age/metal included)
+    {"combo": [2026, 50, "gold"], "covered": [...]}   point keys hovered for a combination
+    {"combo": [2026, 50, "gold"], "done": true}       a combination fully extracted
+
+Usage:
+    python checkpoint.py ideon_county_data.csv.checkpoint.jsonl   # summarize a checkpoint
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+
+def combo_of(args) -> tuple:
+    return (args.year, args.age, args.metal)
+
+
+def row_key(row: dict) -> tuple:
+    return (row.get("county"), row.get("state"), row.get("year"), row.get("age"), row.get("metal"))
+
+
+def ends_with_newline(path: Path) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) == b"\n"
+
+
+def read_checkpoint(path: Path) -> tuple[list[dict], dict, set]:
+    """(rows, covered point keys per combo, finished combos) from a checkpoint file."""
+    rows, covered, done = [], defaultdict(set), set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from a crash mid-write
+            if "row" in entry:
+                rows.append(entry["row"])
+                continue
+            combo = tuple(entry.get("combo", ()))
+            if entry.get("done"):
+                done.add(combo)
+            covered[combo].update(entry.get("covered", ()))
+    return rows, covered, done
+
+
+class Checkpoint:
+    """Rows and covered points of a (possibly resumed) scrape, mirrored to a JSONL file."""
+
+    def __init__(self, path: Path, resume: bool = False, overwrite: bool = False):
+        self.path = Path(path)
+        if not resume and not overwrite and self.path.exists() and self.path.stat().st_size:
+            raise FileExistsError(f"{self.path} holds an interrupted run; "
+                                  f"pass --resume to continue it or --overwrite-checkpoint to start over")
+        self.rows = []                   # Rows loaded from a previous run
+        self.covered = defaultdict(set)  # combo -> point keys
+        self.done = set()                # combos fully extracted
+
+        if resume and self.path.exists():
+            self.rows, self.covered, self.done = read_checkpoint(self.path)
+            print(f"Resuming from {self.path}: {len(self.rows)} rows, "
+                  f"{sum(len(k) for k in self.covered.values())} covered points, "
+                  f"{len(self.done)} finished combinations")
+        torn = resume and self.path.exists() and self.path.stat().st_size and not ends_with_newline(self.path)
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if torn:
+            self.file.write("\n")  # Keep the torn line from swallowing the next entry
+
+    def write(self, entry: dict):
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def add_row(self, row: dict):
+        self.write({"row": row})
+
+    def cover(self, args, keys: list[str]):
+        """Record hovered points (with or without a tooltip) for the current combination."""
+        if keys:
+            self.covered[combo_of(args)].update(keys)
+            self.write({"combo": list(combo_of(args)), "covered": list(keys)})
+
+    def finish(self, args):
+        self.done.add(combo_of(args))
+        self.write({"combo": list(combo_of(args)), "done": True})
+
+    def is_covered(self, args, key: str) -> bool:
+        return key in self.covered.get(combo_of(args), ())
+
+    def is_done(self, args) -> bool:
+        return combo_of(args) in self.done
+
+    def seen(self, args) -> set:
+        """County keys already scraped for the current combination."""
+        year, age, metal = combo_of(args)
+        return {
+            f"{r['county']}, {r['state']}" for r in self.rows
+            if r.get("year") == year and r.get("age") == age and r.get("metal") == metal
+        }
+
+    def merge(self, results: list[dict]) -> list[dict]:
+        """Resumed rows plus this run's results, deduplicated per county and combination."""
+        merged = {}
+        for row in self.rows + results:
+            merged.setdefault(row_key(row), row)
+        return list(merged.values())
+
+    def close(self):
+        self.file.close()
+
+    def discard(self):
+        """Close and delete the file once the output has been written."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a scraper checkpoint file")
+    parser.add_argument("path", help="Checkpoint JSONL file")
+    args = parser.parse_args()
+
+    rows, covered, done = read_checkpoint(Path(args.path))
+
+    counts = defaultdict(int)
+    for row in rows:
+        counts[(row.get("year"), row.get("age"), row.get("metal"))] += 1
+    combos = sorted(set(counts) | set(covered) | done, key=str)
+
+    print(f"{'Combination':<18} {'Rows':>6} {'Covered':>8} {'Done':>5}")
+    for combo in combos:
+        label = "/".join(str(c) for c in combo)
+        print(f"{label:<18} {counts.get(combo, 0):>6} {len(covered.get(combo, ())):>8} "
+              f"{'yes' if combo in done else '':>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped columnar cache for county premium records.
+Converts county_data_raw.json once into fixed-width NumPy columns
+(dictionary-encoded names/states/tiers, float32 premiums) stored next to
+it, then opens them with mmap so exporters skip JSON parsing entirely.
+The cache is rebuilt automatically when the source JSON changes.
+
+Usage:
+    python columnar_cache.py --cache county_data_raw.json            # build if stale
+    python columnar_cache.py --cache county_data_raw.json --rebuild  # force rebuild
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from premium_stream import stream_records
+
+FORMAT_VERSION = 1
+
+# Column name -> (record key, dtype); "dict" columns hold codes into meta["dictionaries"]
+COLUMNS = {
+    "fips": ("f", "int32"),
+    "name": ("n", "dict"),
+    "state": ("st", "dict"),
+    "year": ("year", "uint8"),
+    "age": ("age", "uint8"),
+    "metal": ("lvl", "dict"),
+    "individual": ("i", "float32"),
+    "small_group": ("s", "float32"),
+    "difference": ("d", "float32"),
+}
+
+CODE_DTYPE = "int32"
+
+
+def columnar_available() -> bool:
+    """True if numpy is importable."""
+    return np is not None
+
+
+def cache_dir_for(json_path: Path) -> Path:
+    """Columnar cache directory for a JSON file (county_data_raw.json -> county_data_raw.json.cols)."""
+    return json_path.with_name(json_path.name + ".cols")
+
+
+def source_fingerprint(json_path: Path) -> dict:
+    """Cheap change detection for the source file."""
+    stat = json_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_columnar_cache(json_path: Path, cache_dir: Path = None) -> Path:
+    """Stream the JSON once and write one .npy file per column plus meta.json."""
+    if np is None:
+        raise RuntimeError("numpy not installed. Run: pip install numpy")
+
+    cache_dir = cache_dir or cache_dir_for(json_path)
+    start = time.perf_counter()
+
+    dictionaries = {name: {} for name, (_, kind) in COLUMNS.items() if kind == "dict"}
+    values = {name: [] for name in COLUMNS}
+
+    for record in stream_records(json_path):
+        for name, (key, kind) in COLUMNS.items():
+            value = record.get(key)
+            if kind == "dict":
+                codes = dictionaries[name]
+                value = codes.setdefault(value or "", len(codes))
+            elif name == "fips":
+                value = int(value) if value and str(value).isdigit() else -1
+            elif kind == "float32":
+                value = float("nan") if value is None else value
+            else:
+                value = value or 0
+            values[name].append(value)
+
+    tmp_dir = cache_dir.with_name(cache_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    for name, (_, kind) in COLUMNS.items():
+        dtype = CODE_DTYPE if kind == "dict" else kind
+        np.save(tmp_dir / f"{name}.npy", np.asarray(values[name], dtype=dtype))
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "source": source_fingerprint(json_path),
+        "rows": len(values["fips"]),
+        # Code -> string, in code order
+        "dictionaries": {name: list(codes) for name, codes in dictionaries.items()},
+    }
+    with open(tmp_dir / "meta.json", "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+    print(f"Built columnar cache {cache_dir} ({meta['rows']} rows, {time.perf_counter() - start:.1f}s)")
+    return cache_dir
+
+
+class ColumnarPremiums:
+    """Read-only view over a columnar cache; columns are memory-mapped arrays."""
+
+    def __init__(self, cache_dir: Path):
+        with open(cache_dir / "meta.json") as f:
+            self.meta = json.load(f)
+        self.dictionaries = self.meta["dictionaries"]
+        self.columns = {name: np.load(cache_dir / f"{name}.npy", mmap_mode="r") for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return self.meta["rows"]
+
+    def mask(self, year: int = None, age: int = None, metal: str = None):
+        """Boolean row mask for the year/age/metal filters (None = all rows)."""
+        if not (year or age or metal):
+            return None
+
+        mask = np.ones(len(self), dtype=bool)
+        if year:
+            mask &= self.columns["year"] == year - 2000
+        if age:
+            mask &= self.columns["age"] == age
+        if metal:
+            codes = [i for i, m in enumerate(self.dictionaries["metal"]) if m.lower() == metal.lower()]
+            mask &= np.isin(self.columns["metal"], codes)
+        return mask
+
+    def state_county_order(self, indexes):
+        """indexes reordered by state, then county name (file order within a county)."""
+        def ranks(name: str):
+            # Dictionary codes follow first appearance; rank them alphabetically
+            values = self.dictionaries[name]
+            rank = np.empty(len(values), dtype=np.int64)
+            rank[sorted(range(len(values)), key=values.__getitem__)] = np.arange(len(values))
+            return rank[self.columns[name][indexes]]
+
+        # lexsort is stable and sorts by the last key first
+        return indexes[np.lexsort((ranks("name"), ranks("state")))]
+
+    def records(self, mask=None, sort: bool = False) -> Iterator[dict]:
+        """Yield rows as dicts with the raw JSON keys (f, n, st, i, s, d, year, age, lvl).
+
+        sort=True yields them by state, then county, without building the dicts first.
+        """
+        indexes = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        if sort:
+            indexes = self.state_county_order(indexes)
+        names = self.dictionaries["name"]
+        states = self.dictionaries["state"]
+        metals = self.dictionaries["metal"]
+        cols = self.columns
+
+        def money(value) -> float | None:
+            # float32 -> nearest cent recovers the source's 2-decimal values
+            return None if np.isnan(value) else round(float(value), 2)
+
+        for i in indexes:
+            fips = int(cols["fips"][i])
+            yield {
+                "f": str(fips).zfill(5) if fips >= 0 else "",
+                "n": names[cols["name"][i]],
+                "st": states[cols["state"][i]],
+                "i": money(cols["individual"][i]),
+                "s": money(cols["small_group"][i]),
+                "d": money(cols["difference"][i]),
+                "year": int(cols["year"][i]),
+                "age": int(cols["age"][i]),
+                "lvl": metals[cols["metal"][i]],
+            }
+
+    def select(self, year: int = None, age: int = None, metal: str = None, sort: bool = False) -> Iterator[dict]:
+        """Yield the rows matching the filters (by state, then county, if sort is set)."""
+        return self.records(self.mask(year, age, metal), sort)
+
+
+def is_fresh(json_path: Path, cache_dir: Path) -> bool:
+    """True if the cache exists and was built from the current source file."""
+    meta_path = cache_dir / "meta.json"
+    if not meta_path.exists():
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return meta.get("version") == FORMAT_VERSION and meta.get("source") == source_fingerprint(json_path)
+
+
+def open_columnar(json_path: Path, rebuild: bool = False) -> ColumnarPremiums:
+    """Open the columnar cache for a JSON file, (re)building it if stale."""
+    cache_dir = cache_dir_for(json_path)
+    if rebuild or not is_fresh(json_path, cache_dir):
+        build_columnar_cache(json_path, cache_dir)
+    return ColumnarPremiums(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar premium cache")
+    parser.add_argument("--cache", type=str, default="county_data_raw.json", help="Source JSON file path")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the cache is fresh")
+
+    args = parser.parse_args()
+
+    if np is None:
+        print("Error: numpy not installed. Run: pip install numpy")
+        return
+
+    json_path = Path(args.cache)
+    if not json_path.exists():
+        print(f"Error: Cache file not found: {json_path}")
+        return
+
+    premiums = open_columnar(json_path, rebuild=args.rebuild)
+    print(f"Rows: {len(premiums)}")
+    for name, values in premiums.dictionaries.items():
+        print(f"  {name}: {len(values)} distinct values")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Batch (lat, lon) -> county FIPS -> premium lookup without a GIS stack.
+Decodes the bundled county TopoJSON with NumPy and buckets every county
+polygon into a uniform lon/lat grid. Points are resolved by testing them
+against only the counties whose polygons overlap their cell (even-odd
+ray casting, vectorized over the points of a cell). Resolved FIPS are
+then joined to premiums through the PremiumIndex.
+
+Usage:
+    python county_locator.py locate --points employees.csv --cache county_data_raw.json --output priced.csv
+    python county_locator.py locate --points employees.csv --lat-col latitude --lon-col longitude --metal silver
+    python county_locator.py bench --points 100000
+"""
+
+import argparse
+import csv
+import random
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from premium_index import load_index
+from topology import (COUNTIES_TOPOLOGY, STATE_FIPS, county_polygons, decode_arcs, interior_point, load_topology,
+                      ring_area)
+
+# Grid cell size in degrees; smaller cells mean fewer candidate counties per point
+DEFAULT_CELL_SIZE = 0.25
+
+# Points tested against one county at a time (bounds the points x edges matrix)
+CHUNK_POINTS = 2048
+
+STATE_BY_FIPS = {prefix: st for st, prefix in STATE_FIPS.items()}
+
+PRICED_FIELDS = ["fips", "county", "state", "individual_premium", "small_group_premium", "difference"]
+
+
+def decode_arcs_array(topology: dict) -> list:
+    """Dequantize and delta-decode every arc into an (n, 2) lon/lat array (NumPy decode_arcs)."""
+    arcs = topology["arcs"]
+    lengths = np.fromiter((len(arc) for arc in arcs), dtype=np.int64, count=len(arcs))
+    positions = np.array([p[:2] for arc in arcs for p in arc], dtype=np.float64)
+
+    transform = topology.get("transform")
+    if transform:
+        # One running sum over every arc, minus the total reached before each arc started
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        totals = np.cumsum(positions, axis=0)
+        base = np.zeros_like(totals)
+        base[starts[1:]] = totals[starts[1:] - 1]
+        positions = (totals - base[np.repeat(starts, lengths)]) * transform["scale"] + transform["translate"]
+    return np.split(positions, np.cumsum(lengths)[:-1])
+
+
+def ring_array(ring: list[int], arcs: list):
+    """A ring's arcs stitched into one closed (n, 2) array (reversed for negative indexes)."""
+    return np.concatenate([arcs[i] if i >= 0 else arcs[~i][::-1] for i in ring])
+
+
+class CountyLocator:
+    """Uniform-grid spatial index over county polygons."""
+
+    def __init__(self, topology_path: Path = COUNTIES_TOPOLOGY, cell_size: float = DEFAULT_CELL_SIZE):
+        if np is None:
+            raise RuntimeError("numpy not installed. Run: pip install numpy")
+
+        start = time.perf_counter()
+        topology = load_topology(topology_path)
+        arcs = decode_arcs_array(topology)
+
+        self.cell_size = cell_size
+        self.fips = []
+        self.names = []
+        self.edges = []  # Per county: (x0, y0, y1, dx/dy) arrays over every ring edge
+        boxes = []       # (county number, min lon, min lat, max lon, max lat) per polygon
+
+        for geometry in topology["objects"]["counties"]["geometries"]:
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["arcs"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["arcs"]
+            else:
+                continue
+
+            number = len(self.fips)
+            rings = []
+            for polygon in polygons:
+                outer = ring_array(polygon[0], arcs)
+                boxes.append((number, *outer.min(axis=0), *outer.max(axis=0)))
+                rings.extend([outer] + [ring_array(hole, arcs) for hole in polygon[1:]])
+
+            a = np.concatenate([ring[:-1] for ring in rings])
+            b = np.concatenate([ring[1:] for ring in rings])
+            dy = b[:, 1] - a[:, 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                slope = np.where(dy != 0, (b[:, 0] - a[:, 0]) / dy, 0.0)
+            self.edges.append((a[:, 0], a[:, 1], b[:, 1], slope))
+            self.fips.append(str(geometry.get("id", "")).zfill(5))
+            self.names.append(geometry.get("properties", {}).get("name", ""))
+
+        self._build_grid(np.array(boxes))
+        self.build_seconds = time.perf_counter() - start
+
+    def _build_grid(self, boxes):
+        """CSR table of the counties whose polygon boxes overlap each grid cell."""
+        self.x_min, self.y_min = boxes[:, 1].min(), boxes[:, 2].min()
+        self.nx = int((boxes[:, 3].max() - self.x_min) // self.cell_size) + 1
+        self.ny = int((boxes[:, 4].max() - self.y_min) // self.cell_size) + 1
+
+        pairs = []
+        for number, x0, y0, x1, y1 in boxes:
+            ix = np.arange(int((x0 - self.x_min) // self.cell_size), int((x1 - self.x_min) // self.cell_size) + 1)
+            iy = np.arange(int((y0 - self.y_min) // self.cell_size), int((y1 - self.y_min) // self.cell_size) + 1)
+            cells = (iy[:, None] * self.nx + ix[None, :]).ravel()
+            pairs.append(cells * len(self.fips) + int(number))
+
+        pairs = np.unique(np.concatenate(pairs))
+        cells = pairs // len(self.fips)
+        self.cell_counties = (pairs % len(self.fips)).astype(np.int32)
+        self.cell_start = np.searchsorted(cells, np.arange(self.nx * self.ny + 1))
+
+    def _contains(self, number: int, x, y):
+        """Even-odd test of points against every ring of one county."""
+        x0, y0, y1, slope = self.edges[number]
+        inside = np.empty(len(x), dtype=bool)
+        for start in range(0, len(x), CHUNK_POINTS):
+            px = x[start:start + CHUNK_POINTS, None]
+            py = y[start:start + CHUNK_POINTS, None]
+            crosses = ((y0 > py) != (y1 > py)) & (px < x0 + (py - y0) * slope)
+            inside[start:start + CHUNK_POINTS] = np.count_nonzero(crosses, axis=1) % 2 == 1
+        return inside
+
+    def locate(self, lats, lons):
+        """County numbers for arrays of points (-1 where no county contains the point)."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        result = np.full(len(lats), -1, dtype=np.int32)
+
+        with np.errstate(invalid="ignore"):
+            ix = np.floor((lons - self.x_min) / self.cell_size)
+            iy = np.floor((lats - self.y_min) / self.cell_size)
+        valid = np.flatnonzero((ix >= 0) & (ix < self.nx) & (iy >= 0) & (iy < self.ny))
+        cells = iy[valid].astype(np.int64) * self.nx + ix[valid].astype(np.int64)
+
+        # Visit each occupied cell once with all of its points
+        order = np.argsort(cells, kind="stable")
+        cells, valid = cells[order], valid[order]
+        unique, first = np.unique(cells, return_index=True)
+        for cell, group in zip(unique, np.split(valid, first[1:])):
+            for number in self.cell_counties[self.cell_start[cell]:self.cell_start[cell + 1]]:
+                inside = self._contains(number, lons[group], lats[group])
+                result[group[inside]] = number
+                group = group[~inside]
+                if not len(group):
+                    break
+        return result
+
+    def locate_fips(self, lats, lons) -> list[str | None]:
+        """FIPS codes for arrays of points (None where no county contains the point)."""
+        return [self.fips[n] if n >= 0 else None for n in self.locate(lats, lons)]
+
+
+def price_points(locator: CountyLocator, index, lats, lons, year: int, age: int, metal: str) -> list[dict]:
+    """Resolve points to counties and attach that county's premiums for one combination."""
+    records = {r.get("f"): r for r in index.select(year, age, metal)}
+    rows = []
+    for number in locator.locate(lats, lons):
+        if number < 0:
+            rows.append(dict.fromkeys(PRICED_FIELDS))
+            continue
+        fips = locator.fips[number]
+        record = records.get(fips, {})
+        rows.append({
+            "fips": fips,
+            "county": record.get("n") or locator.names[number],
+            "state": record.get("st") or STATE_BY_FIPS.get(fips[:2], ""),
+            "individual_premium": record.get("i"),
+            "small_group_premium": record.get("s"),
+            "difference": record.get("d"),
+        })
+    return rows
+
+
+def read_points(path: Path, lat_col: str, lon_col: str) -> tuple[list[dict], list[float], list[float]]:
+    """Rows of a CSV plus its latitude/longitude columns (NaN where unparseable)."""
+    def number(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float("nan")
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    if rows and (lat_col not in rows[0] or lon_col not in rows[0]):
+        raise ValueError(f"{path} needs '{lat_col}' and '{lon_col}' columns (see --lat-col/--lon-col)")
+    return rows, [number(r[lat_col]) for r in rows], [number(r[lon_col]) for r in rows]
+
+
+def run_locate(args):
+    points_path = Path(args.points)
+    cache_path = Path(args.cache)
+    for path in (points_path, cache_path):
+        if not path.exists():
+            print(f"Error: File not found: {path}")
+            sys.exit(1)
+
+    try:
+        rows, lats, lons = read_points(points_path, args.lat_col, args.lon_col)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    locator = CountyLocator(Path(args.topology), args.cell_size)
+    index = load_index(cache_path)
+    print(f"Index: {len(locator.fips)} counties, {locator.nx}x{locator.ny} cells, built in {locator.build_seconds:.2f}s")
+
+    start = time.perf_counter()
+    priced = price_points(locator, index, lats, lons, args.year, args.age, args.metal)
+    elapsed = time.perf_counter() - start
+
+    unresolved = sum(1 for p in priced if p["fips"] is None)
+    print(f"Priced {len(priced)} points in {elapsed:.3f}s ({len(priced) / elapsed if elapsed else 0:,.0f} points/s); "
+          f"{unresolved} outside every county")
+
+    fieldnames = list(rows[0].keys()) if rows else [args.lat_col, args.lon_col]
+    fieldnames += [f for f in PRICED_FIELDS if f not in fieldnames]
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row, result in zip(rows, priced):
+            writer.writerow({**row, **result})
+    print(f"Wrote {len(priced)} rows to {args.output}")
+
+
+def run_bench(args):
+    locator = CountyLocator(Path(args.topology), args.cell_size)
+    print(f"Index: {len(locator.fips)} counties, {locator.nx}x{locator.ny} cells, built in {locator.build_seconds:.2f}s")
+
+    # Accuracy: every county's own interior point must resolve back to it
+    topology = load_topology(Path(args.topology))
+    counties = county_polygons(topology, decode_arcs(topology))
+    # (the simplified atlas collapses a few tiny counties, e.g. Falls Church, to zero area)
+    degenerate = {fips for fips, c in counties.items()
+                  if not any(abs(ring_area(p[0])) > 0 for p in c["polygons"] if p)}
+    interior = {fips: interior_point(c["polygons"]) for fips, c in counties.items() if fips not in degenerate}
+    interior = {fips: p for fips, p in interior.items() if p}
+    found = locator.locate_fips([p[1] for p in interior.values()], [p[0] for p in interior.values()])
+    correct = sum(1 for fips, got in zip(interior, found) if got == fips)
+    print(f"Interior points: {correct}/{len(interior)} resolved to their own county "
+          f"({len(degenerate)} zero-area counties skipped)")
+
+    # Throughput: points spread like addresses (around county interior points)
+    random.seed(args.seed)
+    centers = list(interior.values())
+    sample = [random.choice(centers) for _ in range(args.points)]
+    lons = [lon + random.uniform(-0.05, 0.05) for lon, _ in sample]
+    lats = [lat + random.uniform(-0.05, 0.05) for _, lat in sample]
+
+    start = time.perf_counter()
+    numbers = locator.locate(lats, lons)
+    elapsed = time.perf_counter() - start
+    print(f"Located {args.points:,} points in {elapsed:.3f}s ({args.points / elapsed:,.0f} points/s), "
+          f"{int((numbers < 0).sum())} outside every county")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve lat/lon points to counties and premiums")
+    parser.add_argument("--topology", type=str, default=str(COUNTIES_TOPOLOGY), help="TopoJSON file path")
+    parser.add_argument("--cell-size", type=float, default=DEFAULT_CELL_SIZE, help="Grid cell size in degrees")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    locate_parser = sub.add_parser("locate", help="Price a CSV of points")
+    locate_parser.add_argument("--points", required=True, help="CSV with latitude/longitude columns")
+    locate_parser.add_argument("--lat-col", default="lat", help="Latitude column name")
+    locate_parser.add_argument("--lon-col", default="lon", help="Longitude column name")
+    locate_parser.add_argument("--cache", default="county_data_raw.json", help="Premium JSON file path")
+    locate_parser.add_argument("--year", type=int, default=2026, help="Plan year")
+    locate_parser.add_argument("--age", type=int, default=50, choices=[27, 50], help="Age")
+    locate_parser.add_argument("--metal", default="gold", choices=["bronze", "silver", "gold"], help="Metal tier")
+    locate_parser.add_argument("--output", "-o", default="priced_points.csv", help="Output CSV path")
+
+    bench_parser = sub.add_parser("bench", help="Check accuracy and measure points/second")
+    bench_parser.add_argument("--points", type=int, default=100000, help="Random points to locate")
+    bench_parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    if np is None:
+        print("Error: numpy not installed. Run: pip install numpy")
+        sys.exit(1)
+
+    if args.command == "locate":
+        run_locate(args)
+    else:
+        run_bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Diff two county premium snapshots.
+Joins an older and a newer export on (fips, year, age, metal) with a hash
+map in one pass over each file, then reports added and removed rows,
+premiums that moved by more than a tolerance, and the drift of each
+state's mean premiums. Works on county exports and scraper output.
+
+Usage:
+    python diff_snapshots.py data/ideon_counties_2026_2026-01-16.csv data/ideon_counties_2026.csv
+    python diff_snapshots.py old.csv new.csv --tolerance 0.05 --output changes.json
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+PREMIUM_COLUMNS = ["individual_premium", "small_group_premium", "difference"]
+
+# Scraper column -> county export column
+COLUMN_ALIASES = {"state": "state_abbr", "metal": "metal_tier"}
+
+
+def money(value: str) -> float | None:
+    """CSV cell -> float (blank -> None)."""
+    return float(value) if value not in (None, "") else None
+
+
+def cents(value: float) -> int:
+    """Dollars -> whole cents, so 10.10 - 10.05 compares as exactly 5."""
+    return round(value * 100)
+
+
+def load_snapshot(path: Path) -> dict[tuple, dict]:
+    """Index a snapshot by (fips, year, age, metal); rows without a FIPS are keyed by county name."""
+    rows = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            for alias, column in COLUMN_ALIASES.items():
+                if alias in row and column not in row:
+                    row[column] = row.pop(alias)
+            fips = row.get("fips") or f"{row.get('county', '')}, {row.get('state_abbr', '')}"
+            key = (fips, row.get("year", ""), row.get("age", ""), row.get("metal_tier", "").lower())
+            rows[key] = {
+                "county": row.get("county", ""),
+                "state": row.get("state_abbr", ""),
+                **{column: money(row.get(column)) for column in PREMIUM_COLUMNS},
+            }
+    return rows
+
+
+def key_dict(key: tuple) -> dict:
+    """(fips, year, age, metal) -> dict for the change file."""
+    fips, year, age, metal = key
+    return {"fips": fips, "year": year, "age": age, "metal": metal}
+
+
+def diff_snapshots(old: dict[tuple, dict], new: dict[tuple, dict], tolerance: float = 0.0) -> dict:
+    """Compare two indexed snapshots (see load_snapshot).
+
+    Premiums are compared in integer cents, so a move of exactly the
+    tolerance is not reported whatever the float representation.
+    """
+    tolerance_cents = cents(tolerance)
+    added, changed = [], []
+    unchanged = 0
+
+    # state -> column -> [old sum, old count, new sum, new count] over rows present in both
+    sums = defaultdict(lambda: {column: [0.0, 0, 0.0, 0] for column in PREMIUM_COLUMNS})
+    state_counts = defaultdict(lambda: {"added": 0, "removed": 0, "changed": 0})
+
+    for key, row in new.items():
+        before = old.get(key)
+        if before is None:
+            added.append({**key_dict(key), **row})
+            state_counts[row["state"]]["added"] += 1
+            continue
+
+        deltas = {}
+        state_sums = sums[row["state"]]
+        for column in PREMIUM_COLUMNS:
+            a, b = before[column], row[column]
+            if a is not None:
+                state_sums[column][0] += a
+                state_sums[column][1] += 1
+            if b is not None:
+                state_sums[column][2] += b
+                state_sums[column][3] += 1
+            delta = cents(b) - cents(a) if a is not None and b is not None else None
+            if (a is None) != (b is None) or (delta is not None and abs(delta) > tolerance_cents):
+                deltas[column] = {"old": a, "new": b, "delta": delta / 100 if delta is not None else None}
+
+        if deltas:
+            changed.append({**key_dict(key), "county": row["county"], "state": row["state"], "changes": deltas})
+            state_counts[row["state"]]["changed"] += 1
+        else:
+            unchanged += 1
+
+    removed = []
+    for key, row in old.items():
+        if key not in new:
+            removed.append({**key_dict(key), **row})
+            state_counts[row["state"]]["removed"] += 1
+
+    state_drift = {}
+    for state in sorted(set(sums) | set(state_counts)):
+        drift = dict(state_counts[state])
+        for column, (old_sum, old_n, new_sum, new_n) in (sums[state].items() if state in sums else ()):
+            old_mean = old_sum / old_n if old_n else None
+            new_mean = new_sum / new_n if new_n else None
+            drift[column] = {
+                "old_mean": round(old_mean, 2) if old_mean is not None else None,
+                "new_mean": round(new_mean, 2) if new_mean is not None else None,
+                "drift": round(new_mean - old_mean, 2) if old_mean is not None and new_mean is not None else None,
+            }
+        state_drift[state] = drift
+
+    return {
+        "summary": {
+            "old_rows": len(old),
+            "new_rows": len(new),
+            "added": len(added),
+            "removed": len(removed),
+            "changed": len(changed),
+            "unchanged": unchanged,
+            "tolerance": tolerance,
+        },
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "state_drift": state_drift,
+    }
+
+
+def print_report(result: dict, limit: int = 10):
+    """Human-readable summary of a diff result."""
+    summary = result["summary"]
+    print(f"Rows: {summary['old_rows']} -> {summary['new_rows']}  "
+          f"added {summary['added']}, removed {summary['removed']}, "
+          f"changed {summary['changed']} (tolerance {summary['tolerance']}), unchanged {summary['unchanged']}")
+
+    for label in ("added", "removed"):
+        rows = result[label]
+        if rows:
+            print(f"\n{label.capitalize()} ({len(rows)}):")
+            for r in rows[:limit]:
+                print(f"  {r['fips']:<6} {r['county']}, {r['state']}  {r['year']} age {r['age']} {r['metal']}")
+            if len(rows) > limit:
+                print(f"  ... and {len(rows) - limit} more")
+
+    if result["changed"]:
+        print(f"\nChanged ({len(result['changed'])}):")
+        for r in result["changed"][:limit]:
+            parts = [f"{column} {c['old']} -> {c['new']}" for column, c in r["changes"].items()]
+            print(f"  {r['fips']:<6} {r['county']}, {r['state']}  {r['year']} age {r['age']} {r['metal']}: "
+                  + "; ".join(parts))
+        if len(result["changed"]) > limit:
+            print(f"  ... and {len(result['changed']) - limit} more")
+
+    drifting = {
+        state: d for state, d in result["state_drift"].items()
+        if d["added"] or d["removed"] or d["changed"]
+    }
+    if drifting:
+        print(f"\n{'State':<6} {'Added':>6} {'Removed':>8} {'Changed':>8} {'Ind drift':>10} {'SG drift':>9}")
+        for state, d in drifting.items():
+            ind = (d.get("individual_premium") or {}).get("drift")
+            sg = (d.get("small_group_premium") or {}).get("drift")
+            fmt = lambda v: f"{v:+.2f}" if v is not None else "-"
+            print(f"{state:<6} {d['added']:>6} {d['removed']:>8} {d['changed']:>8} {fmt(ind):>10} {fmt(sg):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two county premium snapshots")
+    parser.add_argument("old", help="Older snapshot CSV")
+    parser.add_argument("new", help="Newer snapshot CSV")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="Ignore premium changes up to this many dollars (default: 0)")
+    parser.add_argument("--output", "-o", help="Write the change file (JSON) here")
+    parser.add_argument("--limit", type=int, default=10, help="Rows listed per section in the report")
+    parser.add_argument("--fail-on-change", action="store_true",
+                        help="Exit with status 1 if anything was added, removed or changed")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    old_path, new_path = Path(args.old), Path(args.new)
+    for path in (old_path, new_path):
+        if not path.exists():
+            print(f"Error: File not found: {path}")
+            sys.exit(2)
+
+    result = diff_snapshots(load_snapshot(old_path), load_snapshot(new_path), args.tolerance)
+    result["old"] = str(old_path)
+    result["new"] = str(new_path)
+    result["generated_at"] = datetime.now().isoformat(timespec="seconds")
+
+    print_report(result, args.limit)
+    print(f"\nCompared in {time.perf_counter() - start:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote change file to {args.output}")
+
+    summary = result["summary"]
+    if args.fail_on_change and (summary["added"] or summary["removed"] or summary["changed"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
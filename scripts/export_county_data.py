@@ -6,16 +6,29 @@ Fetches data directly from Ideon's JSON endpoint (no scraping needed).
 Usage:
     python export_county_data.py --year 2026 --output counties_2026.csv
     python export_county_data.py --year 2026 --age 50 --metal gold --output filtered.csv
+    python export_county_data.py --all-years --partition-by year,state --output-dir data
+    python export_county_data.py --all-years --format parquet --partition-by year,state   # -> premiums_parquet/
+    python export_county_data.py --year 2026 --format parquet --output counties_2026.parquet
 """
 
 import argparse
 import csv
-import json
-import urllib.request
+from collections import OrderedDict
+from itertools import chain
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from columnar_cache import ColumnarPremiums, columnar_available, open_columnar
+from premium_db import count_rows, select_records
+from premium_stream import CountingIterator, download_file, record_filter, stream_records
+from table_output import (COUNTY_COLUMNS, FORMATS, PARTITION_KEYS, arrow_available, output_path,
+                          parse_partition_keys, write_table)
 
 DATA_URL = "https://ideonapi.com/wp-content/uploads/json-data/county_lowest_premiums_all_14-12-2025.json"
 
+# Default --partition-by root for parquet; kept apart from the CSV snapshots in data/
+PARQUET_DATASET_DIR = "premiums_parquet"
+
 # US state FIPS to name mapping
 FIPS_TO_STATE = {
     "01": "Alabama", "02": "Alaska", "04": "Arizona", "05": "Arkansas",
@@ -34,86 +47,171 @@ FIPS_TO_STATE = {
 }
 
 
-def fetch_data(cache_file: Path = None) -> list:
-    """Fetch data from Ideon's JSON endpoint or cache."""
+def fetch_data(cache_file: Path = None) -> Iterator[dict]:
+    """Stream records from the cache, or from Ideon's JSON endpoint (filling the cache)."""
     if cache_file and cache_file.exists():
         print(f"Loading from cache: {cache_file}")
-        with open(cache_file) as f:
-            return json.load(f)
-
-    print(f"Fetching data from {DATA_URL}...")
-    with urllib.request.urlopen(DATA_URL, timeout=60) as response:
-        data = json.loads(response.read().decode())
-
-    if cache_file:
-        print(f"Caching to: {cache_file}")
-        with open(cache_file, "w") as f:
-            json.dump(data, f)
-
-    return data
-
-
-def filter_data(data: list, year: int = None, age: int = None, metal: str = None) -> list:
-    """Filter data by year, age, and/or metal tier."""
-    filtered = data
+    else:
+        print(f"Fetching data from {DATA_URL}...")
+        if cache_file:
+            print(f"Caching to: {cache_file}")
+
+    return stream_records(cache_file, DATA_URL)
+
+
+def filter_data(data: Iterable[dict], year: int = None, age: int = None,
+                metal: str = None) -> Iterator[dict]:
+    """Filter data by year, age, and/or metal tier (lazily, in a single pass)."""
+    predicate = record_filter(year, age, metal)
+    return filter(predicate, data) if predicate else iter(data)
+
+
+FIELDNAMES = [
+    "fips",
+    "county",
+    "state_abbr",
+    "state_name",
+    "individual_premium",
+    "small_group_premium",
+    "difference",
+    "year",
+    "age",
+    "metal_tier"
+]
+
+def county_row(record: dict) -> dict:
+    """Convert a raw JSON record to an output row."""
+    fips = record.get("f", "")
+    state_fips = fips[:2] if len(fips) >= 2 else ""
+
+    return {
+        "fips": fips,
+        "county": record.get("n", ""),
+        "state_abbr": record.get("st", ""),
+        "state_name": FIPS_TO_STATE.get(state_fips, ""),
+        "individual_premium": record.get("i"),
+        "small_group_premium": record.get("s"),
+        "difference": record.get("d"),
+        "year": 2000 + record.get("year", 0),
+        "age": record.get("age"),
+        "metal_tier": record.get("lvl", "").capitalize()
+    }
+
+
+def export_counties_csv(data: Iterable[dict], output_path: str, presorted: bool = False):
+    """Export county data to CSV, sorted by state, then county.
+
+    Pass presorted=True when data already arrives in that order (the columnar
+    cache and the database sort it); rows are then written as they stream
+    past. Otherwise the filtered records are held in memory to be sorted.
+    """
+    rows = iter(data if presorted else sorted(data, key=lambda x: (x.get("st", ""), x.get("n", ""))))
+
+    first = next(rows, None)
+    if first is None:
+        print("No data to export!")
+        return 0
 
-    if year:
-        year_code = year - 2000  # 2026 -> 26
-        filtered = [r for r in filtered if r.get("year") == year_code]
+    count = 0
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
 
-    if age:
-        filtered = [r for r in filtered if r.get("age") == age]
+        for row in chain([first], rows):
+            writer.writerow(county_row(row))
+            count += 1
 
-    if metal:
-        filtered = [r for r in filtered if r.get("lvl", "").lower() == metal.lower()]
+    return count
 
-    return filtered
 
+def export_counties_table(data: Iterable[dict], path: Path, fmt: str, partition_by: list[str] = None) -> int:
+    """Export county data as typed Parquet/Feather (optionally a partitioned Parquet dataset)."""
+    rows = [county_row(r) for r in sorted(data, key=lambda x: (x.get("st", ""), x.get("n", "")))]
 
-def export_counties_csv(data: list, output_path: str):
-    """Export county data to CSV."""
-    if not data:
+    if not rows:
         print("No data to export!")
         return 0
 
-    fieldnames = [
-        "fips",
-        "county",
-        "state_abbr",
-        "state_name",
-        "individual_premium",
-        "small_group_premium",
-        "difference",
-        "year",
-        "age",
-        "metal_tier"
-    ]
-
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        # Sort by state, then county
-        sorted_data = sorted(data, key=lambda x: (x.get("st", ""), x.get("n", "")))
-
-        for row in sorted_data:
-            fips = row.get("f", "")
-            state_fips = fips[:2] if len(fips) >= 2 else ""
-
-            writer.writerow({
-                "fips": fips,
-                "county": row.get("n", ""),
-                "state_abbr": row.get("st", ""),
-                "state_name": FIPS_TO_STATE.get(state_fips, ""),
-                "individual_premium": row.get("i"),
-                "small_group_premium": row.get("s"),
-                "difference": row.get("d"),
-                "year": 2000 + row.get("year", 0),
-                "age": row.get("age"),
-                "metal_tier": row.get("lvl", "").capitalize()
-            })
+    columns = [PARTITION_KEYS[key] for key in partition_by] if partition_by else None
+    write_table(rows, path, fmt, FIELDNAMES, COUNTY_COLUMNS, partition_by=columns)
+    return len(rows)
+
+
+class PartitionWriter:
+    """Routes rows to root/key=value/.../part.csv with a bounded set of open files.
+
+    Files are kept open in least-recently-used order; when more than
+    max_open partitions are active the oldest is closed and reopened in
+    append mode if it gets more rows.
+    """
+
+    def __init__(self, root: Path, keys: list[str], max_open: int = 64):
+        self.root = Path(root)
+        self.keys = keys
+        self.max_open = max_open
+        self.open_files = OrderedDict()  # path -> (file, writer)
+        self.row_counts = {}             # path -> rows written
+        self.reopened = 0
+
+    def path_for(self, row: dict) -> Path:
+        parts = [f"{key}={row[PARTITION_KEYS[key]]}" for key in self.keys]
+        return self.root.joinpath(*parts, "part.csv")
+
+    def writer_for(self, path: Path):
+        if path in self.open_files:
+            self.open_files.move_to_end(path)
+            return self.open_files[path][1]
+
+        if len(self.open_files) >= self.max_open:
+            _, (old_file, _) = self.open_files.popitem(last=False)
+            old_file.close()
+
+        new_partition = path not in self.row_counts
+        if new_partition:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.row_counts[path] = 0
+        else:
+            self.reopened += 1
+
+        f = open(path, "w" if new_partition else "a", newline="", encoding="utf-8")
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        if new_partition:
+            writer.writeheader()
+        self.open_files[path] = (f, writer)
+        return writer
+
+    def write(self, row: dict):
+        path = self.path_for(row)
+        self.writer_for(path).writerow(row)
+        self.row_counts[path] += 1
+
+    def close(self):
+        for f, _ in self.open_files.values():
+            f.close()
+        self.open_files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_partitioned(data: Iterable[dict], root: Path, keys: list[str], max_open: int = 64) -> int:
+    """Write every record to its partition in a single pass (rows keep source order)."""
+    count = 0
+    with PartitionWriter(root, keys, max_open) as partitions:
+        for record in data:
+            partitions.write(county_row(record))
+            count += 1
+
+    if not count:
+        print("No data to export!")
+        return 0
 
-    return len(sorted_data)
+    print(f"Wrote {len(partitions.row_counts)} partitions under {root}/ "
+          f"({partitions.reopened} reopened after eviction, max {max_open} open)")
+    return count
 
 
 def main():
@@ -121,32 +219,96 @@ def main():
     parser.add_argument("--year", type=int, default=2026, help="Year (2017-2026)")
     parser.add_argument("--age", type=int, choices=[27, 50], help="Age filter (27 or 50)")
     parser.add_argument("--metal", choices=["bronze", "silver", "gold"], help="Metal tier filter")
+    parser.add_argument("--all-years", action="store_true", help="Export every year (ignores --year)")
     parser.add_argument("--output", "-o", default="ideon_counties_2026.csv", help="Output CSV path")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="Output format (parquet/feather need pyarrow)")
+    parser.add_argument("--partition-by", type=parse_partition_keys, metavar="KEYS",
+                        help="Write one CSV per partition, e.g. year,state (keys: year, state, age, metal)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Root directory for --partition-by output (default: data for csv, "
+                             f"{PARQUET_DATASET_DIR} for parquet)")
+    parser.add_argument("--max-open-files", type=int, default=64,
+                        help="Partition files kept open at once (default: 64)")
     parser.add_argument("--cache", type=str, help="Cache JSON file path")
     parser.add_argument("--all-combinations", action="store_true",
                         help="Export all age/metal combinations (separate rows)")
+    parser.add_argument("--no-columnar", action="store_true",
+                        help="Stream the JSON instead of using the memory-mapped columnar cache")
+    parser.add_argument("--from-db", type=str, metavar="DB",
+                        help="Read from a SQLite store built by premium_db.py instead of the JSON")
 
     args = parser.parse_args()
 
-    # Fetch data
+    if args.format != "csv" and not arrow_available():
+        parser.error("pyarrow not installed. Run: pip install pyarrow")
+    if args.format == "feather" and args.partition_by:
+        parser.error("--partition-by supports csv and parquet output only")
+
+    year = None if args.all_years else args.year
     cache_path = Path(args.cache) if args.cache else Path("county_data_raw.json")
-    data = fetch_data(cache_path)
-    print(f"Total records loaded: {len(data)}")
 
-    # Filter data
-    filtered = filter_data(data, year=args.year, age=args.age, metal=args.metal)
-    print(f"Records after filtering (year={args.year}, age={args.age}, metal={args.metal}): {len(filtered)}")
+    # A plain CSV export is written in state/county order; the database and the
+    # columnar cache can hand rows back in that order so they stream to disk
+    sort = args.format == "csv" and not args.partition_by
+
+    if args.from_db:
+        # Indexed query against the SQLite store (see premium_db.py)
+        print(f"Loading from database: {args.from_db}")
+        data = None
+        filtered = CountingIterator(select_records(args.from_db, year=year, age=args.age, metal=args.metal,
+                                                   sort=sort))
+    elif columnar_available() and not args.no_columnar:
+        # Memory-mapped columns: filtering is a vectorized mask, no JSON parsing
+        if not cache_path.exists():
+            print(f"Fetching data from {DATA_URL}...")
+            download_file(DATA_URL, cache_path)
+        premiums = open_columnar(cache_path)
+        print(f"Loading from columnar cache: {cache_path}")
+        data = premiums
+        filtered = CountingIterator(premiums.select(year=year, age=args.age, metal=args.metal, sort=sort))
+    else:
+        # Fetch data (streamed; nothing is held in memory until after filtering)
+        data = CountingIterator(fetch_data(cache_path))
+        filtered = CountingIterator(filter_data(data, year=year, age=args.age, metal=args.metal))
+
+    # Summary stats are collected as the filtered records stream past
+    states = set()
+    counties = set()
+
+    def track(records):
+        for r in records:
+            states.add(r.get("st"))
+            counties.add(r.get("f"))
+            yield r
 
     # Export
-    count = export_counties_csv(filtered, args.output)
-    print(f"\nExported {count} rows to {args.output}")
-
-    # Summary stats
-    if filtered:
-        states = len(set(r.get("st") for r in filtered))
-        counties = len(set(r.get("f") for r in filtered))
-        print(f"  States: {states}")
-        print(f"  Unique counties (FIPS): {counties}")
+    if args.format != "csv":
+        output = Path(args.output_dir or PARQUET_DATASET_DIR) if args.partition_by \
+            else output_path(args.output, args.format)
+        try:
+            count = export_counties_table(track(filtered), output, args.format, args.partition_by)
+        except FileExistsError as e:
+            print(f"Error: {e}")
+            return
+    elif args.partition_by:
+        output = Path(args.output_dir or "data")
+        count = export_partitioned(track(filtered), output, args.partition_by, args.max_open_files)
+    else:
+        output = args.output
+        count = export_counties_csv(track(filtered), output, presorted=args.from_db is not None
+                                    or isinstance(data, ColumnarPremiums))
+    if data is None:
+        total = count_rows(args.from_db)
+    else:
+        total = len(data) if hasattr(data, "__len__") else data.count
+    print(f"Total records loaded: {total}")
+    print(f"Records after filtering (year={year or 'all'}, age={args.age}, metal={args.metal}): {filtered.count}")
+    print(f"\nExported {count} rows to {output}")
+
+    if count:
+        print(f"  States: {len(states)}")
+        print(f"  Unique counties (FIPS): {len(counties)}")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,34 @@
 #!/usr/bin/env python3
 """
 Export Ideon state-level aggregated premium data to CSV.
-Aggregates county data by state (mean of all counties).
+Aggregates county data by state: mean, median, min/max, p10/p90 and null
+counts of each premium field over the state's counties.
 
 Usage:
     python export_state_data.py --year 2026 --output states_2026.csv
+    python export_state_data.py --all-years --output states_all_years.csv
+    python export_state_data.py --all-years --format parquet --output states.parquet
 """
 
 import argparse
 import csv
-import json
-from collections import defaultdict
+import sys
 from pathlib import Path
 from statistics import mean
+from typing import Iterable, Iterator
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    print("Error: pandas not installed. Run: pip install pandas")
+    sys.exit(1)
+
+from columnar_cache import ColumnarPremiums, columnar_available, open_columnar
+from premium_db import count_rows, select_records
+from premium_stream import CountingIterator, record_filter, stream_records
+from table_output import (FORMATS, PARTITION_KEYS, STATE_COLUMNS, arrow_available, output_path,
+                          parse_partition_keys, write_table)
 
 DATA_URL = "https://ideonapi.com/wp-content/uploads/json-data/county_lowest_premiums_all_14-12-2025.json"
 
@@ -34,52 +50,139 @@ STATE_NAMES = {
 }
 
 
-def load_data(cache_file: Path) -> list:
-    """Load data from cache file."""
+def load_data(cache_file: Path) -> Iterator[dict] | None:
+    """Stream records from the cache file (None if it doesn't exist)."""
     if not cache_file.exists():
         print(f"Error: Cache file not found: {cache_file}")
         print("Run export_county_data.py first to download the data.")
-        return []
+        return None
 
     print(f"Loading from: {cache_file}")
-    with open(cache_file) as f:
-        return json.load(f)
-
-
-def aggregate_by_state(data: list, year: int) -> list:
-    """Aggregate county data to state level (mean per state/age/metal combo)."""
-    year_code = year - 2000
-
-    # Filter to year
-    year_data = [r for r in data if r.get("year") == year_code]
-
-    # Group by state + age + metal
-    groups = defaultdict(list)
-    for row in year_data:
-        key = (row.get("st"), row.get("age"), row.get("lvl"))
-        groups[key].append(row)
-
-    # Calculate means
-    results = []
-    for (state, age, metal), rows in groups.items():
-        # Filter out None values for each field
-        individual_vals = [r["i"] for r in rows if r.get("i") is not None]
-        small_group_vals = [r["s"] for r in rows if r.get("s") is not None]
-        diff_vals = [r["d"] for r in rows if r.get("d") is not None]
-
-        results.append({
-            "state_abbr": state,
-            "state_name": STATE_NAMES.get(state, state),
-            "age": age,
-            "metal_tier": metal.capitalize() if metal else "",
-            "individual_premium_avg": round(mean(individual_vals), 2) if individual_vals else None,
-            "small_group_premium_avg": round(mean(small_group_vals), 2) if small_group_vals else None,
-            "difference_avg": round(mean(diff_vals), 2) if diff_vals else None,
-            "county_count": len(rows),
-            "year": year
+    return stream_records(cache_file)
+
+
+# Record key -> output column prefix
+PREMIUM_FIELDS = {
+    "i": "individual_premium",
+    "s": "small_group_premium",
+    "d": "difference",
+}
+
+# Extra statistics per premium field, after the original *_avg columns
+STAT_SUFFIXES = ["median", "min", "max", "p10", "p90", "nulls"]
+
+
+def premiums_frame(data: Iterable[dict] | ColumnarPremiums, year: int = None) -> pd.DataFrame:
+    """Load the records for one year (or all years) into a DataFrame.
+
+    Columnar caches are read straight from their memory-mapped columns;
+    other sources are filtered as they stream in.
+    """
+    columns = ["st", "year", "age", "lvl", *PREMIUM_FIELDS]
+
+    if isinstance(data, ColumnarPremiums):
+        mask = data.mask(year=year)
+        cols = data.columns if mask is None else {name: col[mask] for name, col in data.columns.items()}
+        return pd.DataFrame({
+            "st": pd.Categorical.from_codes(cols["state"], data.dictionaries["state"]),
+            "year": cols["year"].astype("int16"),
+            "age": cols["age"].astype("int16"),
+            "lvl": pd.Categorical.from_codes(cols["metal"], data.dictionaries["metal"]),
+            # float32 -> cents, matching the values in the JSON
+            "i": np.round(cols["individual"].astype("float64"), 2),
+            "s": np.round(cols["small_group"].astype("float64"), 2),
+            "d": np.round(cols["difference"].astype("float64"), 2),
         })
 
-    return results
+    records = filter(record_filter(year=year), data) if year else data
+
+    frame = pd.DataFrame.from_records(records, columns=columns)
+    frame[list(PREMIUM_FIELDS)] = frame[list(PREMIUM_FIELDS)].astype("float64")
+    return frame.astype({"st": "category", "lvl": "category"})
+
+
+def mean_like_statistics(frame: pd.DataFrame, grouped) -> pd.DataFrame:
+    """Group means that round to the same cents as statistics.mean.
+
+    The vectorized mean can land on the other side of a half cent than
+    the exact mean, so those few groups are recomputed exactly.
+    """
+    means = grouped.mean()
+    half_cent = ((means * 100) % 1 - 0.5).abs() < 1e-6
+    indices = grouped.indices
+    for row, col in zip(*np.nonzero(half_cent.to_numpy())):
+        values = frame[means.columns[col]].iloc[indices[means.index[row]]].dropna()
+        means.iat[row, col] = mean(values.tolist())
+    return means
+
+
+def aggregate_by_state(data: Iterable[dict] | ColumnarPremiums, year: int = None) -> list:
+    """Aggregate county data to state level per year/state/age/metal combo.
+
+    All groups are computed in one vectorized groupby. Null premiums (e.g.
+    Alaska boroughs without an individual plan) are skipped by the
+    statistics and reported in the *_nulls columns. Pass year=None to
+    aggregate every year at once.
+    """
+    frame = premiums_frame(data, year)
+    if frame.empty:
+        return []
+
+    fields = list(PREMIUM_FIELDS)
+    grouped = frame.groupby(["year", "st", "age", "lvl"], observed=True, sort=False)[fields]
+
+    stats = {
+        "avg": mean_like_statistics(frame, grouped),
+        "median": grouped.median(),
+        "min": grouped.min(),
+        "max": grouped.max(),
+        "p10": grouped.quantile(0.1),
+        "p90": grouped.quantile(0.9),
+    }
+    sizes = grouped.size()
+    nulls = sizes.to_frame().values - grouped.count()
+
+    table = pd.DataFrame(index=sizes.index)
+    for key, prefix in PREMIUM_FIELDS.items():
+        for stat, values in stats.items():
+            name = "difference_avg" if (key, stat) == ("d", "avg") else f"{prefix}_{stat}"
+            # Python's round() (correctly rounded) rather than numpy's scale-and-rint
+            table[name] = values[key].map(lambda v: round(v, 2), na_action="ignore")
+        table[f"{prefix}_nulls"] = nulls[key]
+    table["county_count"] = sizes
+    table = table.reset_index()
+
+    table["state_abbr"] = table["st"].astype(str)
+    table["state_name"] = table["state_abbr"].map(lambda st: STATE_NAMES.get(st, st))
+    table["metal_tier"] = table["lvl"].astype(str).str.capitalize()
+    table["year"] = table["year"].astype(int) + 2000
+    table = table.drop(columns=["st", "lvl"])
+
+    # NaN (no values in the group) -> None, like the CSV's blank cells
+    return [
+        {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items()}
+        for row in table.astype(object).to_dict("records")
+    ]
+
+
+FIELDNAMES = [
+    "state_abbr",
+    "state_name",
+    "individual_premium_avg",
+    "small_group_premium_avg",
+    "difference_avg",
+    "county_count",
+    "year",
+    "age",
+    "metal_tier"
+] + [f"{prefix}_{stat}" for prefix in PREMIUM_FIELDS.values() for stat in STAT_SUFFIXES]
+
+
+def sort_states(data: list) -> list:
+    """Sort by state, then year."""
+    return sorted(data, key=lambda x: (
+        x.get("state_abbr", ""), x.get("year", 0), x.get("age", 0), x.get("metal_tier", "")
+    ))
 
 
 def export_states_csv(data: list, output_path: str):
@@ -88,51 +191,85 @@ def export_states_csv(data: list, output_path: str):
         print("No data to export!")
         return 0
 
-    fieldnames = [
-        "state_abbr",
-        "state_name",
-        "individual_premium_avg",
-        "small_group_premium_avg",
-        "difference_avg",
-        "county_count",
-        "year",
-        "age",
-        "metal_tier"
-    ]
-
     with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
 
-        # Sort by state
-        sorted_data = sorted(data, key=lambda x: (x.get("state_abbr", ""), x.get("age", 0), x.get("metal_tier", "")))
+        sorted_data = sort_states(data)
         writer.writerows(sorted_data)
 
     return len(sorted_data)
 
 
+def export_states_table(data: list, path: Path, fmt: str, partition_by: list[str] = None) -> int:
+    """Export state data as typed Parquet/Feather (optionally a partitioned Parquet dataset)."""
+    if not data:
+        print("No data to export!")
+        return 0
+
+    columns = [PARTITION_KEYS[key] for key in partition_by] if partition_by else None
+    write_table(sort_states(data), path, fmt, FIELDNAMES, STATE_COLUMNS, partition_by=columns)
+    return len(data)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Export Ideon state-level premium data to CSV")
     parser.add_argument("--year", type=int, default=2026, help="Year (2017-2026)")
+    parser.add_argument("--all-years", action="store_true", help="Aggregate every year in the data")
     parser.add_argument("--output", "-o", default="ideon_states_2026.csv", help="Output CSV path")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="Output format (parquet/feather need pyarrow)")
+    parser.add_argument("--partition-by", type=parse_partition_keys, metavar="KEYS",
+                        help="Parquet only: write a dataset directory partitioned by e.g. year,state")
     parser.add_argument("--cache", type=str, default="county_data_raw.json", help="Cache JSON file path")
+    parser.add_argument("--no-columnar", action="store_true",
+                        help="Stream the JSON instead of using the memory-mapped columnar cache")
+    parser.add_argument("--from-db", type=str, metavar="DB",
+                        help="Read from a SQLite store built by premium_db.py instead of the JSON")
 
     args = parser.parse_args()
+    if args.format != "csv" and not arrow_available():
+        parser.error("pyarrow not installed. Run: pip install pyarrow")
+    if args.partition_by and args.format != "parquet":
+        parser.error("--partition-by requires --format parquet")
+
+    year = None if args.all_years else args.year
 
     # Load data
-    data = load_data(Path(args.cache))
-    if not data:
-        return
+    cache_path = Path(args.cache)
+    if args.from_db:
+        print(f"Loading from database: {args.from_db}")
+        total = count_rows(args.from_db)
+        state_data = aggregate_by_state(select_records(args.from_db, year=year), year)
+    elif columnar_available() and not args.no_columnar and cache_path.exists():
+        premiums = open_columnar(cache_path)
+        print(f"Loading from columnar cache: {cache_path}")
+        total = len(premiums)
+        state_data = aggregate_by_state(premiums, year)
+    else:
+        data = load_data(cache_path)
+        if data is None:
+            return
 
-    print(f"Total records loaded: {len(data)}")
+        data = CountingIterator(data)
+        state_data = aggregate_by_state(data, year)
+        total = data.count
 
-    # Aggregate by state
-    state_data = aggregate_by_state(data, args.year)
+    print(f"Total records loaded: {total}")
     print(f"State-level aggregations: {len(state_data)}")
 
     # Export
-    count = export_states_csv(state_data, args.output)
-    print(f"\nExported {count} rows to {args.output}")
+    if args.format == "csv":
+        output = args.output
+        count = export_states_csv(state_data, output)
+    else:
+        output = output_path(args.output, args.format)
+        try:
+            count = export_states_table(state_data, output, args.format, args.partition_by)
+        except FileExistsError as e:
+            print(f"Error: {e}")
+            return
+    print(f"\nExported {count} rows to {output}")
 
     # Summary
     states = len(set(r["state_abbr"] for r in state_data))
@@ -2,23 +2,32 @@
 """
 Quick script to find where the premium data lives.
 Fetches page source and looks for embedded data structures.
+
+Usage:
+    python find_data_source.py
+    python find_data_source.py --daemon http://127.0.0.1:8767
 """
 
+import argparse
 import asyncio
 import json
 import re
 from playwright.async_api import async_playwright
 
+from browser_daemon import lease_or_launch, release_page
+from readiness import goto_map, wait_for_map_ready
+
 URL = "https://ideonapi.com/ideon-ichra-insights-by-state/"
 
-async def find_data():
+async def find_data(daemon: str = None):
     print("Looking for embedded premium data...")
 
     all_json_responses = []
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+        browser, page, page_name = await lease_or_launch(p, daemon)
+        # A leased page is reloaded (at the daemon's URL) so its JSON responses can be captured
+        url = page.url if page_name else URL
 
         # Capture ALL responses
         async def capture_response(response):
@@ -42,8 +51,8 @@ async def find_data():
 
         print(f"Loading page (30s timeout)...")
         try:
-            await page.goto(URL, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(5)  # Let JS execute
+            await goto_map(page, url, timeout=30000)
+            await wait_for_map_ready(page)  # Atlas JSON loaded and map drawn
         except Exception as e:
             print(f"Page load issue (continuing): {e}")
 
@@ -138,6 +147,9 @@ async def find_data():
                 print(f"  Saved to: {filename}")
 
         await browser.close()
+        if page_name:
+            # Navigated away from the daemon's setup; have it reload the page
+            await release_page(daemon, page_name, ok=False)
 
         # Save full HTML for inspection
         with open("page_source.html", "w") as f:
@@ -145,4 +157,6 @@ async def find_data():
         print(f"\nSaved full page source to page_source.html ({len(html)} chars)")
 
 if __name__ == "__main__":
-    asyncio.run(find_data())
+    parser = argparse.ArgumentParser(description="Look for the map's embedded or fetched premium data")
+    parser.add_argument("--daemon", help="Use a browser_daemon.py page at this URL instead of launching Chromium")
+    asyncio.run(find_data(parser.parse_args().daemon))
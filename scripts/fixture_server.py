@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the Ideon map page.
+Rebuilds the map page from page_source.html (styles, title and dropdowns)
+and largest_script.txt (the map script), with its data and atlas URLs
+pointed at this server, then serves it together with a premium JSON file,
+the captured us-atlas files and d3/topojson from the local asset cache.
+Every response can be delayed to simulate network latency.
+
+d3 and topojson are not in the repo: they are served from .asset_cache
+(filled by any online scraper run, or `--fetch-libs` once).
+
+Usage:
+    python fixture_server.py --data county_data_raw.json --port 8766
+    python fixture_server.py --data county_data_raw.json --latency-ms 150
+    python scrape_ideon_map.py --url http://127.0.0.1:8766/ideon-ichra-insights-by-state/
+"""
+
+import argparse
+import re
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from asset_cache import REPO_ROOT, SEED_FILES, AssetCache
+
+DEFAULT_PORT = 8766
+
+PAGE_PATH = "/ideon-ichra-insights-by-state/"
+
+# Same file name as the live site so readiness.DATA_FILE_PATTERN matches
+DATA_PATH = "/wp-content/uploads/json-data/county_lowest_premiums_all_14-12-2025.json"
+
+# Local path -> the upstream URL whose cached copy is served
+LIBRARIES = {
+    "/lib/d3.v7.min.js": "https://d3js.org/d3.v7.min.js",
+    "/lib/topojson@3": "https://unpkg.com/topojson@3",
+}
+ATLAS = {f"/atlas/{url.rsplit('/', 1)[-1]}": url for url in SEED_FILES}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en-US">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>Ideon ICHRA Insights by State (fixture)</title>
+  {style}
+</head>
+<body>
+  {header}
+  <div id="ichra-map"></div>
+  <div id="ichra-tip" class="ichra-tooltip"></div>
+  <div id="ichra-legend"></div>
+
+  <div class="ichra-map-wrap">
+    {controls}
+  </div>
+
+  <script src="/lib/d3.v7.min.js"></script>
+  <script src="/lib/topojson@3"></script>
+
+  <script>
+{script}
+  </script>
+</body>
+</html>
+"""
+
+
+def extract_between(source: str, start: str, end: str, include_end: bool = True) -> str:
+    """Substring from the first start marker to the next end marker."""
+    i = source.find(start)
+    if i < 0:
+        raise ValueError(f"Marker not found in page source: {start!r}")
+    j = source.find(end, i + len(start))
+    if j < 0:
+        raise ValueError(f"Marker not found in page source: {end!r}")
+    return source[i:j + len(end) if include_end else j]
+
+
+def build_page(page_source: Path = REPO_ROOT / "page_source.html",
+               script_source: Path = REPO_ROOT / "largest_script.txt") -> str:
+    """Map page markup from the saved page with the script's URLs made local."""
+    source = page_source.read_text(encoding="utf-8")
+    style_start = source.rfind("<style>", 0, source.find(".ichra-map-wrap"))
+    style = extract_between(source[style_start:], "<style>", "</style>")
+    header = extract_between(source, '<div style="text-align:center;">', '<div id="ichra-map">', include_end=False)
+    controls = extract_between(source, '<div class="ichra-controls">', "</select>\n      </label>\n    </div>")
+
+    script = script_source.read_text(encoding="utf-8")
+    script = script.replace("https://cdn.jsdelivr.net/npm/us-atlas@3/", "/atlas/")
+    script = re.sub(r"https://ideonapi\.com(/wp-content/uploads/json-data/[^'\"]+)", r"\1", script)
+    return PAGE_TEMPLATE.format(style=style, header=header.rstrip(), controls=controls, script=script)
+
+
+class FixtureSite:
+    """Everything the fixture server can return, keyed by request path."""
+
+    def __init__(self, data_file: Path, cache: AssetCache, fetch_libs: bool = False):
+        self.data_file = data_file
+        self.cache = cache
+        self.page = build_page().encode()
+        self.requests = 0
+
+        cache.seed()
+        missing = [url for url in LIBRARIES.values() if not cache.get(url)]
+        if missing and fetch_libs:
+            for url in missing:
+                with urllib.request.urlopen(url, timeout=60) as response:
+                    cache.put(url, response.read(), response.headers.get("content-type", ""))
+            missing = []
+        self.missing_libs = missing
+
+    def resolve(self, path: str) -> tuple[int, str, bytes]:
+        """(status, content type, body) for a request path."""
+        if path in (PAGE_PATH, PAGE_PATH.rstrip("/"), "/"):
+            return 200, "text/html; charset=utf-8", self.page
+        if path == DATA_PATH or path.endswith(".json") and path.startswith("/wp-content/"):
+            return 200, "application/json", self.data_file.read_bytes()
+        upstream = LIBRARIES.get(path) or ATLAS.get(path)
+        if upstream:
+            cached = self.cache.get(upstream)
+            if cached:
+                body, entry = cached
+                return 200, entry.get("content_type") or "application/javascript", body
+            return 503, "text/plain", f"{upstream} is not in the asset cache (run with --fetch-libs)".encode()
+        return 404, "text/plain", b"Not found"
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_handler(site: FixtureSite, latency_ms: float = 0, quiet: bool = True):
+    """Request handler class bound to a site."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            site.requests += 1
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            status, content_type, body = site.resolve(self.path.split("?")[0])
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def start_fixture(data_file: Path, port: int = 0, latency_ms: float = 0, cache_dir: Path = None,
+                  fetch_libs: bool = False, quiet: bool = True) -> tuple[FixtureServer, str]:
+    """Run the fixture server in a background thread; returns (server, page URL)."""
+    site = FixtureSite(data_file, AssetCache(cache_dir) if cache_dir else AssetCache(), fetch_libs)
+    if site.missing_libs:
+        print(f"Warning: not in the asset cache, the map will not render: {', '.join(site.missing_libs)}")
+    server = FixtureServer(("127.0.0.1", port), make_handler(site, latency_ms, quiet))
+    server.site = site
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}{PAGE_PATH}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an offline copy of the Ideon map page")
+    parser.add_argument("--data", default="county_data_raw.json", help="Premium JSON file to serve")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every response")
+    parser.add_argument("--asset-cache", type=str, default=None, help="Asset cache directory")
+    parser.add_argument("--fetch-libs", action="store_true",
+                        help="Download d3/topojson into the asset cache if missing (needs network once)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args()
+
+    data_file = Path(args.data)
+    if not data_file.exists():
+        print(f"Error: Data file not found: {data_file}")
+        sys.exit(1)
+
+    server, url = start_fixture(data_file, args.port, args.latency_ms,
+                                Path(args.asset_cache) if args.asset_cache else None,
+                                args.fetch_libs, quiet=not args.verbose)
+    print(f"Serving {data_file} at {url} (latency {args.latency_ms:.0f} ms, Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Centroid-targeted hover planning for the county map.
+Projects one interior point per county with the same Albers USA projection
+the page uses (d3.geoAlbersUsa().fitSize), so the scraper can hover each
+county exactly once instead of sweeping a pixel grid.
+
+Usage:
+    python hover_plan.py --width 1108 --height 648
+    python hover_plan.py --width 1108 --height 648 --state CA
+"""
+
+import argparse
+import math
+from pathlib import Path
+
+from topology import COUNTIES_TOPOLOGY, STATE_FIPS, county_polygons, decode_arcs, interior_point, load_topology
+
+# The page fits the projection to [width, height - 70] to leave room for the legend
+FIT_MARGIN = 70
+
+EPSILON = 1e-6
+
+
+class ConicEqualArea:
+    """d3.geoConicEqualArea with rotate/center/scale/translate and a clip extent."""
+
+    def __init__(self, parallels: tuple[float, float], rotate: float, center: tuple[float, float]):
+        phi0, phi1 = (math.radians(p) for p in parallels)
+        sy0 = math.sin(phi0)
+        self.n = (sy0 + math.sin(phi1)) / 2
+        self.c = 1 + sy0 * (2 * self.n - sy0)
+        self.r0 = math.sqrt(self.c) / self.n
+        self.rotate = math.radians(rotate)
+        self.center = (math.radians(center[0]), math.radians(center[1]))
+        self.configure(150, (480, 250), None)
+
+    def raw(self, lam: float, phi: float) -> tuple[float, float]:
+        r = math.sqrt(max(self.c - 2 * self.n * math.sin(phi), 0)) / self.n
+        return r * math.sin(lam * self.n), self.r0 - r * math.cos(lam * self.n)
+
+    def configure(self, scale: float, translate: tuple[float, float], clip_extent):
+        """Set scale, translate and clip extent ([[x0, y0], [x1, y1]] or None)."""
+        cx, cy = self.raw(*self.center)
+        self.k = scale
+        self.dx = translate[0] - scale * cx
+        self.dy = translate[1] + scale * cy
+        self.clip_extent = clip_extent
+
+    def __call__(self, lon: float, lat: float) -> tuple[float, float] | None:
+        lam = math.radians(lon) + self.rotate
+        if lam > math.pi:
+            lam -= 2 * math.pi
+        elif lam < -math.pi:
+            lam += 2 * math.pi
+        x, y = self.raw(lam, math.radians(lat))
+        px, py = self.dx + self.k * x, self.dy - self.k * y
+
+        if self.clip_extent:
+            (x0, y0), (x1, y1) = self.clip_extent
+            if not (x0 <= px <= x1 and y0 <= py <= y1):
+                return None
+        return px, py
+
+
+class AlbersUsa:
+    """d3.geoAlbersUsa: lower 48 plus inset Alaska and Hawaii."""
+
+    def __init__(self):
+        self.lower48 = ConicEqualArea((29.5, 45.5), 96, (-0.6, 38.7))
+        self.alaska = ConicEqualArea((55, 65), 154, (-2, 58.5))
+        self.hawaii = ConicEqualArea((8, 18), 157, (-3, 19.9))
+        self.configure(1070, (480, 250))
+
+    def configure(self, scale: float, translate: tuple[float, float]):
+        k = scale
+        x, y = translate
+        self.scale = scale
+        self.translate = translate
+        self.lower48.configure(k, (x, y), [[x - 0.455 * k, y - 0.238 * k], [x + 0.455 * k, y + 0.238 * k]])
+        self.alaska.configure(
+            k * 0.35, (x - 0.307 * k, y + 0.201 * k),
+            [[x - 0.425 * k + EPSILON, y + 0.120 * k + EPSILON], [x - 0.214 * k - EPSILON, y + 0.234 * k - EPSILON]],
+        )
+        self.hawaii.configure(
+            k, (x - 0.205 * k, y + 0.212 * k),
+            [[x - 0.214 * k + EPSILON, y + 0.166 * k + EPSILON], [x - 0.115 * k - EPSILON, y + 0.234 * k - EPSILON]],
+        )
+
+    def __call__(self, lon: float, lat: float) -> tuple[float, float] | None:
+        return self.lower48(lon, lat) or self.alaska(lon, lat) or self.hawaii(lon, lat)
+
+    def fit_size(self, width: float, height: float, points) -> "AlbersUsa":
+        """Scale and translate so the points fill [width, height], like projection.fitSize."""
+        self.configure(150, (0, 0))
+        projected = [p for p in (self(lon, lat) for lon, lat in points) if p]
+        if not projected:
+            return self
+
+        x0 = min(p[0] for p in projected)
+        x1 = max(p[0] for p in projected)
+        y0 = min(p[1] for p in projected)
+        y1 = max(p[1] for p in projected)
+
+        k = min(width / (x1 - x0), height / (y1 - y0))
+        self.configure(150 * k, ((width - k * (x1 + x0)) / 2, (height - k * (y1 + y0)) / 2))
+        return self
+
+
+def map_projection(box: dict, view_size: tuple[float, float] = None, arcs: list = None):
+    """Function mapping (lon, lat) to page coordinates inside box, or None off the projection.
+
+    box is the map element's bounding box in page coordinates; view_size is
+    the SVG viewBox size the page fitted the projection to (defaults to the
+    box size).
+    """
+    if arcs is None:
+        arcs = decode_arcs(load_topology())
+
+    view_width, view_height = view_size or (box["width"], box["height"])
+    projection = AlbersUsa().fit_size(
+        view_width, view_height - FIT_MARGIN,
+        (point for arc in arcs for point in arc),
+    )
+
+    # The SVG scales its viewBox into the box with preserveAspectRatio="xMidYMid meet"
+    s = min(box["width"] / view_width, box["height"] / view_height)
+    offset_x = box["x"] + (box["width"] - view_width * s) / 2
+    offset_y = box["y"] + (box["height"] - view_height * s) / 2
+
+    def to_page(lon: float, lat: float) -> tuple[float, float] | None:
+        projected = projection(lon, lat)
+        if not projected:
+            return None
+        return offset_x + projected[0] * s, offset_y + projected[1] * s
+
+    return to_page
+
+
+def plan_hover_points(box: dict, view_size: tuple[float, float] = None,
+                      topology_path: Path = COUNTIES_TOPOLOGY,
+                      prefix: str = None) -> tuple[list[dict], list[dict]]:
+    """Plan one screen point per county inside the live map box.
+
+    prefix limits the plan to one state's counties (its FIPS prefix).
+    Returns (points, outside), where outside lists the counties whose point
+    falls off the projection or outside the box.
+    """
+    topology = load_topology(topology_path)
+    arcs = decode_arcs(topology)
+    counties = county_polygons(topology, arcs, prefix)
+    to_page = map_projection(box, view_size, arcs)
+
+    points = []
+    outside = []
+    for fips, county in sorted(counties.items()):
+        lonlat = interior_point(county["polygons"])
+        projected = to_page(*lonlat) if lonlat else None
+        if projected:
+            x, y = projected
+            if box["x"] <= x <= box["x"] + box["width"] and box["y"] <= y <= box["y"] + box["height"]:
+                points.append({"fips": fips, "name": county["name"], "x": x, "y": y})
+                continue
+        outside.append({"fips": fips, "name": county["name"]})
+
+    return points, outside
+
+
+def state_box(box: dict, prefix: str, view_size: tuple[float, float] = None,
+              topology_path: Path = COUNTIES_TOPOLOGY) -> dict | None:
+    """Page-coordinate bounding box of one state's counties, clipped to the map box."""
+    topology = load_topology(topology_path)
+    arcs = decode_arcs(topology)
+    to_page = map_projection(box, view_size, arcs)
+
+    projected = [
+        p
+        for county in county_polygons(topology, arcs, prefix).values()
+        for polygon in county["polygons"]
+        for lon, lat in polygon[0]
+        if (p := to_page(lon, lat))
+    ]
+    if not projected:
+        return None
+
+    x0 = max(box["x"], min(p[0] for p in projected))
+    x1 = min(box["x"] + box["width"], max(p[0] for p in projected))
+    y0 = max(box["y"], min(p[1] for p in projected))
+    y1 = min(box["y"] + box["height"], max(p[1] for p in projected))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return {"x": x0, "y": y0, "width": x1 - x0, "height": y1 - y0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan one hover point per county on the map")
+    parser.add_argument("--width", type=float, default=1108, help="Map viewBox width")
+    parser.add_argument("--height", type=float, default=648, help="Map viewBox height")
+    parser.add_argument("--topology", type=str, default=str(COUNTIES_TOPOLOGY), help="TopoJSON file path")
+    parser.add_argument("--state", type=str, default=None, help="Only plan one state's counties (e.g. CA)")
+
+    args = parser.parse_args()
+    prefix = STATE_FIPS[args.state.upper()] if args.state else None
+
+    box = {"x": 0, "y": 0, "width": args.width, "height": args.height}
+    points, outside = plan_hover_points(box, topology_path=Path(args.topology), prefix=prefix)
+    print(f"Planned {len(points)} hover points")
+    if prefix:
+        bounds = state_box(box, prefix, topology_path=Path(args.topology))
+        print(f"{args.state.upper()} bounding box: {bounds}")
+    print(f"Outside map: {len(outside)} counties")
+    for county in outside:
+        print(f"  {county['fips']} {county['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,22 @@ Run this first to potentially find a direct JSON/API endpoint.
 
 Usage:
     python inspect_network.py
+    python inspect_network.py --url http://127.0.0.1:8766/ideon-ichra-insights-by-state/
+    python inspect_network.py --daemon http://127.0.0.1:8767
 """
 
+import argparse
 import asyncio
 import json
 from playwright.async_api import async_playwright
 
+from browser_daemon import lease_or_launch, release_page
+from readiness import wait_for_map_ready
+
 URL = "https://ideonapi.com/ideon-ichra-insights-by-state/"
 
 
-async def inspect():
+async def inspect(url: str = URL, daemon: str = None):
     """Capture network requests and look for data sources."""
     print("Starting network inspection...")
     print("=" * 60)
@@ -24,8 +30,11 @@ async def inspect():
     json_responses = []
     
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)  # Visible for debugging
-        page = await browser.new_page()
+        browser, page, page_name = await lease_or_launch(p, daemon, headless=False)  # Visible for debugging
+        if page_name:
+            # The page is reloaded at the daemon's URL; requests the daemon's
+            # asset routing blocks (images, fonts, analytics) won't show up
+            url = page.url
         
         # Capture all network responses
         async def handle_response(response):
@@ -56,12 +65,15 @@ async def inspect():
         
         page.on("response", handle_response)
         
-        print(f"Loading: {URL}")
-        await page.goto(URL, wait_until="networkidle", timeout=60000)
+        print(f"Loading: {url}")
+        await page.goto(url, wait_until="networkidle", timeout=60000)
         
         # Scroll and interact to trigger lazy loading
         await page.evaluate("window.scrollBy(0, 500)")
-        await asyncio.sleep(2)
+        try:
+            await wait_for_map_ready(page)
+        except Exception as e:
+            print(f"Map not ready (continuing): {e}")
         
         # Try hovering on the map to trigger data loads
         try:
@@ -75,7 +87,8 @@ async def inspect():
         except:
             pass
         
-        await asyncio.sleep(3)
+        # Let any requests triggered by hovering finish
+        await page.wait_for_load_state("networkidle")
         
         # Print summary
         print("\n" + "=" * 60)
@@ -128,9 +141,16 @@ async def inspect():
         # Auto-close after inspection (removed input() for automation)
         print("\nClosing browser...")
         await browser.close()
+        if page_name:
+            # Navigated away from the daemon's setup; have it reload the page
+            await release_page(daemon, page_name, ok=False)
     
     return data_urls, json_responses
 
 
 if __name__ == "__main__":
-    asyncio.run(inspect())
+    parser = argparse.ArgumentParser(description="Capture the map page's network requests")
+    parser.add_argument("--url", default=URL, help="Map page URL (e.g. a local fixture_server.py)")
+    parser.add_argument("--daemon", help="Use a browser_daemon.py page at this URL (ignores --url)")
+    args = parser.parse_args()
+    asyncio.run(inspect(args.url, args.daemon))
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+SQLite store for county premium data.
+Ingests the raw premium JSON (county_data_raw.json) or scraper CSV output
+into one table keyed by (fips, year, age, metal), with indexes for state
+and year lookups. Each ingest is a single transaction of upserts, so a
+refresh replaces changed values without duplicating rows.
+
+Usage:
+    python premium_db.py ingest county_data_raw.json
+    python premium_db.py --db premiums.db ingest data/ideon_county_data.csv
+    python premium_db.py query --state TX --year 2024 --age 50 --metal gold
+    python premium_db.py stats
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from premium_stream import stream_records
+
+DEFAULT_DB = "premiums.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS premiums (
+    fips TEXT NOT NULL,
+    county TEXT NOT NULL,
+    state TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    age INTEGER NOT NULL,
+    metal TEXT NOT NULL,
+    individual REAL,
+    small_group REAL,
+    difference REAL,
+    source TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (fips, year, age, metal)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_premiums_state ON premiums (state, year, age, metal);
+CREATE INDEX IF NOT EXISTS idx_premiums_year ON premiums (year, age, metal);
+"""
+
+UPSERT_SQL = """
+INSERT INTO premiums (fips, county, state, year, age, metal, individual, small_group, difference,
+                      source, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (fips, year, age, metal) DO UPDATE SET
+    county = excluded.county,
+    state = excluded.state,
+    individual = excluded.individual,
+    small_group = excluded.small_group,
+    difference = excluded.difference,
+    source = excluded.source,
+    updated_at = excluded.updated_at
+"""
+
+SELECT_COLUMNS = "fips, county, state, year, age, metal, individual, small_group, difference"
+
+
+def connect(db_path: str | Path = DEFAULT_DB) -> sqlite3.Connection:
+    """Open the database, creating the table and indexes if needed."""
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def money(value) -> float | None:
+    """CSV cell or JSON value -> float (blank -> None)."""
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def json_rows(records: Iterable[dict]) -> Iterator[tuple]:
+    """Raw JSON records -> (fips, county, state, year, age, metal, i, s, d)."""
+    for r in records:
+        yield (
+            r.get("f", ""), r.get("n", ""), r.get("st", ""),
+            2000 + r.get("year", 0), r.get("age"), (r.get("lvl") or "").lower(),
+            r.get("i"), r.get("s"), r.get("d"),
+        )
+
+
+def csv_rows(path: Path) -> Iterator[tuple]:
+    """Scraper or county-export CSV rows -> the same tuples as json_rows."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield (
+                row.get("fips", ""), row.get("county", ""), row.get("state") or row.get("state_abbr", ""),
+                int(row["year"]), int(row["age"]), (row.get("metal") or row.get("metal_tier", "")).lower(),
+                money(row.get("individual_premium")), money(row.get("small_group_premium")),
+                money(row.get("difference")),
+            )
+
+
+def ingest(conn: sqlite3.Connection, rows: Iterable[tuple], source: str) -> tuple[int, int]:
+    """Upsert rows in one transaction; returns (rows upserted, rows skipped without a FIPS)."""
+    stamp = datetime.now().isoformat(timespec="seconds")
+    skipped = 0
+
+    def keyed():
+        nonlocal skipped
+        for row in rows:
+            if not row[0]:
+                skipped += 1
+                continue
+            yield (*row, source, stamp)
+
+    with conn:
+        before = conn.total_changes
+        conn.executemany(UPSERT_SQL, keyed())
+        upserted = conn.total_changes - before
+    return upserted, skipped
+
+
+def ingest_file(conn: sqlite3.Connection, path: Path) -> tuple[int, int]:
+    """Ingest a raw premium JSON file or a CSV export."""
+    rows = csv_rows(path) if path.suffix.lower() == ".csv" else json_rows(stream_records(path))
+    return ingest(conn, rows, path.name)
+
+
+def where_clause(year: int = None, age: int = None, metal: str = None, state: str = None,
+                 fips: str = None) -> tuple[str, list]:
+    """SQL WHERE clause and parameters for the optional filters."""
+    conditions, params = [], []
+    for column, value in (("fips", fips.zfill(5) if fips else None), ("state", state.upper() if state else None),
+                          ("year", year), ("age", age), ("metal", metal.lower() if metal else None)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+def query(conn: sqlite3.Connection, year: int = None, age: int = None, metal: str = None,
+          state: str = None, fips: str = None) -> list[sqlite3.Row]:
+    """Rows matching the filters, ordered by state and county."""
+    where, params = where_clause(year, age, metal, state, fips)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(
+            f"SELECT {SELECT_COLUMNS} FROM premiums{where} ORDER BY state, county, year, age, metal", params
+        ).fetchall()
+    finally:
+        conn.row_factory = None
+
+
+def query_plan(conn: sqlite3.Connection, **filters) -> list[str]:
+    """SQLite's plan for a query with these filters (shows which index is used)."""
+    where, params = where_clause(**filters)
+    plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT {SELECT_COLUMNS} FROM premiums{where}", params)
+    return [row[-1] for row in plan]
+
+
+def select_records(db_path: str | Path, year: int = None, age: int = None, metal: str = None,
+                   state: str = None, sort: bool = False) -> Iterator[dict]:
+    """Yield matching rows in the raw JSON record shape the exporters read.
+
+    Rows come in the data file's order (county, year, metal, age), so
+    exports from the store match exports from the JSON. sort=True puts
+    state and county name first, the order the county CSV is written in.
+    """
+    conn = connect(db_path)
+    where, params = where_clause(year, age, metal, state)
+    order = "state, county, fips, year, metal, age" if sort else "fips, year, metal, age"
+    try:
+        for fips, county, st, yr, ag, lvl, i, s, d in conn.execute(
+            f"SELECT {SELECT_COLUMNS} FROM premiums{where} ORDER BY {order}", params
+        ):
+            yield {"f": fips, "n": county, "st": st, "i": i, "s": s, "d": d,
+                   "year": yr - 2000, "age": ag, "lvl": lvl}
+    finally:
+        conn.close()
+
+
+def count_rows(db_path: str | Path) -> int:
+    """Total rows in the store."""
+    conn = connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM premiums").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite store for Ideon county premiums")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Database path (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = sub.add_parser("ingest", help="Load a premium JSON file or CSV export (upsert)")
+    ingest_parser.add_argument("files", nargs="+", help="county_data_raw.json or scraper/export CSVs")
+
+    query_parser = sub.add_parser("query", help="Look up rows by state/year/age/metal/FIPS")
+    query_parser.add_argument("--state", help="State code (e.g., TX)")
+    query_parser.add_argument("--year", type=int, help="Year (e.g., 2024)")
+    query_parser.add_argument("--age", type=int, choices=[27, 50], help="Age")
+    query_parser.add_argument("--metal", choices=["bronze", "silver", "gold"], help="Metal tier")
+    query_parser.add_argument("--fips", help="County FIPS code")
+    query_parser.add_argument("--csv", action="store_true", help="Print CSV instead of a table")
+    query_parser.add_argument("--explain", action="store_true", help="Show the query plan")
+
+    sub.add_parser("stats", help="Row counts per year")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == "ingest":
+        for name in args.files:
+            path = Path(name)
+            if not path.exists():
+                print(f"Error: File not found: {path}")
+                sys.exit(1)
+            start = time.perf_counter()
+            upserted, skipped = ingest_file(conn, path)
+            print(f"Ingested {upserted} rows from {path} in {time.perf_counter() - start:.2f}s"
+                  + (f" ({skipped} rows without FIPS skipped)" if skipped else ""))
+        print(f"Database {args.db}: {conn.execute('SELECT COUNT(*) FROM premiums').fetchone()[0]} rows")
+
+    elif args.command == "query":
+        filters = {"year": args.year, "age": args.age, "metal": args.metal, "state": args.state, "fips": args.fips}
+        if args.explain:
+            for line in query_plan(conn, **filters):
+                print(f"-- {line}")
+        start = time.perf_counter()
+        rows = query(conn, **filters)
+        elapsed = time.perf_counter() - start
+
+        columns = SELECT_COLUMNS.split(", ")
+        if args.csv:
+            writer = csv.writer(sys.stdout)
+            writer.writerow(columns)
+            writer.writerows(tuple(r) for r in rows)
+        else:
+            print(f"{'FIPS':<6} {'County':<32} {'ST':<3} {'Year':<5} {'Age':<4} {'Metal':<7} "
+                  f"{'Individual':>11} {'Small Grp':>10} {'Diff':>9}")
+            for r in rows:
+                fmt = lambda v: f"{v:.2f}" if v is not None else "-"
+                print(f"{r['fips']:<6} {r['county'][:32]:<32} {r['state']:<3} {r['year']:<5} {r['age']:<4} "
+                      f"{r['metal']:<7} {fmt(r['individual']):>11} {fmt(r['small_group']):>10} "
+                      f"{fmt(r['difference']):>9}")
+            print(f"\n{len(rows)} rows ({elapsed * 1000:.1f} ms)")
+
+    elif args.command == "stats":
+        total = conn.execute("SELECT COUNT(*) FROM premiums").fetchone()[0]
+        print(f"Database {args.db}: {total} rows")
+        for year, rows, states, updated in conn.execute(
+            "SELECT year, COUNT(*), COUNT(DISTINCT state), MAX(updated_at) FROM premiums GROUP BY year ORDER BY year"
+        ):
+            print(f"  {year}: {rows} rows, {states} states (updated {updated})")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
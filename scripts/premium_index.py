@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+In-memory partition index over premium records.
+Buckets records by (year, age, metal), by FIPS and by state in one pass,
+so any filter combination is a dictionary lookup. load_index() keeps one
+index per data file for the life of the process, so the lookup service,
+the county locator, verification and the scraper benchmark can share it.
+The one-shot exporters don't build it: they filter in a single streaming
+pass or a columnar mask, which keeps their memory flat.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+from columnar_cache import columnar_available, open_columnar, source_fingerprint
+from premium_stream import stream_records
+
+
+class PremiumIndex:
+    """Records bucketed by (year code, age, metal), by FIPS and by state."""
+
+    def __init__(self, records: Iterable[dict]):
+        self.partitions = defaultdict(list)
+        self.by_fips = defaultdict(list)
+        self.by_state = defaultdict(list)
+        self.count = 0
+
+        for record in records:
+            key = (record.get("year"), record.get("age"), (record.get("lvl") or "").lower())
+            self.partitions[key].append(record)
+            self.by_fips[record.get("f", "")].append(record)
+            self.by_state[record.get("st", "")].append(record)
+            self.count += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def select(self, year: int = None, age: int = None, metal: str = None) -> list[dict]:
+        """Records matching the filters (year is the full year, e.g. 2026)."""
+        year_code = year - 2000 if year else None
+        metal = metal.lower() if metal else None
+
+        if year_code and age and metal:
+            return self.partitions.get((year_code, age, metal), [])
+
+        # Partial filter: union of the matching buckets (at most years x ages x metals)
+        selected = []
+        for (y, a, m), records in self.partitions.items():
+            if (year_code is None or y == year_code) and (age is None or a == age) and (metal is None or m == metal):
+                selected.extend(records)
+        return selected
+
+    def county(self, fips: str, year: int = None, age: int = None, metal: str = None) -> list[dict]:
+        """Records for one county, optionally filtered."""
+        return self._filtered(self.by_fips.get(fips.zfill(5), []), year, age, metal)
+
+    def state(self, st: str, year: int = None, age: int = None, metal: str = None) -> list[dict]:
+        """Records for one state's counties, optionally filtered."""
+        return self._filtered(self.by_state.get(st.upper(), []), year, age, metal)
+
+    @staticmethod
+    def _filtered(records: list[dict], year: int = None, age: int = None, metal: str = None) -> list[dict]:
+        year_code = year - 2000 if year else None
+        metal = metal.lower() if metal else None
+        return [
+            r for r in records
+            if (year_code is None or r.get("year") == year_code)
+            and (age is None or r.get("age") == age)
+            and (metal is None or (r.get("lvl") or "").lower() == metal)
+        ]
+
+    def by_county_name(self, year: int, age: int, metal: str) -> dict[str, dict]:
+        """Map "County, ST" to its record for one combination."""
+        return {f"{r['n']}, {r['st']}": r for r in self.select(year, age, metal)}
+
+
+# (resolved path, source fingerprint) -> PremiumIndex
+_INDEXES = {}
+
+
+def load_index(cache_file: Path) -> PremiumIndex:
+    """Build the index for a data file once per process and reuse it.
+
+    Reads through the columnar cache when numpy is available, otherwise
+    streams the JSON. A changed file gets a fresh index.
+    """
+    path = str(cache_file.resolve())
+    key = (path, tuple(sorted(source_fingerprint(cache_file).items())))
+    if key not in _INDEXES:
+        records = open_columnar(cache_file).records() if columnar_available() else stream_records(cache_file)
+        # Drop any index built from an older version of the same file
+        for stale in [k for k in _INDEXES if k[0] == path]:
+            del _INDEXES[stale]
+        _INDEXES[key] = PremiumIndex(records)
+    return _INDEXES[key]
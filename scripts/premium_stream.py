@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for the Ideon premium data file.
+The file is one top-level JSON array of records; this yields them one at a
+time from the HTTP body or the cache file, so memory stays flat however
+many years and tiers the file grows to.
+"""
+
+import codecs
+import json
+import os
+import urllib.request
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(fp, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """Yield the elements of a top-level JSON array read from a file object.
+
+    Works with binary or text file objects (including HTTP responses). Each
+    element is decoded as soon as it is complete in the buffer.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    started = False
+
+    while True:
+        chunk = fp.read(chunk_size)
+        if isinstance(chunk, bytes):
+            buf += utf8.decode(chunk, final=not chunk)
+        else:
+            buf += chunk
+
+        pos = 0
+        while True:
+            while pos < len(buf) and (buf[pos] in _WHITESPACE or (started and buf[pos] == ",")):
+                pos += 1
+            if pos >= len(buf):
+                break
+
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+
+            if buf[pos] == "]":
+                return
+
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # Element continues in the next chunk
+            # Only trust the element once a delimiter follows it: a number cut
+            # at a chunk boundary ("6." of "6.75") decodes without error
+            after = end
+            while after < len(buf) and buf[after] in _WHITESPACE:
+                after += 1
+            if after == len(buf) or buf[after] not in ",]":
+                if chunk:
+                    break
+                raise ValueError("Truncated JSON array" if after == len(buf) else "Malformed JSON array")
+            yield element
+            pos = end
+
+        buf = buf[pos:]
+        if not chunk:
+            # The closing "]" returns above; reaching the end without it means a cut-off file
+            raise ValueError("Truncated JSON array")
+
+
+class _TeeReader:
+    """File-like wrapper that copies everything read into another file."""
+
+    def __init__(self, fp, out):
+        self.fp = fp
+        self.out = out
+
+    def read(self, size: int = -1):
+        chunk = self.fp.read(size)
+        self.out.write(chunk)
+        return chunk
+
+
+def record_filter(year: int = None, age: int = None, metal: str = None) -> Callable[[dict], bool] | None:
+    """Build one predicate for the year/age/metal filters (None if no filter)."""
+    if not (year or age or metal):
+        return None
+
+    year_code = year - 2000 if year else None  # 2026 -> 26
+    metal = metal.lower() if metal else None
+
+    def matches(record: dict) -> bool:
+        return (
+            (year_code is None or record.get("year") == year_code)
+            and (age is None or record.get("age") == age)
+            and (metal is None or record.get("lvl", "").lower() == metal)
+        )
+
+    return matches
+
+
+def stream_records(cache_file: Path = None, url: str = None, predicate: Callable[[dict], bool] = None,
+                   timeout: int = 60) -> Iterator[dict]:
+    """Yield records from the cache file, or from the URL (caching the raw body).
+
+    The download is written to a temporary file next to the cache and only
+    renamed into place once the whole array has been read.
+    """
+    if cache_file and cache_file.exists():
+        with open(cache_file, "rb") as f:
+            yield from filter(predicate, iter_json_array(f))
+        return
+
+    if not url:
+        raise FileNotFoundError(f"Cache file not found: {cache_file}")
+
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        if not cache_file:
+            yield from filter(predicate, iter_json_array(response))
+            return
+
+        partial = cache_file.with_name(cache_file.name + ".part")
+        with open(partial, "wb") as out:
+            yield from filter(predicate, iter_json_array(_TeeReader(response, out)))
+        os.replace(partial, cache_file)
+
+
+def download_file(url: str, path: Path, timeout: int = 60) -> Path:
+    """Copy the raw response body to path without parsing it."""
+    partial = path.with_name(path.name + ".part")
+    with urllib.request.urlopen(url, timeout=timeout) as response, open(partial, "wb") as out:
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            out.write(chunk)
+    os.replace(partial, path)
+    return path
+
+
+class CountingIterator:
+    """Iterator wrapper that counts the items passed through it."""
+
+    def __init__(self, iterable: Iterable):
+        self.iterator = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self.iterator)
+        self.count += 1
+        return item
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Phase-level timing for the scraper and verifier (--profile).
+Code wraps its phases in PROFILE.span("name") and counts outcomes with
+PROFILE.count("name"). Both are no-ops until PROFILE.enable() is called.
+The report gives, per span, the count, total, mean, percentiles and a
+latency histogram. It also includes counters, hover/tooltip miss rates
+and the readiness waits from readiness.LATENCY_LOG. It is written as JSON
+and printed as a table.
+
+Usage:
+    python scrape_ideon_map.py --method centroid --batch-size 0 --profile profile.json
+    python profiler.py profile.json          # print the table of a saved report
+"""
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from readiness import LATENCY_LOG
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open)
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+# (hit counter, miss counter) pairs reported as miss rates
+MISS_RATES = {
+    "hover": ("hover.hit", "hover.miss"),
+    "tooltip": ("tooltip.found", "tooltip.none"),
+}
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def histogram(values: list[float]) -> dict[str, int]:
+    """Counts per latency bucket, labelled by upper bound ("<=5ms", ..., ">10000ms")."""
+    counts = dict.fromkeys([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"], 0)
+    for value in values:
+        ms = value * 1000
+        label = next((f"<={b}ms" for b in BUCKETS_MS if ms <= b), f">{BUCKETS_MS[-1]}ms")
+        counts[label] += 1
+    return {label: n for label, n in counts.items() if n}
+
+
+class Profiler:
+    """Span durations and counters for one run."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = defaultdict(list)
+        self.counters = defaultdict(int)
+        self.started = None
+
+    def enable(self):
+        self.enabled = True
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name].append(time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float, count: int = 1):
+        """Add count samples of seconds each (e.g. a batch's per-hover average)."""
+        if self.enabled:
+            self.spans[name].extend([seconds] * count)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def report(self) -> dict:
+        spans = dict(self.spans)
+        for phase, elapsed in LATENCY_LOG:
+            spans.setdefault(f"ready.{phase}", []).append(elapsed)
+
+        summary = {}
+        for name, values in sorted(spans.items()):
+            ordered = sorted(values)
+            summary[name] = {
+                "count": len(ordered),
+                "total_s": sum(ordered),
+                "mean_ms": sum(ordered) / len(ordered) * 1000,
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p90_ms": percentile(ordered, 90) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "histogram": histogram(ordered),
+            }
+
+        miss_rates = {}
+        for label, (hit, miss) in MISS_RATES.items():
+            total = self.counters.get(hit, 0) + self.counters.get(miss, 0)
+            if total:
+                miss_rates[label] = {"attempts": total, "misses": self.counters.get(miss, 0),
+                                     "rate": self.counters.get(miss, 0) / total}
+
+        return {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "wall_s": time.perf_counter() - self.started if self.started else None,
+            "spans": summary,
+            "counters": dict(sorted(self.counters.items())),
+            "miss_rates": miss_rates,
+        }
+
+    def write(self, path: str) -> dict:
+        report = self.report()
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print_report(report)
+        print(f"\nProfile written to {path}")
+        return report
+
+
+def print_report(report: dict):
+    """Summary table of a profile report."""
+    spans = report["spans"]
+    print(f"\n{'Span':<28} {'Count':>7} {'Total s':>9} {'Mean ms':>9} {'p50 ms':>8} {'p90 ms':>8} {'Max ms':>9}")
+    print("-" * 84)
+    for name, s in sorted(spans.items(), key=lambda item: -item[1]["total_s"]):
+        print(f"{name:<28} {s['count']:>7} {s['total_s']:>9.2f} {s['mean_ms']:>9.1f} "
+              f"{s['p50_ms']:>8.1f} {s['p90_ms']:>8.1f} {s['max_ms']:>9.1f}")
+    if report.get("wall_s"):
+        print(f"Wall time: {report['wall_s']:.2f}s")
+
+    if report["miss_rates"]:
+        print()
+        for label, m in report["miss_rates"].items():
+            print(f"{label} miss rate: {m['misses']}/{m['attempts']} ({m['rate']:.1%})")
+    if report["counters"]:
+        print("\nCounters:")
+        for name, n in report["counters"].items():
+            print(f"  {name:<40} {n:>8}")
+
+    hover = spans.get("hover")
+    if hover:
+        print("\nPer-hover latency:")
+        for label, n in hover["histogram"].items():
+            print(f"  {label:>9} {n:>7}")
+
+
+PROFILE = Profiler()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the summary table of a saved --profile report")
+    parser.add_argument("path", help="Profile JSON file")
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        print_report(json.load(f))
+
+
+if __name__ == "__main__":
+    main()
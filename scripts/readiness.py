@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Event-driven readiness checks for the Ideon map page.
+Waits for concrete signals instead of fixed sleeps: the premium data
+response, the filter dropdowns, rendered county paths and the end of
+d3's fade-in transitions. Each phase has its own timeout and logs how
+long it actually took.
+"""
+
+import re
+import time
+
+# The map loads all premiums from one dated JSON file (all years, ages and
+# metal tiers). The date in the name changes whenever Ideon refreshes it.
+DATA_FILE_PATTERN = re.compile(r"county_lowest_premiums_all_(?P<date>[\d-]+)\.json")
+
+# Per-phase timeouts in milliseconds
+PHASE_TIMEOUTS = {
+    "data": 60000,        # page load until the premium JSON has arrived
+    "controls": 30000,    # filter dropdowns present and populated
+    "paths": 30000,       # county paths drawn with fills applied
+    "transition": 5000,   # d3 fade-in (600 ms) finished
+}
+
+# (phase, seconds) for every wait in this process, in order
+LATENCY_LOG = []
+
+CONTROLS_READY_JS = """
+() => ['ichra-year', 'ichra-age', 'ichra-metal'].every(id => {
+    const sel = document.getElementById(id);
+    return sel && sel.options.length > 0;
+})
+"""
+
+PATHS_READY_JS = """
+() => {
+    const paths = document.querySelectorAll('#ichra-map path.county');
+    if (!paths.length) return false;
+    for (const p of paths) if (!p.getAttribute('fill')) return false;
+    return true;
+}
+"""
+
+# d3 keeps a __transition property on nodes while a transition is scheduled
+TRANSITIONS_DONE_JS = """
+() => {
+    for (const node of document.querySelectorAll('#ichra-map svg g, #ichra-map path.county')) {
+        if (node.__transition) return false;
+    }
+    return true;
+}
+"""
+
+
+def is_data_response(response) -> bool:
+    """True for the map's premium data file."""
+    name = response.url.split("?")[0].rsplit("/", 1)[-1]
+    return bool(DATA_FILE_PATTERN.fullmatch(name))
+
+
+def _log(phase: str, start: float, quiet: bool = False) -> float:
+    elapsed = time.perf_counter() - start
+    LATENCY_LOG.append((phase, elapsed))
+    if not quiet:
+        print(f"  [ready] {phase}: {elapsed:.2f}s")
+    return elapsed
+
+
+async def wait_for_phase(page, phase: str, expression: str, timeout: int = None, quiet: bool = False) -> float:
+    """Wait until the JS expression is truthy; returns the measured latency."""
+    start = time.perf_counter()
+    await page.wait_for_function(expression, timeout=timeout or PHASE_TIMEOUTS[phase])
+    return _log(phase, start, quiet)
+
+
+async def goto_map(page, url: str, timeout: int = None, wait_until: str = "domcontentloaded"):
+    """Load the map page and wait until its premium data response has arrived."""
+    timeout = timeout or PHASE_TIMEOUTS["data"]
+    start = time.perf_counter()
+    async with page.expect_response(is_data_response, timeout=timeout) as response_info:
+        await page.goto(url, wait_until=wait_until, timeout=timeout)
+    response = await response_info.value
+    _log("data", start)
+    return response
+
+
+async def wait_for_controls(page, timeout: int = None) -> float:
+    """Wait for the year/age/metal dropdowns."""
+    return await wait_for_phase(page, "controls", CONTROLS_READY_JS, timeout)
+
+
+async def wait_for_map_ready(page, timeout: int = None, quiet: bool = False) -> float:
+    """Wait for filled county paths and the end of the render transition.
+
+    Changing a dropdown re-renders the map synchronously (the old SVG is
+    removed at once), so calling this right after select_option waits for
+    the new map rather than the old one.
+    """
+    paths = await wait_for_phase(page, "paths", PATHS_READY_JS, timeout, quiet)
+    transition = await wait_for_phase(page, "transition", TRANSITIONS_DONE_JS, timeout, quiet)
+    return paths + transition
+
+
+def latency_summary() -> dict[str, dict]:
+    """Count, total and max latency per phase from LATENCY_LOG."""
+    summary = {}
+    for phase, elapsed in LATENCY_LOG:
+        stats = summary.setdefault(phase, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+    return summary
@@ -5,16 +5,28 @@ Extracts county-level premium data from Ideon's interactive map.
 
 Usage:
     python scrape_ideon_map.py --year 2026 --age 50 --metal gold --output data.csv
+    python scrape_ideon_map.py --method capture --format parquet --output data.parquet
 """
 
 import argparse
 import asyncio
-import csv
+import json
 import re
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+from asset_cache import DEFAULT_CACHE_DIR, AssetCache, AssetRouter
+from browser_daemon import lease_page, release_page
+from checkpoint import Checkpoint
+from hover_plan import plan_hover_points, state_box
+from profiler import PROFILE
+from readiness import DATA_FILE_PATTERN, goto_map, wait_for_controls, wait_for_map_ready
+from table_output import FORMATS, arrow_available, write_output
+from tooltip_parser import parse_tooltip
+from topology import COUNTIES_TOPOLOGY, STATE_FIPS
+
 try:
     from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 except ImportError:
@@ -24,70 +36,18 @@ except ImportError:
 
 URL = "https://ideonapi.com/ideon-ichra-insights-by-state/"
 
-# Tooltip parsing pattern - matches format like:
-# "Shasta County, CA\nDiff (Ind - Small): $605.64\nIndividual: $1,414.50  Small Group: $808.86"
-TOOLTIP_PATTERN = re.compile(
-    r"(?P<county>[^,]+),\s*(?P<state>[A-Z]{2})\s*"
-    r"Diff\s*\(Ind\s*[-–]\s*Small\):\s*\$?(?P<diff>[\d,.-]+)\s*"
-    r"Individual:\s*\$?(?P<individual>[\d,.-]+)\s*"
-    r"Small\s*Group:\s*\$?(?P<small_group>[\d,.-]+)",
-    re.IGNORECASE | re.DOTALL
-)
-
-
-def parse_money(value: str) -> float:
-    """Convert money string to float."""
-    if not value:
-        return None
-    cleaned = value.replace(",", "").replace("$", "").strip()
-    try:
-        return float(cleaned)
-    except ValueError:
-        return None
-
-
-def parse_tooltip(text: str) -> dict | None:
-    """Parse tooltip text into structured data."""
-    if not text:
-        return None
-    
-    # Normalize whitespace
-    text = " ".join(text.split())
-    
-    match = TOOLTIP_PATTERN.search(text)
-    if match:
-        return {
-            "county": match.group("county").strip(),
-            "state": match.group("state").strip(),
-            "individual_premium": parse_money(match.group("individual")),
-            "small_group_premium": parse_money(match.group("small_group")),
-            "difference": parse_money(match.group("diff")),
-        }
-    
-    # Fallback: try simpler pattern
-    # Format: "County Name, ST" followed by numbers
-    simple = re.search(r"([^,]+),\s*([A-Z]{2})", text)
-    if simple:
-        numbers = re.findall(r"\$?([\d,]+\.?\d*)", text)
-        if len(numbers) >= 2:
-            return {
-                "county": simple.group(1).strip(),
-                "state": simple.group(2).strip(),
-                "individual_premium": parse_money(numbers[-2]) if len(numbers) >= 2 else None,
-                "small_group_premium": parse_money(numbers[-1]) if len(numbers) >= 1 else None,
-                "difference": parse_money(numbers[0]) if len(numbers) >= 3 else None,
-            }
-    
-    return None
+# perf_counter() timestamps for --stats-json ("start", "first_row")
+RUN_TIMES = {}
 
+# Dated premium data file the exporters' DATA_URL points at (see DATA_FILE_PATTERN)
+KNOWN_DATA_FILE = "county_lowest_premiums_all_14-12-2025.json"
 
 async def set_map_filters(page, year: int, age: int, metal: str):
     """Set the year, age, and metal dropdowns on the map."""
     print(f"Setting filters: Year={year}, Age={age}, Metal={metal}")
     
-    # Wait for the map container to load
-    await page.wait_for_selector("text=Individual vs Small Group", timeout=30000)
-    await asyncio.sleep(2)  # Let dropdowns initialize
+    # Wait for the dropdowns to be populated
+    await wait_for_controls(page)
     
     # Find and set Year dropdown
     try:
@@ -96,7 +56,6 @@ async def set_map_filters(page, year: int, age: int, metal: str):
             # Try finding by nearby label
             year_select = page.locator("select").nth(0)
         await year_select.select_option(str(year))
-        await asyncio.sleep(0.5)
     except Exception as e:
         print(f"Warning: Could not set year filter: {e}")
     
@@ -104,7 +63,6 @@ async def set_map_filters(page, year: int, age: int, metal: str):
     try:
         age_select = page.locator("select").nth(1)
         await age_select.select_option(str(age))
-        await asyncio.sleep(0.5)
     except Exception as e:
         print(f"Warning: Could not set age filter: {e}")
     
@@ -112,12 +70,11 @@ async def set_map_filters(page, year: int, age: int, metal: str):
     try:
         metal_select = page.locator("select").nth(2)
         await metal_select.select_option(metal.capitalize())
-        await asyncio.sleep(0.5)
     except Exception as e:
         print(f"Warning: Could not set metal filter: {e}")
     
-    # Wait for map to update
-    await asyncio.sleep(2)
+    # Wait for map to re-render with the new filters
+    await wait_for_map_ready(page)
 
 
 async def find_county_elements(page) -> list:
@@ -145,6 +102,16 @@ async def find_county_elements(page) -> list:
 
 async def get_tooltip_text(page) -> str | None:
     """Extract text from any visible tooltip."""
+    with PROFILE.span("tooltip.poll"):
+        text, selector = await _poll_tooltip_selectors(page)
+    PROFILE.count(f"tooltip.selector[{selector}]" if selector else "tooltip.none")
+    if text:
+        PROFILE.count("tooltip.found")
+    return text
+
+
+async def _poll_tooltip_selectors(page) -> tuple[str | None, str | None]:
+    """Try each tooltip selector in turn; returns (text, matching selector)."""
     # Common tooltip selectors
     tooltip_selectors = [
         ".mapboxgl-popup-content",
@@ -164,66 +131,369 @@ async def get_tooltip_text(page) -> str | None:
             if await tooltip.is_visible():
                 text = await tooltip.text_content()
                 if text and ("$" in text or "Individual" in text or "Small Group" in text):
-                    return text
+                    return text, selector
         except:
             continue
     
-    return None
+    return None, None
+
+
+def add_row(results: list, seen: set, data: dict, args, fips: str = None) -> bool:
+    """Stamp a parsed tooltip with the query parameters and keep it if new."""
+    key = f"{data['county']}, {data['state']}"
+    if key in seen:
+        return False
+    seen.add(key)
+    if fips:
+        data["fips"] = fips
+    data["year"] = args.year
+    data["age"] = args.age
+    data["metal"] = args.metal
+    results.append(data)
+    if args.checkpoint:
+        args.checkpoint.add_row(data)
+    RUN_TIMES.setdefault("first_row", time.perf_counter())
+    return True
+
+
+def state_prefix(args) -> str | None:
+    """FIPS prefix of the --state filter, so extraction can skip other states."""
+    return STATE_FIPS.get(args.state.upper()) if args.state else None
+
+
+def enough_rows(args, count: int) -> bool:
+    """Whether a method found enough counties to skip the fallbacks (any, for one state)."""
+    return count >= (1 if args.state else 50)
+
+
+def resumed_seen(args) -> set:
+    """County keys a resumed checkpoint already has for this combination."""
+    return args.checkpoint.seen(args) if args.checkpoint else set()
+
+
+def uncovered(args, points: list, keys: list[str]) -> tuple[list, list[str]]:
+    """Drop points a resumed checkpoint already hovered for this combination."""
+    if not args.checkpoint:
+        return points, keys
+    keep = [i for i, key in enumerate(keys) if not args.checkpoint.is_covered(args, key)]
+    if len(keep) < len(keys):
+        print(f"Skipping {len(keys) - len(keep)} points covered by the checkpoint")
+    return [points[i] for i in keep], [keys[i] for i in keep]
+
+
+def cover(args, keys: list[str]):
+    if args.checkpoint:
+        args.checkpoint.cover(args, keys)
+
+
+# Injected hover driver: dispatches a synthetic mousemove at each point and
+# uses a MutationObserver on #ichra-tip to tell whether the map rendered a
+# tooltip for it. A whole batch of hovers costs one evaluate round-trip.
+HOVER_DRIVER_JS = """
+async ([points, settleMs]) => {
+    const tip = document.getElementById('ichra-tip');
+    if (!tip) return null;
+    const observer = new MutationObserver(() => {});
+    observer.observe(tip, {childList: true, subtree: true, characterData: true});
+    const results = [];
+    for (const [x, y] of points) {
+        observer.takeRecords();
+        const target = document.elementFromPoint(x, y);
+        if (target) {
+            target.dispatchEvent(new MouseEvent('mousemove', {
+                bubbles: true, clientX: x, clientY: y, view: window,
+            }));
+        }
+        if (settleMs) await new Promise(resolve => setTimeout(resolve, settleMs));
+        results.push(observer.takeRecords().length ? tip.innerHTML : null);
+    }
+    observer.disconnect();
+    tip.style.display = 'none';
+    return results;
+}
+"""
+
+
+def tooltip_html_to_text(html: str) -> str:
+    """Flatten tooltip innerHTML to the text parse_tooltip expects."""
+    text = re.sub(r"<[^>]+>", " ", html)
+    return text.replace("&nbsp;", " ").replace("&amp;", "&")
+
+
+async def hover_points_batched(page, points: list, args, on_batch=None) -> list[str | None] | None:
+    """Hover points with the in-page driver, args.batch_size per round-trip.
+    
+    Returns the tooltip text seen at each point (None where nothing rendered),
+    or None if the driver can't be used on this page. on_batch(start, texts)
+    is called after each round-trip so callers can checkpoint as they go.
+    """
+    if args.batch_size <= 0 or not points:
+        return None
+    
+    texts = []
+    for start in range(0, len(points), args.batch_size):
+        batch = [[x, y] for x, y in points[start:start + args.batch_size]]
+        batch_start = time.perf_counter()
+        with PROFILE.span("hover.batch"):
+            htmls = await page.evaluate(HOVER_DRIVER_JS, [batch, 0])
+        if htmls is None:
+            return None
+        # One round-trip covers the whole batch; attribute its average to each hover
+        PROFILE.record("hover", (time.perf_counter() - batch_start) / len(batch), len(batch))
+        hits = sum(1 for h in htmls if h)
+        PROFILE.count("hover.hit", hits)
+        PROFILE.count("hover.miss", len(htmls) - hits)
+        batch_texts = [tooltip_html_to_text(h) if h else None for h in htmls]
+        texts.extend(batch_texts)
+        if on_batch:
+            with PROFILE.span("parse"):
+                on_batch(start, batch_texts)
+        if args.debug:
+            print(f"  Hovered {len(texts)}/{len(points)} points")
+    return texts
+
+
+# Reads every county path's bound d3 datum and fires its mousemove handler
+# in-page, collecting the tooltip the map renders for it. One round-trip
+# replaces ~3,100 Playwright hovers. An optional FIPS prefix limits it to
+# one state's counties.
+BULK_EXTRACT_JS = """
+(prefix) => {
+    const tip = document.getElementById('ichra-tip');
+    if (!tip) return [];
+    const rows = [];
+    for (const path of document.querySelectorAll('path.county')) {
+        const d = path.__data__;
+        if (!d || d.id == null) continue;
+        const fips = String(d.id).padStart(5, '0');
+        if (prefix && !fips.startsWith(prefix)) continue;
+        const box = path.getBoundingClientRect();
+        tip.innerHTML = '';
+        path.dispatchEvent(new MouseEvent('mousemove', {
+            bubbles: true,
+            clientX: box.x + box.width / 2,
+            clientY: box.y + box.height / 2,
+        }));
+        rows.push({fips: fips, text: tip.textContent});
+    }
+    tip.style.display = 'none';
+    return rows;
+}
+"""
 
 
-async def scrape_svg_map(page, args) -> list[dict]:
-    """Scrape data from SVG-based map by hovering over paths."""
+async def scrape_bound_data(page, args) -> list[dict]:
+    """Extract every county in one evaluate call using the d3-bound data."""
     results = []
-    seen = set()
+    seen = resumed_seen(args)
     
-    paths = await page.locator("svg path[d]").all()
-    paths = [p for p in paths if await p.bounding_box()]  # Filter visible paths
+    try:
+        with PROFILE.span("bulk.evaluate"):
+            rows = await page.evaluate(BULK_EXTRACT_JS, state_prefix(args))
+    except Exception as e:
+        print(f"Bulk extraction failed: {e}")
+        return results
     
-    print(f"Found {len(paths)} SVG paths to process")
+    print(f"Read {len(rows)} bound county paths")
     
-    for i, path in enumerate(paths):
+    with PROFILE.span("parse"):
+        for row in rows:
+            data = parse_tooltip(row["text"])
+            if data:
+                add_row(results, seen, data, args, fips=row["fips"])
+    
+    return results
+
+
+async def scrape_svg_map(page, args, shard: tuple[int, int] | None = None) -> list[dict]:
+    """Scrape data from SVG-based map by hovering over paths.
+
+    If shard is given as (index, count), only every count-th path starting
+    at index is visited, so several pages can split the map between them.
+    """
+    results = []
+    seen = resumed_seen(args)
+    label = f"[worker {shard[0] + 1}/{shard[1]}] " if shard else ""
+    
+    if args.batch_size > 0:
+        # Path centers in one call, then hover them with the in-page driver
+        with PROFILE.span("svg.centers"):
+            centers = await page.evaluate(SVG_PATH_CENTERS_JS, state_prefix(args))
+        keys = [f"svg:{i}" for i in range(len(centers))]
+        if shard:
+            index, count = shard
+            centers, keys = centers[index::count], keys[index::count]
+        keys = [k for k, c in zip(keys, centers) if c]
+        centers, keys = uncovered(args, [c for c in centers if c], keys)
+        
+        def take(start, batch_texts):
+            for text in batch_texts:
+                data = parse_tooltip(text) if text else None
+                if data:
+                    add_row(results, seen, data, args)
+            cover(args, keys[start:start + len(batch_texts)])
+        
+        if await hover_points_batched(page, centers, args, on_batch=take) is not None:
+            print(f"{label}Hovered {len(centers)} SVG paths in batches of {args.batch_size}")
+            return results
+    
+    with PROFILE.span("svg.find_paths"):
+        paths = list(enumerate(await page.locator("svg path[d]").all()))
+    if shard:
+        index, count = shard
+        paths = paths[index::count]
+    with PROFILE.span("svg.filter_visible"):
+        paths = [(i, p) for i, p in paths if await p.bounding_box()]  # Filter visible paths
+    if state_prefix(args):
+        in_state = await page.evaluate(SVG_PATH_CENTERS_JS, state_prefix(args))
+        paths = [(i, p) for i, p in paths if in_state[i]]
+    if args.checkpoint:
+        paths = [(i, p) for i, p in paths if not args.checkpoint.is_covered(args, f"svg:{i}")]
+    
+    print(f"{label}Found {len(paths)} SVG paths to process")
+    
+    for i, path in paths:
         try:
-            box = await path.bounding_box()
+            with PROFILE.span("bounding_box"):
+                box = await path.bounding_box()
             if not box or box["width"] < 2 or box["height"] < 2:
                 continue
             
             # Hover over center of path
-            await path.hover(force=True, timeout=1000)
-            await asyncio.sleep(0.15)
+            with PROFILE.span("hover"):
+                await path.hover(force=True, timeout=1000)
+                await asyncio.sleep(0.15)
             
             # Get tooltip
             tooltip_text = await get_tooltip_text(page)
+            PROFILE.count("hover.hit" if tooltip_text else "hover.miss")
             if tooltip_text:
                 data = parse_tooltip(tooltip_text)
-                if data:
-                    key = f"{data['county']}, {data['state']}"
-                    if key not in seen:
-                        seen.add(key)
-                        data["year"] = args.year
-                        data["age"] = args.age
-                        data["metal"] = args.metal
-                        results.append(data)
-                        
-                        if len(results) % 100 == 0:
-                            print(f"  Scraped {len(results)} counties...")
+                if data and add_row(results, seen, data, args):
+                    if len(results) % 100 == 0:
+                        print(f"  {label}Scraped {len(results)} counties...")
+            
+            cover(args, [f"svg:{i}"])
             
             if args.debug and i % 50 == 0:
-                print(f"  Progress: {i}/{len(paths)} paths checked, {len(results)} counties found")
+                print(f"  {label}Progress: path {i}, {len(results)} counties found")
                 
         except PlaywrightTimeout:
             continue
         except Exception as e:
             if args.debug:
-                print(f"  Error on path {i}: {e}")
+                print(f"  {label}Error on path {i}: {e}")
             continue
     
     return results
 
 
+# Center of every visible SVG path's bounding box (null for tiny paths, and
+# for paths whose bound feature is outside the given state FIPS prefix)
+SVG_PATH_CENTERS_JS = """
+(prefix) => Array.from(document.querySelectorAll('svg path[d]')).map(p => {
+    if (prefix) {
+        const d = p.__data__;
+        if (!d || d.id == null || !String(d.id).padStart(5, '0').startsWith(prefix)) return null;
+    }
+    const r = p.getBoundingClientRect();
+    return r.width >= 2 && r.height >= 2 ? [r.x + r.width / 2, r.y + r.height / 2] : null;
+})
+"""
+
+
+# Map geometry needed to place planned hover points: the rendered box and,
+# for the d3 SVG map, the viewBox the projection was fitted to.
+MAP_GEOMETRY_JS = """
+() => {
+    const svg = document.querySelector('#ichra-map svg') || document.querySelector('svg');
+    const canvas = document.querySelector('canvas');
+    const el = svg && svg.viewBox && svg.viewBox.baseVal && svg.viewBox.baseVal.width ? svg : canvas;
+    if (!el) return null;
+    const r = el.getBoundingClientRect();
+    const view = el === svg ? [svg.viewBox.baseVal.width, svg.viewBox.baseVal.height] : null;
+    return {box: {x: r.x, y: r.y, width: r.width, height: r.height}, view: view};
+}
+"""
+
+
+async def scrape_centroid_map(page, args) -> list[dict]:
+    """Hover exactly one interior point per county, planned from the TopoJSON."""
+    results = []
+    seen = resumed_seen(args)
+    
+    geometry = await page.evaluate(MAP_GEOMETRY_JS)
+    if not geometry or not COUNTIES_TOPOLOGY.exists():
+        print("Warning: Cannot plan county hover points (no map box or topology)")
+        return results
+    
+    with PROFILE.span("centroid.plan"):
+        points, outside = plan_hover_points(geometry["box"], geometry["view"], prefix=state_prefix(args))
+    print(f"Planned {len(points)} hover points ({len(outside)} counties outside the map)")
+    if outside and args.debug:
+        for county in outside:
+            print(f"  Outside map: {county['fips']} {county['name']}")
+    
+    points, _ = uncovered(args, points, [f"fips:{p['fips']}" for p in points])
+    
+    missed = []
+    
+    def take(start, batch_texts):
+        batch = points[start:start + len(batch_texts)]
+        for point, text in zip(batch, batch_texts):
+            data = parse_tooltip(text) if text else None
+            if data:
+                add_row(results, seen, data, args, fips=point["fips"])
+            else:
+                missed.append(point)
+        cover(args, [f"fips:{p['fips']}" for p in batch])
+    
+    texts = await hover_points_batched(page, [(p["x"], p["y"]) for p in points], args, on_batch=take)
+    if texts is not None:
+        points = []  # Already hovered
+    
+    for i, point in enumerate(points):
+        try:
+            with PROFILE.span("hover"):
+                await page.mouse.move(point["x"], point["y"])
+                await asyncio.sleep(0.05)  # Brief pause for tooltip to appear
+            
+            tooltip_text = await get_tooltip_text(page)
+            PROFILE.count("hover.hit" if tooltip_text else "hover.miss")
+            data = parse_tooltip(tooltip_text) if tooltip_text else None
+            cover(args, [f"fips:{point['fips']}"])
+            if not data:
+                missed.append(point)
+                continue
+            
+            if add_row(results, seen, data, args, fips=point["fips"]):
+                if len(results) % 100 == 0:
+                    print(f"  Scraped {len(results)} counties...")
+        except Exception as e:
+            if args.debug:
+                print(f"  Error at county {point['fips']}: {e}")
+            missed.append(point)
+    
+    print(f"Hovered planned points: {len(results)} counties, {len(missed)} without a tooltip")
+    if missed and args.debug:
+        for point in missed:
+            print(f"  No tooltip: {point['fips']} {point['name']}")
+    
+    return results
+
+
 async def scrape_canvas_map(page, args) -> list[dict]:
     """Scrape data from canvas-based map (Mapbox GL) using coordinate grid."""
     results = []
-    seen = set()
+    seen = resumed_seen(args)
+    
+    # One planned point per county is far cheaper than the grid sweep
+    if COUNTIES_TOPOLOGY.exists():
+        results = await scrape_centroid_map(page, args)
+        if enough_rows(args, len(results) + len(seen)):
+            return results
+        print("Planned hovering found too few counties, falling back to grid scan...")
+        results = []
     
     # Find the map canvas
     canvas = page.locator("canvas").first
@@ -235,6 +505,12 @@ async def scrape_canvas_map(page, args) -> list[dict]:
     
     print(f"Map canvas found: {box['width']}x{box['height']}")
     
+    if state_prefix(args) and COUNTIES_TOPOLOGY.exists():
+        bounds = state_box(box, state_prefix(args))
+        if bounds:
+            print(f"Limiting the scan to {args.state.upper()}: {bounds['width']:.0f}x{bounds['height']:.0f}")
+            box = bounds
+    
     # Create a grid of points to hover over
     # Denser grid = more complete but slower
     step_x = 8  # pixels between hover points
@@ -243,37 +519,301 @@ async def scrape_canvas_map(page, args) -> list[dict]:
     total_points = int((box["width"] / step_x) * (box["height"] / step_y))
     print(f"Scanning {total_points} points across map...")
     
+    grid = [
+        (x, y)
+        for y in range(int(box["y"]), int(box["y"] + box["height"]), step_y)
+        for x in range(int(box["x"]), int(box["x"] + box["width"]), step_x)
+    ]
+    grid, keys = uncovered(args, grid, [f"grid:{x},{y}" for x, y in grid])
+    
+    def take(start, batch_texts):
+        for text in batch_texts:
+            data = parse_tooltip(text) if text else None
+            if data:
+                add_row(results, seen, data, args)
+        cover(args, keys[start:start + len(batch_texts)])
+    
+    if await hover_points_batched(page, grid, args, on_batch=take) is not None:
+        return results
+    
     points_checked = 0
     
-    for y in range(int(box["y"]), int(box["y"] + box["height"]), step_y):
-        for x in range(int(box["x"]), int(box["x"] + box["width"]), step_x):
-            try:
+    for x, y in grid:
+        try:
+            with PROFILE.span("hover"):
                 await page.mouse.move(x, y)
                 await asyncio.sleep(0.05)  # Brief pause for tooltip to appear
+            
+            tooltip_text = await get_tooltip_text(page)
+            PROFILE.count("hover.hit" if tooltip_text else "hover.miss")
+            if tooltip_text:
+                data = parse_tooltip(tooltip_text)
+                if data and add_row(results, seen, data, args):
+                    if len(results) % 50 == 0:
+                        print(f"  Found {len(results)} unique counties...")
+            cover(args, [f"grid:{x},{y}"])
+            
+            points_checked += 1
+            if points_checked % 5000 == 0:
+                print(f"  Scanned {points_checked}/{total_points} points, found {len(results)} counties")
                 
-                tooltip_text = await get_tooltip_text(page)
-                if tooltip_text:
-                    data = parse_tooltip(tooltip_text)
-                    if data:
-                        key = f"{data['county']}, {data['state']}"
-                        if key not in seen:
-                            seen.add(key)
-                            data["year"] = args.year
-                            data["age"] = args.age
-                            data["metal"] = args.metal
-                            results.append(data)
-                            
-                            if len(results) % 50 == 0:
-                                print(f"  Found {len(results)} unique counties...")
-                
-                points_checked += 1
-                if points_checked % 5000 == 0:
-                    print(f"  Scanned {points_checked}/{total_points} points, found {len(results)} counties")
-                    
-            except Exception as e:
-                if args.debug:
-                    print(f"  Error at ({x},{y}): {e}")
-                continue
+        except Exception as e:
+            if args.debug:
+                print(f"  Error at ({x},{y}): {e}")
+            continue
+    
+    return results
+
+
+async def new_map_page(browser, assets: AssetRouter = None):
+    """Create a fresh context and page with the scraper's viewport and UA."""
+    context = await browser.new_context(
+        viewport={"width": 1920, "height": 1080},
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+    )
+    if assets:
+        await assets.install(context)
+    return await context.new_page()
+
+
+async def open_map_page(browser, args):
+    """Open a new context and page, load the map and apply the filters."""
+    with PROFILE.span("page.new"):
+        page = await new_map_page(browser, args.assets)
+    
+    print("Loading page...")
+    with PROFILE.span("page.load"):
+        await goto_map(page, args.url)
+    print("Page loaded.")
+    
+    # Set filters
+    with PROFILE.span("filters.set"):
+        await set_map_filters(page, args.year, args.age, args.metal)
+    
+    # Scroll to map section (layout updates synchronously, no wait needed)
+    await page.evaluate("window.scrollBy(0, 400)")
+    
+    return page
+
+
+async def scrape_svg_sharded(browser, page, args) -> list[dict]:
+    """Split the SVG paths across several pages and hover them in parallel.
+    
+    The already-loaded page takes shard 0; each remaining worker opens its
+    own context so mouse state and tooltips don't interfere.
+    """
+    workers = args.workers
+    pages = [page] + list(await asyncio.gather(
+        *(open_map_page(browser, args) for _ in range(workers - 1))
+    ))
+    
+    shard_results = await asyncio.gather(
+        *(scrape_svg_map(pg, args, shard=(i, workers)) for i, pg in enumerate(pages))
+    )
+    
+    # Merge and deduplicate by county key
+    results = []
+    seen = set()
+    for rows in shard_results:
+        for data in rows:
+            key = f"{data['county']}, {data['state']}"
+            if key not in seen:
+                seen.add(key)
+                results.append(data)
+    
+    print(f"Merged {sum(len(r) for r in shard_results)} rows from {workers} workers "
+          f"into {len(results)} unique counties")
+    return results
+
+
+async def scrape_by_hover(browser, page, args) -> list[dict]:
+    """Detect the map type and scrape it by hovering over each county."""
+    svg_paths = await page.locator("svg path[d]").count()
+    canvas_elements = await page.locator("canvas").count()
+    
+    print(f"Detected: {svg_paths} SVG paths, {canvas_elements} canvas elements")
+    
+    use_svg = args.method == "svg" or (args.method != "canvas" and svg_paths > 100)
+    use_canvas = args.method == "canvas" or (args.method != "svg" and canvas_elements > 0)
+    
+    if args.method == "centroid":
+        print("Using centroid-planned hover method...")
+        return await scrape_centroid_map(page, args)
+    elif use_svg and args.workers > 1:
+        print(f"Using SVG scraping method with {args.workers} workers...")
+        return await scrape_svg_sharded(browser, page, args)
+    elif use_svg:
+        print("Using SVG scraping method...")
+        return await scrape_svg_map(page, args)
+    elif use_canvas:
+        print("Using canvas/Mapbox scraping method...")
+        return await scrape_canvas_map(page, args)
+    
+    print("Warning: Could not detect map type. Trying both methods...")
+    results = await scrape_svg_map(page, args)
+    if not enough_rows(args, len(results)):
+        results = await scrape_canvas_map(page, args)
+    return results
+
+
+def record_to_row(record: dict) -> dict:
+    """Convert a raw premium record from the data file to an output row."""
+    return {
+        "county": record.get("n", ""),
+        "state": record.get("st", ""),
+        "fips": record.get("f", ""),
+        "individual_premium": record.get("i"),
+        "small_group_premium": record.get("s"),
+        "difference": record.get("d"),
+        "year": 2000 + record.get("year", 0),
+        "age": record.get("age"),
+        "metal": record.get("lvl", ""),
+    }
+
+
+async def capture_map_data(browser, args) -> list[dict]:
+    """Capture the premium data file as the page loads it, skipping hovers.
+    
+    The file holds every year/age/metal combination, so all of them are
+    returned regardless of --year/--age/--metal.
+    """
+    page = await new_map_page(browser, args.assets)
+    captured = asyncio.get_running_loop().create_future()
+    
+    async def on_response(response):
+        name = response.url.split("?")[0].rsplit("/", 1)[-1]
+        if captured.done() or not DATA_FILE_PATTERN.fullmatch(name):
+            return
+        try:
+            payload = await response.json()
+        except Exception as e:
+            if not captured.done():
+                captured.set_exception(e)
+            return
+        if not captured.done():
+            captured.set_result((response.url, payload))
+    
+    page.on("response", on_response)
+    
+    print("Loading page and waiting for data file...")
+    try:
+        with PROFILE.span("capture.download"):
+            await page.goto(args.url, wait_until="domcontentloaded", timeout=60000)
+            data_url, payload = await asyncio.wait_for(captured, timeout=60)
+    except Exception as e:
+        print(f"Error: Could not capture data file: {e}")
+        return []
+    
+    name = data_url.split("?")[0].rsplit("/", 1)[-1]
+    print(f"Captured {data_url}")
+    if name != KNOWN_DATA_FILE:
+        print(f"Note: data file changed from {KNOWN_DATA_FILE} to {name}")
+        print(f"      Update DATA_URL in export_county_data.py / export_state_data.py if needed.")
+    
+    records = payload if isinstance(payload, list) else []
+    print(f"Captured {len(records)} records")
+    if records:
+        RUN_TIMES.setdefault("first_row", time.perf_counter())
+    
+    if args.raw_output:
+        with open(args.raw_output, "w") as f:
+            json.dump(records, f)
+        print(f"Saved raw data to {args.raw_output}")
+    
+    return [record_to_row(r) for r in records]
+
+
+async def extract_current_view(browser, page, args) -> list[dict]:
+    """Extract the map as currently filtered, using the selected method."""
+    results = []
+    if args.method in ("auto", "bulk"):
+        print("Using bulk in-page extraction...")
+        results = await scrape_bound_data(page, args)
+        # Rows restored from a checkpoint count towards the threshold
+        if not enough_rows(args, len(results) + len(resumed_seen(args))) and args.method == "auto":
+            print(f"Bulk extraction found only {len(results)} counties, falling back to hovering...")
+            results = []
+    
+    if not results and args.method != "bulk":
+        results = await scrape_by_hover(browser, page, args)
+    
+    return results
+
+
+# Option values of the year, age and metal dropdowns (year values are "17".."26")
+FILTER_OPTIONS_JS = """
+() => Object.fromEntries(['year', 'age', 'metal'].map(name => {
+    const sel = document.getElementById('ichra-' + name);
+    return [name, sel ? Array.from(sel.options).map(o => o.value) : []];
+}))
+"""
+
+async def select_combination(page, year_value: str, age_value: str, metal_value: str):
+    """Select one year/age/metal combination and wait for the map to re-render."""
+    current = await page.evaluate(
+        "() => ['year', 'age', 'metal'].map(n => document.getElementById('ichra-' + n).value)"
+    )
+    wanted = [year_value, age_value, metal_value]
+    if current == wanted:
+        return
+    
+    with PROFILE.span("filters.select"):
+        for name, value, old in zip(("year", "age", "metal"), wanted, current):
+            if value != old:
+                await page.locator(f"#ichra-{name}").select_option(value)
+        await wait_for_map_ready(page, quiet=True)
+
+
+async def scrape_all_combinations(browser, page, args) -> list[dict]:
+    """Loop every year/age/metal option on one loaded page and extract each."""
+    options = await page.evaluate(FILTER_OPTIONS_JS)
+    combos = [
+        (year, age, metal)
+        for year in options["year"]
+        for age in options["age"]
+        for metal in options["metal"]
+    ]
+    print(f"Sweeping {len(combos)} combinations "
+          f"({len(options['year'])} years x {len(options['age'])} ages x {len(options['metal'])} metals)")
+    
+    results = []
+    timings = []
+    for n, (year_value, age_value, metal_value) in enumerate(combos, 1):
+        start = time.perf_counter()
+        combo_args = argparse.Namespace(**{
+            **vars(args),
+            "year": 2000 + int(year_value),
+            "age": int(age_value),
+            "metal": metal_value.lower(),
+            "workers": 1,  # Shards would reload the page per combination
+        })
+        if args.checkpoint and args.checkpoint.is_done(combo_args):
+            print(f"  [{n}/{len(combos)}] {combo_args.year} / age {combo_args.age} / {combo_args.metal}: "
+                  f"done in checkpoint, skipping")
+            continue
+        try:
+            await select_combination(page, year_value, age_value, metal_value)
+            render_time = time.perf_counter() - start
+            rows = await extract_current_view(browser, page, combo_args)
+        except Exception as e:
+            print(f"  Error on {combo_args.year}/{combo_args.age}/{combo_args.metal}: {e}")
+            continue
+        
+        elapsed = time.perf_counter() - start
+        timings.append((combo_args.year, combo_args.age, combo_args.metal, len(rows), render_time, elapsed))
+        results.extend(rows)
+        if args.checkpoint:
+            args.checkpoint.finish(combo_args)
+        print(f"  [{n}/{len(combos)}] {combo_args.year} / age {combo_args.age} / {combo_args.metal}: "
+              f"{len(rows)} counties in {elapsed:.1f}s (render {render_time:.1f}s)")
+    
+    if timings:
+        print(f"\n{'Year':<6} {'Age':>4} {'Metal':<8} {'Counties':>9} {'Render':>8} {'Total':>8}")
+        print("-" * 48)
+        for year, age, metal, count, render_time, elapsed in timings:
+            print(f"{year:<6} {age:>4} {metal:<8} {count:>9} {render_time:>7.2f}s {elapsed:>7.2f}s")
+        total = sum(t[-1] for t in timings)
+        print(f"Average {total / len(timings):.2f}s per combination")
     
     return results
 
@@ -283,78 +823,77 @@ async def scrape_map(args):
     print(f"\n{'='*60}")
     print(f"Ideon ICHRA Map Scraper")
     print(f"{'='*60}")
-    print(f"URL: {URL}")
-    print(f"Parameters: Year={args.year}, Age={args.age}, Metal={args.metal}")
+    print(f"URL: {args.url}")
+    if args.all_combinations:
+        print("Parameters: all year/age/metal combinations")
+    else:
+        print(f"Parameters: Year={args.year}, Age={args.age}, Metal={args.metal}")
+    if args.state:
+        print(f"State: {args.state.upper()} (FIPS {state_prefix(args)})")
     print(f"Output: {args.output}")
+    print(f"Method: {args.method}")
+    if args.workers > 1:
+        print(f"Workers: {args.workers}")
     print(f"{'='*60}\n")
     
+    # Shared by every context so the stats cover the whole run
+    args.assets = None
+    if not args.no_asset_routing:
+        cache = AssetCache(Path(args.asset_cache))
+        cache.seed()
+        args.assets = AssetRouter(cache)
+    
     async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=not args.debug,
-            args=["--disable-web-security"]  # Help with some CORS issues
-        )
-        
-        context = await browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-        )
-        
-        page = await context.new_page()
+        leased = None
+        if args.daemon and args.method != "capture":
+            with PROFILE.span("daemon.lease"):
+                leased = await lease_page(p, args.daemon)
+            if leased:
+                print(f"Using warm page {leased[2]} from {args.daemon}")
+            else:
+                print(f"No page available from {args.daemon}, launching a browser")
         
-        print("Loading page...")
-        await page.goto(URL, wait_until="networkidle", timeout=60000)
-        print("Page loaded.")
-        
-        # Set filters
-        await set_map_filters(page, args.year, args.age, args.metal)
-        
-        # Scroll to map section
-        await page.evaluate("window.scrollBy(0, 400)")
-        await asyncio.sleep(1)
-        
-        # Determine map type and scrape accordingly
-        svg_paths = await page.locator("svg path[d]").count()
-        canvas_elements = await page.locator("canvas").count()
+        if leased:
+            browser, page, page_name = leased
+            ok = False
+            try:
+                if args.all_combinations:
+                    results = await scrape_all_combinations(browser, page, args)
+                else:
+                    await select_combination(page, str(args.year - 2000), str(args.age), args.metal)
+                    results = await extract_current_view(browser, page, args)
+                ok = True
+            finally:
+                # Only disconnects; the daemon keeps the browser and the page
+                await browser.close()
+                await release_page(args.daemon, page_name, ok)
+            
+            if args.assets:
+                args.assets.report()
+            return results
         
-        print(f"Detected: {svg_paths} SVG paths, {canvas_elements} canvas elements")
+        with PROFILE.span("browser.launch"):
+            browser = await p.chromium.launch(
+                headless=not args.debug,
+                args=["--disable-web-security"]  # Help with some CORS issues
+            )
         
-        if svg_paths > 100:
-            print("Using SVG scraping method...")
-            results = await scrape_svg_map(page, args)
-        elif canvas_elements > 0:
-            print("Using canvas/Mapbox scraping method...")
-            results = await scrape_canvas_map(page, args)
+        if args.method == "capture":
+            results = await capture_map_data(browser, args)
         else:
-            print("Warning: Could not detect map type. Trying both methods...")
-            results = await scrape_svg_map(page, args)
-            if len(results) < 50:
-                results = await scrape_canvas_map(page, args)
+            page = await open_map_page(browser, args)
+            
+            if args.all_combinations:
+                results = await scrape_all_combinations(browser, page, args)
+            else:
+                results = await extract_current_view(browser, page, args)
         
         await browser.close()
         
-        return results
-
-
-def write_csv(results: list[dict], output_path: str):
-    """Write results to CSV file."""
-    if not results:
-        print("No data to write!")
-        return
-    
-    fieldnames = [
-        "county", "state", "fips", "individual_premium", 
-        "small_group_premium", "difference", "year", "age", "metal"
-    ]
-    
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-        writer.writeheader()
+        if args.assets:
+            args.assets.report()
         
-        # Sort by state, then county
-        sorted_results = sorted(results, key=lambda x: (x.get("state", ""), x.get("county", "")))
-        writer.writerows(sorted_results)
-    
-    print(f"\nWrote {len(results)} rows to {output_path}")
+        return results
 
 
 def main():
@@ -369,29 +908,113 @@ def main():
                         choices=["bronze", "silver", "gold"],
                         help="Metal tier")
     parser.add_argument("--output", "-o", type=str, default="ideon_county_data.csv",
-                        help="Output CSV file path")
+                        help="Output file path")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="Output format (parquet/feather need pyarrow)")
     parser.add_argument("--state", type=str, default=None,
                         help="Filter to single state (e.g., TX, CA)")
+    parser.add_argument("--method", type=str, default="auto",
+                        choices=["auto", "capture", "bulk", "centroid", "svg", "canvas"],
+                        help="Extraction method (auto tries bulk, then falls back to hovering; "
+                             "capture saves the page's data file with every combination)")
+    parser.add_argument("--raw-output", type=str, default=None,
+                        help="With --method capture, also save the raw data JSON here")
+    parser.add_argument("--all-combinations", action="store_true",
+                        help="Extract every year/age/metal combination from one page load")
+    parser.add_argument("--batch-size", type=int, default=250,
+                        help="Hovers per in-page driver call (0 = hover with Playwright one by one)")
+    parser.add_argument("--asset-cache", type=str, default=str(DEFAULT_CACHE_DIR),
+                        help="Directory for cached d3/topojson/atlas files")
+    parser.add_argument("--no-asset-routing", action="store_true",
+                        help="Load every page resource from the network (no blocking or caching)")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Number of parallel pages for SVG scraping")
+    parser.add_argument("--url", type=str, default=URL,
+                        help="Map page URL (e.g. a local fixture_server.py)")
+    parser.add_argument("--checkpoint", dest="checkpoint_file", type=str, default=None,
+                        help="JSONL checkpoint path (default: <output>.checkpoint.jsonl, removed on success)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the checkpoint of an interrupted run")
+    parser.add_argument("--overwrite-checkpoint", action="store_true",
+                        help="Start over even if an interrupted run left a checkpoint")
+    parser.add_argument("--daemon", type=str, default=None,
+                        help="Lease a warm page from browser_daemon.py at this URL (e.g. http://127.0.0.1:8767)")
+    parser.add_argument("--stats-json", type=str, default=None,
+                        help="Write run stats (rows, elapsed, time to first row) to this JSON file")
+    parser.add_argument("--profile", nargs="?", const="profile.json", default=None,
+                        help="Time each phase and hover; write the report here (default: profile.json)")
     parser.add_argument("--debug", action="store_true",
                         help="Show browser and verbose output")
     
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.state and args.state.upper() not in STATE_FIPS:
+        parser.error(f"unknown state: {args.state}")
+    if args.format != "csv" and not arrow_available():
+        parser.error("pyarrow not installed. Run: pip install pyarrow")
+    
+    # Rows and hovered points are appended here as they arrive (capture is a single download)
+    args.checkpoint = None
+    if args.method != "capture":
+        try:
+            args.checkpoint = Checkpoint(args.checkpoint_file or f"{args.output}.checkpoint.jsonl",
+                                         args.resume, args.overwrite_checkpoint)
+        except FileExistsError as e:
+            parser.error(str(e))
+    
+    if args.profile:
+        PROFILE.enable()
     
     # Run scraper
     start_time = datetime.now()
-    results = asyncio.run(scrape_map(args))
-    
-    # Filter by state if requested
+    RUN_TIMES["start"] = time.perf_counter()
+    try:
+        results = asyncio.run(scrape_map(args))
+    except BaseException:
+        if args.checkpoint:
+            args.checkpoint.close()
+            print(f"\nProgress saved in {args.checkpoint.path}; rerun with --resume to continue")
+        if args.profile:
+            PROFILE.write(args.profile)
+        raise
+    
+    if args.checkpoint:
+        results = args.checkpoint.merge(results)
+    
+    # Extraction already skips other states; this drops neighbours a bounding-box
+    # scan picked up (and everything else for --method capture)
     if args.state:
         results = [r for r in results if r.get("state", "").upper() == args.state.upper()]
         print(f"Filtered to {len(results)} counties in {args.state.upper()}")
     
     # Write output
-    write_csv(results, args.output)
+    with PROFILE.span("output.write"):
+        write_output(results, args.output, args.format)
+    if args.checkpoint:
+        args.checkpoint.discard()
     
     elapsed = datetime.now() - start_time
     print(f"\nCompleted in {elapsed.total_seconds():.1f} seconds")
-    print(f"Found {len(results)} unique counties")
+    if args.all_combinations:
+        print(f"Found {len(results)} county rows across all combinations")
+    else:
+        print(f"Found {len(results)} unique counties")
+    
+    if args.stats_json:
+        first_row = RUN_TIMES.get("first_row")
+        stats = {
+            "method": args.method,
+            "url": args.url,
+            "rows": len(results),
+            "elapsed_seconds": elapsed.total_seconds(),
+            "first_row_seconds": first_row - RUN_TIMES["start"] if first_row else None,
+        }
+        with open(args.stats_json, "w") as f:
+            json.dump(stats, f, indent=2)
+    
+    if args.profile:
+        PROFILE.write(args.profile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Local HTTP lookup service for county premiums.
+Loads the premium data once into a PremiumIndex and answers JSON lookups
+by county, state and filter combination, with an LRU cache of encoded
+responses. The index is rebuilt (and the cache cleared) when the data
+file changes on disk.
+
+Endpoints (all take optional ?year=2026&age=50&metal=gold filters):
+    GET /county/{fips}     one county's rows
+    GET /state/{st}        all rows for a state's counties
+    GET /aggregate         per-state mean/min/max (optionally &state=TX)
+    GET /health            row count, load time and cache stats (never cached)
+
+Usage:
+    python serve_premiums.py serve --cache county_data_raw.json --port 8765
+    python serve_premiums.py bench --cache county_data_raw.json --requests 5000 --concurrency 8
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from export_county_data import county_row
+from premium_index import load_index
+
+DEFAULT_PORT = 8765
+
+PREMIUM_FIELDS = {"i": "individual_premium", "s": "small_group_premium", "d": "difference"}
+
+# Paths whose response changes between calls; never served from the response cache
+UNCACHED_PATHS = {"/health"}
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of encoded responses."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses}
+
+
+class PremiumService:
+    """The index plus request routing; reloads when the data file changes."""
+
+    def __init__(self, cache_file: Path, cache_size: int = 1024, reload_interval: float = 1.0):
+        self.cache_file = cache_file
+        self.responses = ResponseCache(cache_size)
+        self.reload_interval = reload_interval
+        self.lock = threading.Lock()         # Guards swapping in a new index
+        self.reload_lock = threading.Lock()  # One rebuild at a time, off the request path of others
+        self.index = None
+        self.generation = 0
+        self.loaded_at = None
+        self.load_seconds = None
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_error = None
+        self.checked = 0.0
+        self.reload()
+
+    def reload(self):
+        """Load (or reuse) the index for the current file and drop cached responses if it changed.
+
+        The index is built without holding the swap lock, so requests keep
+        being answered from the current one. If the file is missing or can't
+        be read (e.g. mid-rewrite), the error is logged and the current index
+        stays in service; only the initial load raises.
+        """
+        start = time.perf_counter()
+        try:
+            index = load_index(self.cache_file)
+        except Exception as e:
+            if self.index is None:
+                raise
+            self.reload_errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"Reload of {self.cache_file} failed ({self.last_error}); serving generation {self.generation}")
+            return
+
+        if index is self.index:
+            return
+        with self.lock:
+            self.reloads += self.index is not None
+            self.index = index
+            self.generation += 1
+            self.loaded_at = datetime.now().isoformat(timespec="seconds")
+            self.load_seconds = time.perf_counter() - start
+            self.last_error = None
+            self.responses.clear()
+        print(f"Loaded {len(index)} records from {self.cache_file} in {self.load_seconds:.2f}s")
+
+    def maybe_reload(self):
+        """Check the file at most once per reload_interval (skipped while another thread reloads)."""
+        now = time.monotonic()
+        if now - self.checked < self.reload_interval:
+            return
+        if not self.reload_lock.acquire(blocking=False):
+            return
+        try:
+            if now - self.checked >= self.reload_interval:
+                self.checked = now
+                self.reload()
+        finally:
+            self.reload_lock.release()
+
+    def handle(self, path: str, query: str) -> tuple[int, bytes]:
+        """Return (status, JSON body) for a request path and query string."""
+        self.maybe_reload()
+
+        # Keys carry the index generation, so a response computed from an index
+        # replaced mid-request can't be served after the reload
+        with self.lock:
+            index, generation = self.index, self.generation
+        cacheable = path not in UNCACHED_PATHS
+        key = (generation, path, query)
+        if cacheable:
+            cached = self.responses.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            status, payload = self.route(index, path, parse_qs(query))
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        response = (status, json.dumps(payload).encode())
+        if status == 200 and cacheable:
+            self.responses.put(key, response)
+        return response
+
+    def route(self, index, path: str, params: dict) -> tuple[int, dict]:
+        filters = parse_filters(params)
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["health"]:
+            return 200, {
+                "records": len(index),
+                "source": str(self.cache_file),
+                "loaded_at": self.loaded_at,
+                "load_seconds": round(self.load_seconds, 3),
+                "reloads": self.reloads,
+                "generation": self.generation,
+                "reload_errors": self.reload_errors,
+                "last_error": self.last_error,
+                "cache": self.responses.stats(),
+            }
+
+        if len(parts) == 2 and parts[0] == "county":
+            rows = [county_row(r) for r in index.county(parts[1], **filters)]
+            if not rows:
+                return 404, {"error": f"No data for county {parts[1]}"}
+            return 200, {"fips": parts[1].zfill(5), "count": len(rows), "rows": rows}
+
+        if len(parts) == 2 and parts[0] == "state":
+            rows = [county_row(r) for r in index.state(parts[1], **filters)]
+            if not rows:
+                return 404, {"error": f"No data for state {parts[1]}"}
+            rows.sort(key=lambda r: (r["county"], r["year"], r["age"], r["metal_tier"]))
+            return 200, {"state": parts[1].upper(), "count": len(rows), "rows": rows}
+
+        if parts == ["aggregate"]:
+            state = params.get("state", [None])[0]
+            records = index.state(state, **filters) if state else index.select(**filters)
+            return 200, {"filters": filters, "states": aggregate(records)}
+
+        return 404, {"error": f"Unknown path {path}"}
+
+
+def parse_filters(params: dict) -> dict:
+    """year/age/metal query parameters -> PremiumIndex filter kwargs."""
+    filters = {}
+    for name in ("year", "age"):
+        if name in params:
+            try:
+                filters[name] = int(params[name][0])
+            except ValueError:
+                raise ValueError(f"{name} must be an integer")
+    if "metal" in params:
+        filters["metal"] = params["metal"][0].lower()
+    return filters
+
+
+def aggregate(records: list[dict]) -> dict:
+    """Per-state count and mean/min/max of each premium field."""
+    groups = defaultdict(list)
+    for r in records:
+        groups[r.get("st", "")].append(r)
+
+    result = {}
+    for state, rows in sorted(groups.items()):
+        stats = {"count": len(rows)}
+        for key, name in PREMIUM_FIELDS.items():
+            values = [r[key] for r in rows if r.get(key) is not None]
+            stats[name] = {
+                "mean": round(statistics.mean(values), 2),
+                "min": min(values),
+                "max": max(values),
+            } if values else None
+        result[state] = stats
+    return result
+
+
+def make_handler(service: PremiumService, quiet: bool = True):
+    """Request handler class bound to a service."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status, body = service.handle(url.path, url.query)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+class PremiumServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections under concurrent load
+    request_queue_size = 128
+
+
+def start_server(service: PremiumService, host: str, port: int, quiet: bool = True) -> PremiumServer:
+    return PremiumServer((host, port), make_handler(service, quiet))
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def run_benchmark(base_url: str, paths: list[str], requests: int, concurrency: int) -> dict:
+    """Fire requests at the server and measure per-request latency and throughput."""
+    def fetch(path):
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base_url + path, timeout=30) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            e.read()
+        return time.perf_counter() - start
+
+    sample = [random.choice(paths) for _ in range(requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(fetch, sample))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def benchmark_paths(service: PremiumService) -> list[str]:
+    """A realistic mix of county, state and aggregate lookups."""
+    fips = [f for f in service.index.by_fips if f]
+    states = [s for s in service.index.by_state if s]
+    years = sorted({code + 2000 for code, _, _ in service.index.partitions})
+    paths = []
+    for f in random.sample(fips, min(500, len(fips))):
+        paths.append(f"/county/{f}?year={random.choice(years)}")
+    for st in states:
+        paths.append(f"/state/{st}?year={years[-1]}&age=50&metal=gold")
+    for metal in ("bronze", "silver", "gold"):
+        paths.append(f"/aggregate?year={years[-1]}&age=50&metal={metal}")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP lookup service for county premiums")
+    parser.add_argument("--cache", type=str, default="county_data_raw.json", help="Premium JSON file path")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Cached responses kept (LRU)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Run the service")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    serve_parser.add_argument("--verbose", action="store_true", help="Log every request")
+
+    bench_parser = sub.add_parser("bench", help="Measure latency and throughput against an in-process server")
+    bench_parser.add_argument("--requests", type=int, default=5000, help="Requests per pass")
+    bench_parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+
+    args = parser.parse_args()
+
+    cache_path = Path(args.cache)
+    if not cache_path.exists():
+        print(f"Error: Cache file not found: {cache_path}")
+        print("Run export_county_data.py first to download the data.")
+        sys.exit(1)
+
+    service = PremiumService(cache_path, cache_size=args.cache_size)
+
+    if args.command == "serve":
+        server = start_server(service, args.host, args.port, quiet=not args.verbose)
+        print(f"Serving on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        return
+
+    server = start_server(service, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    paths = benchmark_paths(service)
+
+    print(f"\nBenchmark: {args.requests} requests x {args.concurrency} clients over {len(paths)} distinct URLs")
+    print(f"{'Pass':<12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label in ("cold cache", "warm cache"):
+        if label == "cold cache":
+            service.responses.clear()
+        result = run_benchmark(base_url, paths, args.requests, args.concurrency)
+        print(f"{label:<12} {result['throughput']:>8.0f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {result['max_ms']:>8.2f}")
+    print(f"Cache: {service.responses.stats()}")
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Typed table output for the exporters and the scraper.
+Writes rows as CSV, Parquet or Feather (Arrow IPC). The binary formats use
+an explicit schema: FIPS stays a zero-padded string, blank premiums stay
+nulls, and state/tier columns are dictionary-encoded so pandas loads them
+as categoricals. Parquet output can be partitioned into hive-style
+directories (year=2026/state_abbr=CA/...).
+
+Usage:
+    python table_output.py data/ideon_counties_2026.csv --format parquet
+"""
+
+import argparse
+import csv
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+FORMATS = ["csv", "parquet", "feather"]
+
+SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+# Column type names used by the schemas below
+TYPES = {
+    "string": lambda: pa.string(),
+    "category": lambda: pa.dictionary(pa.int16(), pa.string()),
+    "money": lambda: pa.float64(),
+    "int": lambda: pa.int32(),
+    "small": lambda: pa.int16(),
+}
+
+# Column -> type for each table. Columns not listed default to "money".
+COUNTY_COLUMNS = {
+    "fips": "string",
+    "county": "string",
+    "state_abbr": "category",
+    "state_name": "category",
+    "individual_premium": "money",
+    "small_group_premium": "money",
+    "difference": "money",
+    "year": "small",
+    "age": "small",
+    "metal_tier": "category",
+}
+
+SCRAPED_COLUMNS = {
+    "county": "string",
+    "state": "category",
+    "fips": "string",
+    "individual_premium": "money",
+    "small_group_premium": "money",
+    "difference": "money",
+    "year": "small",
+    "age": "small",
+    "metal": "category",
+}
+
+STATE_COLUMNS = {
+    "state_abbr": "category",
+    "state_name": "category",
+    "county_count": "int",
+    "year": "small",
+    "age": "small",
+    "metal_tier": "category",
+    # *_nulls columns are counts
+}
+
+
+# Partition key -> output column holding its value (same in county and state exports)
+PARTITION_KEYS = {
+    "year": "year",
+    "state": "state_abbr",
+    "age": "age",
+    "metal": "metal_tier",
+}
+
+
+def parse_partition_keys(value: str) -> list[str]:
+    """argparse type for --partition-by (comma-separated partition keys)."""
+    keys = [k.strip() for k in value.split(",") if k.strip()]
+    unknown = [k for k in keys if k not in PARTITION_KEYS]
+    if unknown or not keys:
+        raise argparse.ArgumentTypeError(
+            f"invalid partition keys {unknown or value!r} (choose from {', '.join(PARTITION_KEYS)})")
+    return keys
+
+
+def arrow_available() -> bool:
+    """True if pyarrow is importable."""
+    return pa is not None
+
+
+def output_path(path: str, fmt: str) -> Path:
+    """Give a file path the suffix for fmt (states.csv -> states.parquet)."""
+    path = Path(path)
+    return path.with_suffix(SUFFIXES[fmt]) if path.suffix in SUFFIXES.values() else path
+
+
+def arrow_schema(fieldnames: list[str], columns: dict[str, str]):
+    """Arrow schema for fieldnames, in order, typed from a column spec."""
+    def type_name(name):
+        if name in columns:
+            return columns[name]
+        return "int" if name.endswith("_nulls") else "money"
+
+    return pa.schema([(name, TYPES[type_name(name)]()) for name in fieldnames])
+
+
+def write_csv_rows(rows: list[dict], path: Path, fieldnames: list[str]):
+    """Plain CSV (extra keys in rows are ignored)."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def check_dataset_dir(path: Path, partition_cols: list[str]):
+    """Refuse to write a partitioned dataset over anything that isn't one.
+
+    Only key=value partition directories for these columns may already be
+    there; they are replaced partition by partition.
+    """
+    if path.is_file():
+        raise FileExistsError(f"{path} is a file, not a dataset directory")
+    if not path.is_dir():
+        return
+    foreign = sorted(p.name for p in path.iterdir()
+                     if not p.is_dir() or p.name.split("=", 1)[0] not in partition_cols)
+    if foreign:
+        shown = ", ".join(foreign[:3]) + (", ..." if len(foreign) > 3 else "")
+        raise FileExistsError(f"{path} holds files that aren't part of this dataset ({shown}); "
+                              f"choose an empty or new output directory")
+
+
+def write_table(rows: list[dict], path: Path, fmt: str, fieldnames: list[str], columns: dict[str, str],
+                partition_by: list[str] = None) -> Path:
+    """Write rows in the given format and return the path written.
+
+    partition_by (Parquet only) makes path a dataset directory with one
+    subdirectory per partition value. Partitions being written replace their
+    previous contents; anything else in the directory raises FileExistsError.
+    """
+    path = Path(path)
+    if fmt == "csv":
+        write_csv_rows(rows, path, fieldnames)
+        return path
+
+    if pa is None:
+        raise RuntimeError("pyarrow not installed. Run: pip install pyarrow")
+
+    table = pa.Table.from_pylist(rows, schema=arrow_schema(fieldnames, columns))
+
+    if partition_by:
+        if fmt != "parquet":
+            raise ValueError("Partitioned output is only supported for parquet")
+        check_dataset_dir(path, partition_by)
+        pq.write_to_dataset(table, path, partition_cols=partition_by, existing_data_behavior="delete_matching")
+    elif fmt == "parquet":
+        pq.write_table(table, path)
+    else:
+        feather.write_feather(table, path)
+    return path
+
+
+# Column order of the scraper's output
+OUTPUT_FIELDS = [
+    "county", "state", "fips", "individual_premium",
+    "small_group_premium", "difference", "year", "age", "metal"
+]
+
+
+def sort_results(results: list[dict]) -> list[dict]:
+    """Sort by state, then county (then combination, for captured data)."""
+    return sorted(results, key=lambda x: (
+        x.get("state", ""), x.get("county", ""),
+        x.get("year", 0), x.get("age", 0), x.get("metal", "")
+    ))
+
+
+def write_csv(results: list[dict], path: str):
+    """Write scraped results to a CSV file."""
+    if not results:
+        print("No data to write!")
+        return
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(sort_results(results))
+
+    print(f"\nWrote {len(results)} rows to {path}")
+
+
+def write_output(results: list[dict], path: str, fmt: str = "csv"):
+    """Write results as CSV, or as typed Parquet/Feather."""
+    if fmt == "csv":
+        write_csv(results, path)
+        return
+    if not results:
+        print("No data to write!")
+        return
+
+    rows = [{k: r.get(k) for k in OUTPUT_FIELDS} for r in sort_results(results)]
+    path = write_table(rows, output_path(path, fmt), fmt, OUTPUT_FIELDS, SCRAPED_COLUMNS)
+    print(f"\nWrote {len(rows)} rows to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an exported CSV to Parquet or Feather")
+    parser.add_argument("csv_file", help="County, state or scraper CSV")
+    parser.add_argument("--format", choices=FORMATS[1:], default="parquet", help="Output format")
+    parser.add_argument("--output", "-o", help="Output path (default: CSV path with the new suffix)")
+
+    args = parser.parse_args()
+
+    if pa is None:
+        print("Error: pyarrow not installed. Run: pip install pyarrow")
+        return
+
+    with open(args.csv_file, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        raw_rows = list(reader)
+
+    if "fips" in fieldnames and "county" in fieldnames:
+        columns = SCRAPED_COLUMNS if "metal" in fieldnames else COUNTY_COLUMNS
+    else:
+        columns = STATE_COLUMNS
+
+    def convert(name, value):
+        if value == "":
+            return None
+        kind = columns.get(name, "int" if name.endswith("_nulls") else "money")
+        if kind == "money":
+            return float(value)
+        if kind in ("int", "small"):
+            return int(value)
+        return value
+
+    rows = [{name: convert(name, value) for name, value in row.items()} for row in raw_rows]
+    path = write_table(rows, Path(args.output or output_path(args.csv_file, args.format)), args.format,
+                       fieldnames, columns)
+    print(f"Wrote {len(rows)} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tooltip text parsing for the county map.
+Turns the map's tooltip ("Shasta County, CA Diff (Ind − Small): $605.64
+Individual: $1,414.50 Small Group: $808.86") into premium fields. Kept
+free of Playwright so the verifier and benchmarks can use it without a
+browser.
+"""
+
+import re
+
+from profiler import PROFILE
+
+# Tooltip parsing pattern - matches format like:
+# "Shasta County, CA\nDiff (Ind - Small): $605.64\nIndividual: $1,414.50  Small Group: $808.86"
+# The live map renders the label and negative values with a Unicode minus (−).
+TOOLTIP_PATTERN = re.compile(
+    r"(?P<county>[^,]+),\s*(?P<state>[A-Z]{2})\s*"
+    r"Diff\s*\(Ind\s*[-–−]\s*Small\):\s*\$?(?P<diff>[\d,.\-−]+)\s*"
+    r"Individual:\s*\$?(?P<individual>[\d,.\-−]+)\s*"
+    r"Small\s*Group:\s*\$?(?P<small_group>[\d,.\-−]+)",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def parse_money(value: str) -> float:
+    """Convert money string to float."""
+    if not value:
+        return None
+    cleaned = value.replace(",", "").replace("$", "").replace("−", "-").strip()
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def parse_tooltip(text: str) -> dict | None:
+    """Parse tooltip text into structured data."""
+    if not text:
+        return None
+    
+    # Normalize whitespace
+    text = " ".join(text.split())
+    
+    match = TOOLTIP_PATTERN.search(text)
+    if match:
+        PROFILE.count("parse.ok")
+        return {
+            "county": match.group("county").strip(),
+            "state": match.group("state").strip(),
+            "individual_premium": parse_money(match.group("individual")),
+            "small_group_premium": parse_money(match.group("small_group")),
+            "difference": parse_money(match.group("diff")),
+        }
+    
+    # Fallback: try simpler pattern
+    # Format: "County Name, ST" followed by numbers
+    simple = re.search(r"([^,]+),\s*([A-Z]{2})", text)
+    if simple:
+        numbers = re.findall(r"\$?([-−]?\d[\d,]*\.?\d*)", text)
+        if len(numbers) >= 2:
+            PROFILE.count("parse.fallback")
+            return {
+                "county": simple.group(1).strip(),
+                "state": simple.group(2).strip(),
+                "individual_premium": parse_money(numbers[-2]) if len(numbers) >= 2 else None,
+                "small_group_premium": parse_money(numbers[-1]) if len(numbers) >= 1 else None,
+                "difference": parse_money(numbers[0]) if len(numbers) >= 3 else None,
+            }
+    
+    PROFILE.count("parse.failed")
+    return None
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+TopoJSON helpers for the us-atlas files captured from the Ideon map page.
+Decodes the quantized, delta-encoded arcs and assembles county polygons.
+
+Usage:
+    python topology.py                      # summary of the bundled county topology
+    python topology.py --fips 06089         # interior point of one county
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+# Saved by find_data_source.py from https://cdn.jsdelivr.net/npm/us-atlas@3/counties-10m.json
+COUNTIES_TOPOLOGY = Path(__file__).resolve().parent.parent / "captured_counties-10m.json.json"
+
+# State postal code -> the two-digit FIPS prefix of its counties' ids
+STATE_FIPS = {
+    "AL": "01", "AK": "02", "AZ": "04", "AR": "05", "CA": "06", "CO": "08", "CT": "09",
+    "DE": "10", "DC": "11", "FL": "12", "GA": "13", "HI": "15", "ID": "16", "IL": "17",
+    "IN": "18", "IA": "19", "KS": "20", "KY": "21", "LA": "22", "ME": "23", "MD": "24",
+    "MA": "25", "MI": "26", "MN": "27", "MS": "28", "MO": "29", "MT": "30", "NE": "31",
+    "NV": "32", "NH": "33", "NJ": "34", "NM": "35", "NY": "36", "NC": "37", "ND": "38",
+    "OH": "39", "OK": "40", "OR": "41", "PA": "42", "RI": "44", "SC": "45", "SD": "46",
+    "TN": "47", "TX": "48", "UT": "49", "VT": "50", "VA": "51", "WA": "53", "WV": "54",
+    "WI": "55", "WY": "56", "PR": "72",
+}
+
+# Fractions of a polygon's height at which interior_point() tries scanlines
+SCANLINE_FRACTIONS = (0.5, 0.35, 0.65, 0.2, 0.8, 0.1, 0.9)
+
+
+def load_topology(path: Path = COUNTIES_TOPOLOGY) -> dict:
+    """Load a TopoJSON topology from disk."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def decode_arcs(topology: dict) -> list[list[tuple[float, float]]]:
+    """Dequantize and delta-decode every arc into (lon, lat) points."""
+    transform = topology.get("transform")
+    if not transform:
+        return [[tuple(p[:2]) for p in arc] for arc in topology["arcs"]]
+
+    kx, ky = transform["scale"]
+    dx, dy = transform["translate"]
+
+    arcs = []
+    for arc in topology["arcs"]:
+        x = y = 0
+        points = []
+        for position in arc:
+            x += position[0]
+            y += position[1]
+            points.append((x * kx + dx, y * ky + dy))
+        arcs.append(points)
+    return arcs
+
+
+def ring_coords(ring: list[int], arcs: list) -> list[tuple[float, float]]:
+    """Stitch a ring's arc references into one closed list of points."""
+    points = []
+    for index in ring:
+        arc = arcs[index] if index >= 0 else arcs[~index][::-1]
+        # Consecutive arcs share an endpoint; keep it only once
+        points.extend(arc[1:] if points else arc)
+    return points
+
+
+def geometry_polygons(geometry: dict, arcs: list) -> list[list[list[tuple[float, float]]]]:
+    """Return a geometry as a list of polygons, each a list of rings (outer first)."""
+    if geometry.get("type") == "Polygon":
+        return [[ring_coords(ring, arcs) for ring in geometry["arcs"]]]
+    if geometry.get("type") == "MultiPolygon":
+        return [[ring_coords(ring, arcs) for ring in polygon] for polygon in geometry["arcs"]]
+    return []
+
+
+def county_polygons(topology: dict, arcs: list = None, prefix: str = None) -> dict[str, dict]:
+    """Map each county FIPS (optionally only those starting with prefix) to its name and polygons."""
+    if arcs is None:
+        arcs = decode_arcs(topology)
+
+    counties = {}
+    for geometry in topology["objects"]["counties"]["geometries"]:
+        fips = str(geometry.get("id", "")).zfill(5)
+        if prefix and not fips.startswith(prefix):
+            continue
+        counties[fips] = {
+            "name": geometry.get("properties", {}).get("name", ""),
+            "polygons": geometry_polygons(geometry, arcs),
+        }
+    return counties
+
+
+def ring_area(ring: list[tuple[float, float]]) -> float:
+    """Signed planar area of a ring (shoelace formula)."""
+    area = 0.0
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]):
+        area += x0 * y1 - x1 * y0
+    return area / 2
+
+
+def _scanline_crossings(rings: list, y: float) -> list[float]:
+    """X positions where the horizontal line at y crosses the rings' edges."""
+    xs = []
+    for ring in rings:
+        for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]):
+            # Half-open test so a line through a vertex is counted once
+            if (y0 <= y < y1) or (y1 <= y < y0):
+                xs.append(x0 + (y - y0) * (x1 - x0) / (y1 - y0))
+    return sorted(xs)
+
+
+def interior_point(polygons: list) -> tuple[float, float] | None:
+    """Find a point guaranteed to lie inside the largest polygon.
+
+    Centroids can fall outside concave or hollow shapes, so instead this
+    takes the midpoint of the widest inside span along a few horizontal
+    scanlines (holes included via the even-odd rule).
+    """
+    polygons = [p for p in polygons if p and len(p[0]) >= 3]
+    if not polygons:
+        return None
+
+    rings = max(polygons, key=lambda p: abs(ring_area(p[0])))
+    ys = [y for _, y in rings[0]]
+    y_min, y_max = min(ys), max(ys)
+
+    best = None
+    for fraction in SCANLINE_FRACTIONS:
+        y = y_min + (y_max - y_min) * fraction
+        xs = _scanline_crossings(rings, y)
+        for x0, x1 in zip(xs[0::2], xs[1::2]):
+            if best is None or x1 - x0 > best[0]:
+                best = (x1 - x0, (x0 + x1) / 2, y)
+
+    if best is None:
+        x, y = rings[0][0]
+        return x, y
+    return best[1], best[2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the bundled county TopoJSON")
+    parser.add_argument("--topology", type=str, default=str(COUNTIES_TOPOLOGY), help="TopoJSON file path")
+    parser.add_argument("--fips", type=str, help="Print the interior point of one county")
+
+    args = parser.parse_args()
+
+    topology = load_topology(Path(args.topology))
+    counties = county_polygons(topology)
+    print(f"Arcs: {len(topology['arcs'])}")
+    print(f"Counties: {len(counties)}")
+
+    if args.fips:
+        county = counties.get(args.fips.zfill(5))
+        if not county:
+            print(f"County not found: {args.fips}")
+            return
+        point = interior_point(county["polygons"])
+        print(f"{county['name']} ({args.fips}): {len(county['polygons'])} polygon(s), interior point {point}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,20 @@
 """
 Verify our CSV data against the live Ideon website.
 Hovers over specific counties and captures tooltip values.
+
+Usage:
+    python verify_data.py
+    python verify_data.py --daemon http://127.0.0.1:8767   # daemon started with --debug, to see the page
 """
 
+import argparse
 import asyncio
 import re
 from playwright.async_api import async_playwright
 
+from browser_daemon import lease_or_launch, release_page
+from readiness import goto_map, wait_for_controls, wait_for_map_ready
+
 URL = "https://ideonapi.com/ideon-ichra-insights-by-state/"
 
 # Test cases: (county_name, state_abbr, expected_individual, expected_small_group, expected_diff)
@@ -21,18 +29,20 @@ TEST_CASES = [
 ]
 
 
-async def verify():
+async def verify(daemon: str = None):
     print("Verifying CSV data against live website...")
     print("Settings: Year=2026, Age=50, Metal=Gold")
     print("=" * 70)
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)  # Visible so you can see
-        page = await browser.new_page(viewport={"width": 1400, "height": 900})
+        # Visible so you can see (a leased page is only visible if the daemon runs with --debug)
+        browser, page, page_name = await lease_or_launch(p, daemon, headless=False,
+                                                         viewport={"width": 1400, "height": 900})
 
-        print(f"\nLoading {URL}...")
-        await page.goto(URL, wait_until="domcontentloaded", timeout=60000)
-        await asyncio.sleep(3)
+        if page_name is None:
+            print(f"\nLoading {URL}...")
+            await goto_map(page, URL)
+            await wait_for_controls(page)
 
         # Set filters to Year=2026, Age=50, Metal=Gold
         print("Setting filters: Year=2026, Age=50, Metal=Gold")
@@ -41,25 +51,23 @@ async def verify():
             # Year dropdown
             year_select = page.locator("#ichra-year")
             await year_select.select_option("26")
-            await asyncio.sleep(0.5)
 
             # Age dropdown
             age_select = page.locator("#ichra-age")
             await age_select.select_option("50")
-            await asyncio.sleep(0.5)
 
             # Metal dropdown
             metal_select = page.locator("#ichra-metal")
             await metal_select.select_option("gold")
-            await asyncio.sleep(2)  # Let map update
+            await wait_for_map_ready(page)
 
             print("Filters set successfully.\n")
         except Exception as e:
             print(f"Warning setting filters: {e}")
 
-        # Scroll to map
-        await page.evaluate("window.scrollBy(0, 400)")
-        await asyncio.sleep(1)
+        # Scroll to map (leased pages already are)
+        if page_name is None:
+            await page.evaluate("window.scrollBy(0, 400)")
 
         # Take a screenshot for reference
         await page.screenshot(path="verification_screenshot.png")
@@ -85,8 +93,13 @@ async def verify():
         # Keep browser open for manual verification
         input("\nPress Enter when done verifying...")
 
+        # For a leased page this only disconnects; the daemon keeps the browser
         await browser.close()
+        if page_name:
+            await release_page(daemon, page_name, ok=not page.is_closed())
 
 
 if __name__ == "__main__":
-    asyncio.run(verify())
+    parser = argparse.ArgumentParser(description="Compare our CSV values with the live map's tooltips")
+    parser.add_argument("--daemon", help="Lease a warm page from browser_daemon.py at this URL")
+    asyncio.run(verify(parser.parse_args().daemon))
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from bench_scraper import TreeMemorySampler
+
+CHILD = "import time; block = bytearray(100_000_000); time.sleep(1)"
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="process tree sampling reads /proc")
+def test_tree_peak_includes_grandchildren():
+    # Parent holds 50 MB and waits on a child holding 100 MB
+    parent = ("import subprocess, sys; block = bytearray(50_000_000); "
+              f"subprocess.run([sys.executable, '-c', {CHILD!r}])")
+    process = subprocess.Popen([sys.executable, "-c", parent])
+    sampler = TreeMemorySampler(process.pid, interval=0.05)
+    sampler.start()
+    _, _, usage = os.wait4(process.pid, 0)
+    tree_peak = sampler.stop()
+
+    assert tree_peak > 150e6
+    # wait4 only reports the largest single process
+    assert usage.ru_maxrss * 1024 < tree_peak
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from bench_suite import ROWS_PER_YEAR, synthetic_records, tooltip_corpus
+from tooltip_parser import parse_tooltip
+
+
+@pytest.mark.parametrize("rows", [1, 100, ROWS_PER_YEAR, 3 * ROWS_PER_YEAR + 7])
+def test_synthetic_records_have_requested_size_and_unique_keys(rows):
+    records = synthetic_records(rows)
+    assert len(records) == rows
+    assert len({(r["f"], r["year"], r["age"], r["lvl"]) for r in records}) == rows
+    assert all(len(r["f"]) == 5 for r in records)
+
+
+def test_synthetic_records_are_reproducible_and_include_nulls_and_negatives():
+    records = synthetic_records(5000, seed=3)
+    assert records == synthetic_records(5000, seed=3)
+    assert any(r["i"] is None and r["d"] is None for r in records)
+    assert any(r["d"] is not None and r["d"] < 0 for r in records)
+
+
+def test_tooltip_corpus_parses_to_expected_values():
+    corpus = tooltip_corpus(synthetic_records(2000), 600)
+    assert {"−", "–", "-"} <= {ch for text, _ in corpus for ch in text}
+    for text, expected in corpus:
+        parsed = parse_tooltip(text)
+        assert {k: parsed[k] for k in expected} == expected
@@ -0,0 +1,87 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from checkpoint import Checkpoint, read_checkpoint
+
+ARGS = SimpleNamespace(year=2026, age=50, metal="gold")
+OTHER = SimpleNamespace(year=2026, age=27, metal="gold")
+
+
+def row(county, state="TX", args=ARGS, premium=500.0):
+    return {"county": county, "state": state, "individual_premium": premium,
+            "year": args.year, "age": args.age, "metal": args.metal}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "out.csv.checkpoint.jsonl"
+
+
+def interrupted_run(path):
+    """A run that wrote two rows and some covered points, then died mid-write."""
+    checkpoint = Checkpoint(path)
+    checkpoint.add_row(row("Harris"))
+    checkpoint.cover(ARGS, ["svg:0", "svg:1"])
+    checkpoint.add_row(row("Travis"))
+    checkpoint.cover(ARGS, ["svg:2"])
+    checkpoint.finish(OTHER)
+    checkpoint.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"row": {"county": "Dal')
+
+
+def test_resume_skips_torn_last_line(path):
+    interrupted_run(path)
+    checkpoint = Checkpoint(path, resume=True)
+    assert [r["county"] for r in checkpoint.rows] == ["Harris", "Travis"]
+    assert checkpoint.seen(ARGS) == {"Harris, TX", "Travis, TX"}
+    assert checkpoint.is_covered(ARGS, "svg:2") and not checkpoint.is_covered(ARGS, "svg:3")
+    assert not checkpoint.is_covered(OTHER, "svg:0")
+    assert checkpoint.is_done(OTHER) and not checkpoint.is_done(ARGS)
+    checkpoint.close()
+
+
+def test_entries_after_torn_line_survive_the_next_resume(path):
+    interrupted_run(path)
+    checkpoint = Checkpoint(path, resume=True)
+    checkpoint.add_row(row("Dallas"))
+    checkpoint.close()
+
+    rows, _, _ = read_checkpoint(path)
+    assert [r["county"] for r in rows] == ["Harris", "Travis", "Dallas"]
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert json.loads(lines[-1]) == {"row": row("Dallas")}
+
+
+def test_merge_prefers_resumed_rows_and_drops_duplicates(path):
+    interrupted_run(path)
+    checkpoint = Checkpoint(path, resume=True)
+    merged = checkpoint.merge([row("Travis", premium=1.0), row("Dallas"), row("Harris", args=OTHER)])
+    checkpoint.close()
+
+    assert [(r["county"], r["age"]) for r in merged] == [("Harris", 50), ("Travis", 50), ("Dallas", 50),
+                                                       ("Harris", 27)]
+    assert merged[1]["individual_premium"] == 500.0
+
+
+def test_refuses_to_overwrite_an_interrupted_run(path):
+    interrupted_run(path)
+    with pytest.raises(FileExistsError):
+        Checkpoint(path)
+    Checkpoint(path, overwrite=True).close()
+    assert path.read_text() == ""
+
+
+def test_empty_leftover_file_can_be_reused(path):
+    path.write_text("")
+    Checkpoint(path).close()
+
+
+def test_discard_removes_the_file(path):
+    checkpoint = Checkpoint(path)
+    checkpoint.add_row(row("Harris"))
+    checkpoint.discard()
+    assert not path.exists()
@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from columnar_cache import cache_dir_for, is_fresh, open_columnar
+
+RECORDS = [
+    {"f": "48201", "n": "Harris County", "st": "TX", "i": 700.98, "s": 748.6, "d": -47.62,
+     "year": 26, "age": 50, "lvl": "gold"},
+    {"f": "02013", "n": "Aleutians East Borough", "st": "AK", "i": None, "s": 608.98, "d": None,
+     "year": 26, "age": 50, "lvl": "gold"},
+    {"f": "02013", "n": "Aleutians East Borough", "st": "AK", "i": 401.5, "s": 390.0, "d": 11.5,
+     "year": 25, "age": 27, "lvl": "bronze"},
+    {"f": "01001", "n": "Autauga County", "st": "AL", "i": 650.0, "s": 600.0, "d": 50.0,
+     "year": 26, "age": 50, "lvl": "gold"},
+]
+
+
+def write_json(path, records):
+    path.write_text(json.dumps(records), encoding="utf-8")
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "county_data_raw.json"
+    write_json(path, RECORDS)
+    return path
+
+
+def test_round_trips_records(data_file):
+    assert list(open_columnar(data_file).records()) == RECORDS
+
+
+def test_filters_by_year_age_and_metal(data_file):
+    premiums = open_columnar(data_file)
+    assert [r["f"] for r in premiums.select(2026, 50, "GOLD")] == ["48201", "02013", "01001"]
+    assert [r["f"] for r in premiums.select(year=2025)] == ["02013"]
+
+
+def test_sorted_select_orders_by_state_then_county(data_file):
+    rows = list(open_columnar(data_file).select(2026, sort=True))
+    assert [(r["st"], r["n"]) for r in rows] == [
+        ("AK", "Aleutians East Borough"), ("AL", "Autauga County"), ("TX", "Harris County")]
+
+
+def test_fresh_cache_is_reused(data_file):
+    open_columnar(data_file)
+    meta = cache_dir_for(data_file) / "meta.json"
+    built = meta.stat().st_mtime_ns
+    assert is_fresh(data_file, cache_dir_for(data_file))
+    open_columnar(data_file)
+    assert meta.stat().st_mtime_ns == built
+
+
+def test_rebuilt_when_source_changes(data_file):
+    open_columnar(data_file)
+    write_json(data_file, RECORDS[:1])
+    assert not is_fresh(data_file, cache_dir_for(data_file))
+    assert len(open_columnar(data_file)) == 1
+
+
+def test_rebuilt_when_only_mtime_changes(data_file):
+    open_columnar(data_file)
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not is_fresh(data_file, cache_dir_for(data_file))
+
+
+def test_rebuilt_after_format_version_change(data_file):
+    open_columnar(data_file)
+    meta_path = cache_dir_for(data_file) / "meta.json"
+    meta = json.loads(meta_path.read_text())
+    meta["version"] = -1
+    meta_path.write_text(json.dumps(meta))
+    assert not is_fresh(data_file, cache_dir_for(data_file))
+    assert list(open_columnar(data_file).records()) == RECORDS
@@ -0,0 +1,89 @@
+import json
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from county_locator import CountyLocator, decode_arcs_array, price_points
+from premium_index import PremiumIndex
+from topology import COUNTIES_TOPOLOGY, decode_arcs, load_topology
+
+
+def square(x0, y0, x1, y1):
+    """Closed counter-clockwise ring of absolute (unquantized) coordinates."""
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]]
+
+
+@pytest.fixture(scope="module")
+def tiny_topology(tmp_path_factory):
+    """Two adjacent squares, one with a hole, and a two-part MultiPolygon (no transform)."""
+    topology = {
+        "type": "Topology",
+        "arcs": [
+            square(0, 0, 1, 1),          # 0: county A
+            square(0.4, 0.4, 0.6, 0.6),  # 1: hole in A
+            square(1, 0, 2, 1),          # 2: county B
+            square(5, 5, 6, 6),          # 3: county C, part 1
+            square(7, 5, 8, 6),          # 4: county C, part 2
+        ],
+        "objects": {"counties": {"type": "GeometryCollection", "geometries": [
+            {"type": "Polygon", "id": "01001", "arcs": [[0], [1]], "properties": {"name": "A"}},
+            {"type": "Polygon", "id": 1003, "arcs": [[2]], "properties": {"name": "B"}},
+            {"type": "MultiPolygon", "id": "02005", "arcs": [[[3]], [[4]]], "properties": {"name": "C"}},
+        ]}},
+    }
+    path = tmp_path_factory.mktemp("topology") / "counties.json"
+    path.write_text(json.dumps(topology))
+    return path
+
+
+def test_locates_points_in_polygons_holes_and_multipolygons(tiny_topology):
+    locator = CountyLocator(tiny_topology, cell_size=0.5)
+    lats = [0.2, 0.5, 0.5, 5.5, 5.5, 5.5, 3.0, -1.0, math.nan]
+    lons = [0.2, 0.5, 1.5, 5.5, 7.5, 6.5, 3.0, 0.5, 0.5]
+    assert locator.locate_fips(lats, lons) == ["01001", None, "01003", "02005", "02005", None, None, None, None]
+
+
+def test_cell_size_does_not_change_results(tiny_topology):
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(-1, 7, 2000), rng.uniform(-1, 9, 2000)
+    expected = CountyLocator(tiny_topology, cell_size=0.1).locate_fips(lats, lons)
+    assert CountyLocator(tiny_topology, cell_size=3).locate_fips(lats, lons) == expected
+
+
+def test_price_points_joins_premiums_and_leaves_unresolved_blank(tiny_topology):
+    locator = CountyLocator(tiny_topology)
+    index = PremiumIndex([
+        {"f": "01001", "n": "Autauga County", "st": "AL", "i": 650.0, "s": 600.0, "d": 50.0,
+         "year": 26, "age": 50, "lvl": "gold"},
+        {"f": "01001", "n": "Autauga County", "st": "AL", "i": 999.0, "s": 999.0, "d": 0.0,
+         "year": 26, "age": 27, "lvl": "gold"},
+    ])
+    rows = price_points(locator, index, [0.2, 0.5, 3.0], [0.2, 1.5, 3.0], 2026, 50, "gold")
+
+    assert rows[0] == {"fips": "01001", "county": "Autauga County", "state": "AL",
+                       "individual_premium": 650.0, "small_group_premium": 600.0, "difference": 50.0}
+    # No premiums for the county: name from the topology, state from the FIPS prefix
+    assert rows[1] == {"fips": "01003", "county": "B", "state": "AL",
+                       "individual_premium": None, "small_group_premium": None, "difference": None}
+    assert set(rows[2].values()) == {None}
+
+
+@pytest.mark.skipif(not COUNTIES_TOPOLOGY.exists(), reason="bundled county topology not present")
+def test_numpy_arc_decoding_matches_pure_python():
+    topology = load_topology()
+    fast = decode_arcs_array(topology)
+    slow = decode_arcs(topology)
+    assert len(fast) == len(slow)
+    for arc_fast, arc_slow in zip(fast, slow):
+        assert np.array_equal(arc_fast, np.array(arc_slow))
+
+
+@pytest.mark.skipif(not COUNTIES_TOPOLOGY.exists(), reason="bundled county topology not present")
+def test_locates_real_counties():
+    locator = CountyLocator()
+    # Houston, Manhattan, Los Angeles, Anchorage, open ocean
+    lats = [29.76, 40.78, 34.05, 61.22, 30.0]
+    lons = [-95.37, -73.97, -118.24, -149.9, -60.0]
+    assert locator.locate_fips(lats, lons) == ["48201", "36061", "06037", "02020", None]
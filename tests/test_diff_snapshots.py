@@ -0,0 +1,26 @@
+from diff_snapshots import diff_snapshots
+
+
+def snapshot(individual):
+    return {("01001", "2026", "27", "silver"): {
+        "county": "Autauga", "state": "AL",
+        "individual_premium": individual, "small_group_premium": 400.0, "difference": None,
+    }}
+
+
+def test_move_of_exactly_the_tolerance_is_unchanged():
+    # 10.10 - 10.05 is 0.04999999999999893 as floats, 10.15 - 10.10 is 0.05000000000000071
+    for old, new in [(10.05, 10.10), (10.10, 10.15)]:
+        result = diff_snapshots(snapshot(old), snapshot(new), tolerance=0.05)
+        assert result["changed"] == [], (old, new)
+
+
+def test_move_past_the_tolerance_reports_cent_delta():
+    result = diff_snapshots(snapshot(10.10), snapshot(10.16), tolerance=0.05)
+    (change,) = result["changed"]
+    assert change["changes"] == {"individual_premium": {"old": 10.10, "new": 10.16, "delta": 0.06}}
+
+
+def test_zero_tolerance_ignores_float_noise():
+    result = diff_snapshots(snapshot(0.1 + 0.2), snapshot(0.3))
+    assert result["changed"] == []
@@ -0,0 +1,75 @@
+import argparse
+import csv
+
+import pytest
+
+from export_county_data import export_partitioned
+from table_output import parse_partition_keys
+
+
+def record(fips, st, year, age=50, metal="gold", individual=500.0):
+    return {"f": fips, "n": f"County {fips}", "st": st, "i": individual, "s": 450.0,
+            "d": individual - 450.0, "year": year, "age": age, "lvl": metal}
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize("value, keys", [
+    ("year", ["year"]),
+    ("year,state", ["year", "state"]),
+    (" state , metal ,", ["state", "metal"]),
+    ("age,metal,year", ["age", "metal", "year"]),
+])
+def test_parse_partition_keys(value, keys):
+    assert parse_partition_keys(value) == keys
+
+
+@pytest.mark.parametrize("value", ["", ",", "county", "year,fips"])
+def test_parse_partition_keys_rejects_unknown_or_empty(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_partition_keys(value)
+
+
+def test_export_partitioned_routes_rows_and_keeps_order(tmp_path):
+    records = [record("48201", "TX", 26), record("06001", "CA", 26), record("48113", "TX", 26),
+               record("48201", "TX", 25)]
+    assert export_partitioned(records, tmp_path, ["year", "state"]) == 4
+
+    texas = read_rows(tmp_path / "year=2026" / "state=TX" / "part.csv")
+    assert [r["fips"] for r in texas] == ["48201", "48113"]
+    assert [r["fips"] for r in read_rows(tmp_path / "year=2026" / "state=CA" / "part.csv")] == ["06001"]
+    assert [r["fips"] for r in read_rows(tmp_path / "year=2025" / "state=TX" / "part.csv")] == ["48201"]
+
+
+def test_export_partitioned_reopens_evicted_files_without_duplicate_headers(tmp_path):
+    states = ["TX", "CA", "NY"]
+    records = [record(f"{n:05d}", states[n % 3], 26) for n in range(12)]
+    assert export_partitioned(records, tmp_path, ["state"], max_open=1) == 12
+
+    for st in states:
+        rows = read_rows(tmp_path / f"state={st}" / "part.csv")
+        assert len(rows) == 4
+        assert all(r["state_abbr"] == st for r in rows)
+
+
+def test_parquet_dataset_refuses_foreign_files_and_replaces_its_partitions(tmp_path):
+    pytest.importorskip("pyarrow")
+    pd = pytest.importorskip("pandas")
+    from table_output import write_table
+
+    columns = {"state": "category", "year": "small", "premium": "money"}
+    rows = [{"state": "TX", "year": 2026, "premium": 1.0}, {"state": "CA", "year": 2026, "premium": 2.0}]
+    snapshot = tmp_path / "ideon_counties_2026.csv"
+    snapshot.write_text("kept")
+
+    with pytest.raises(FileExistsError):
+        write_table(rows, tmp_path, "parquet", list(columns), columns, partition_by=["year"])
+    assert snapshot.read_text() == "kept"
+
+    dataset = tmp_path / "dataset"
+    write_table(rows, dataset, "parquet", list(columns), columns, partition_by=["year"])
+    write_table(rows, dataset, "parquet", list(columns), columns, partition_by=["year"])
+    assert len(pd.read_parquet(dataset)) == 2
@@ -0,0 +1,67 @@
+import io
+import json
+
+import pytest
+
+from premium_stream import iter_json_array, record_filter, stream_records
+
+RECORDS = [
+    {"f": "35013", "n": "Doña Ana County", "st": "NM", "i": 512.4, "s": 488.1, "d": 24.3,
+     "year": 26, "age": 50, "lvl": "gold"},
+    {"f": "02013", "n": "Aleutians East Borough", "st": "AK", "i": None, "s": 608.98, "d": None,
+     "year": 25, "age": 27, "lvl": "bronze"},
+    {"f": "48201", "n": "Harris County", "st": "TX", "i": 700.98, "s": 748.6, "d": -47.62,
+     "year": 26, "age": 50, "lvl": "Gold"},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 16])
+def test_yields_every_record_for_any_chunk_size(chunk_size):
+    data = json.dumps(RECORDS, ensure_ascii=False).encode("utf-8")
+    assert list(iter_json_array(io.BytesIO(data), chunk_size)) == RECORDS
+
+
+def test_reads_text_file_objects():
+    assert list(iter_json_array(io.StringIO(json.dumps(RECORDS)), 5)) == RECORDS
+
+
+def test_multibyte_character_split_across_chunks():
+    data = '[{"n": "Doña Ana"}]'.encode("utf-8")
+    assert list(iter_json_array(io.BytesIO(data), 1)) == [{"n": "Doña Ana"}]
+
+
+def test_numbers_split_across_chunks():
+    assert list(iter_json_array(io.BytesIO(b"[12345, 6.75, -8]"), 2)) == [12345, 6.75, -8]
+
+
+def test_whitespace_and_empty_array():
+    assert list(iter_json_array(io.BytesIO(b"  \n[ ]\n"), 1)) == []
+    assert list(iter_json_array(io.BytesIO(b'[\n  {"a": 1} ,\n  {"a": 2}\n]'), 3)) == [{"a": 1}, {"a": 2}]
+
+
+def test_rejects_non_array():
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        list(iter_json_array(io.BytesIO(b'{"a": 1}')))
+
+
+@pytest.mark.parametrize("data", [b'[{"a": 1}, {"a": ', b'[{"a": 1}', b"[1, 2", b""])
+def test_rejects_truncated_array(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.BytesIO(data), 4))
+
+
+def test_record_filter_matches_year_age_and_metal_case_insensitively():
+    predicate = record_filter(2026, 50, "GOLD")
+    assert [r["f"] for r in RECORDS if predicate(r)] == ["35013", "48201"]
+    assert record_filter() is None
+
+
+def test_stream_records_from_cache_file(tmp_path):
+    path = tmp_path / "county_data_raw.json"
+    path.write_text(json.dumps(RECORDS), encoding="utf-8")
+    assert [r["f"] for r in stream_records(path, predicate=record_filter(age=27))] == ["02013"]
+
+
+def test_rejects_missing_separator():
+    with pytest.raises(ValueError, match="Malformed"):
+        list(iter_json_array(io.BytesIO(b"[1 2]")))
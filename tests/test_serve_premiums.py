@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from serve_premiums import PremiumService
+
+RECORDS = [
+    {"f": "48201", "n": "Harris County", "st": "TX", "i": 700.98, "s": 748.6, "d": -47.62,
+     "year": 26, "age": 50, "lvl": "gold"},
+    {"f": "06001", "n": "Alameda County", "st": "CA", "i": 800.0, "s": 700.0, "d": 100.0,
+     "year": 26, "age": 50, "lvl": "gold"},
+]
+
+
+def get(service, path, query=""):
+    status, body = service.handle(path, query)
+    return status, json.loads(body)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "county_data_raw.json"
+    path.write_text(json.dumps(RECORDS))
+    return path
+
+
+def test_health_is_never_served_from_the_cache(data_file):
+    service = PremiumService(data_file, reload_interval=3600)
+    assert get(service, "/health")[1]["cache"]["entries"] == 0
+    get(service, "/county/48201", "year=2026")
+    get(service, "/county/48201", "year=2026")
+    cache = get(service, "/health")[1]["cache"]
+    assert (cache["entries"], cache["hits"], cache["misses"]) == (1, 1, 1)
+
+
+def test_changed_file_replaces_index_and_cached_responses(data_file):
+    service = PremiumService(data_file, reload_interval=0)
+    assert get(service, "/state/TX")[1]["count"] == 1
+
+    data_file.write_text(json.dumps(RECORDS + [dict(RECORDS[0], f="48113", n="Dallas County")]))
+    assert get(service, "/state/TX")[1]["count"] == 2
+    assert get(service, "/health")[1]["generation"] == 2
+
+
+@pytest.mark.parametrize("breakage", ["missing", "truncated"])
+def test_failed_reload_keeps_serving_the_current_index(data_file, breakage):
+    service = PremiumService(data_file, reload_interval=0)
+    if breakage == "missing":
+        data_file.unlink()
+    else:
+        data_file.write_text(json.dumps(RECORDS)[:40])
+
+    status, payload = get(service, "/county/06001")
+    assert status == 200 and payload["count"] == 1
+    health = get(service, "/health")[1]
+    assert health["generation"] == 1 and health["records"] == 2
+    assert health["reload_errors"] >= 1 and health["last_error"]
+
+
+def test_initial_load_error_is_raised(tmp_path):
+    with pytest.raises(OSError):
+        PremiumService(tmp_path / "missing.json")
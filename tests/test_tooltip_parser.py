@@ -0,0 +1,77 @@
+import pytest
+
+from tooltip_parser import parse_money, parse_tooltip
+
+# As rendered by the map: '$' + d3.format(',.2f'), which uses U+2212 for negatives,
+# with an &nbsp; between the individual and small group values
+LIVE_TOOLTIP = ("Harris County, TX\n"
+                "Diff (Ind − Small): $−47.62\n"
+                "Individual: $700.98  Small Group: $748.60")
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("$1,414.50", 1414.5),
+    ("$−47.62", -47.62),
+    ("−1,234.56", -1234.56),
+    ("$-47.62", -47.62),
+    (" 0.00 ", 0.0),
+])
+def test_parse_money(value, expected):
+    assert parse_money(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "$", "n/a"])
+def test_parse_money_unparseable(value):
+    assert parse_money(value) is None
+
+
+def test_parses_unicode_minus_difference():
+    assert parse_tooltip(LIVE_TOOLTIP) == {
+        "county": "Harris County",
+        "state": "TX",
+        "individual_premium": 700.98,
+        "small_group_premium": 748.6,
+        "difference": -47.62,
+    }
+
+
+@pytest.mark.parametrize("dash", ["-", "–", "−"])
+@pytest.mark.parametrize("minus", ["-", "−"])
+def test_label_dash_and_minus_variants(dash, minus):
+    text = f"Shasta County, CA Diff (Ind {dash} Small): ${minus}605.64 Individual: $1,414.50  Small Group: $808.86"
+    result = parse_tooltip(text)
+    assert result["difference"] == -605.64
+    assert (result["individual_premium"], result["small_group_premium"]) == (1414.5, 808.86)
+
+
+def test_negative_premiums_keep_their_sign():
+    result = parse_tooltip("Kern County, CA Diff (Ind − Small): $1.00 Individual: $−1.00 Small Group: $−2.00")
+    assert (result["individual_premium"], result["small_group_premium"]) == (-1.0, -2.0)
+
+
+def test_positive_difference_and_county_with_punctuation():
+    result = parse_tooltip("St. Mary's County, MD\n  Diff (Ind − Small): $605.64\n"
+                           "  Individual: $1,414.50  Small Group: $808.86")
+    assert result["county"] == "St. Mary's County"
+    assert result["difference"] == 605.64
+
+
+def test_null_premiums_render_as_zero():
+    result = parse_tooltip("Chugach, AK Diff (Ind − Small): $0.00 Individual: $0.00 Small Group: $608.98")
+    assert (result["individual_premium"], result["difference"]) == (0.0, 0.0)
+
+
+def test_falls_back_to_numbers_when_labels_differ():
+    result = parse_tooltip("Harris County, TX | $10.00 | $700.98 | $748.60")
+    assert result == {"county": "Harris County", "state": "TX", "individual_premium": 700.98,
+                      "small_group_premium": 748.6, "difference": 10.0}
+
+
+@pytest.mark.parametrize("text", [None, "", "Loading...", "Harris County, TX"])
+def test_unrecognised_text(text):
+    assert parse_tooltip(text) is None
+
+
+def test_fallback_keeps_negative_difference():
+    result = parse_tooltip("Harris County, TX | $−47.62 | $700.98 | $748.60")
+    assert result["difference"] == -47.62